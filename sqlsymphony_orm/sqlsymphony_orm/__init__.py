@@ -1,12 +1,4 @@
-import logging
-from typing import Union, List
-from rich.traceback import install
-from rich.console import Console
-from rich.table import Table
-
-from loguru import logger
-
-install(show_locals=True)
+from typing import List, Optional, Union
 
 __version__ = "0.4.15"
 __author__ = "alexeev-prog"
@@ -14,11 +6,17 @@ __license__ = "GNU GPL v3"
 __language__ = "Python 3.12.7"
 __pypi_pkg__ = "sqlsymphony_orm"
 
+# loguru handler ids of sinks added by setup_logger
+_handler_ids: List[int] = []
+
 
 def introduction():
     """
     Print introduction table
     """
+    from rich.console import Console
+    from rich.table import Table
+
     table = Table(
         title="SQLSymphony ORM - powerful and simple ORM for python", expand=True
     )
@@ -37,57 +35,120 @@ def introduction():
     console.print(table)
 
 
-class InterceptHandler(logging.Handler):
-    """
-    This class describes an intercept handler.
+def __getattr__(name: str):
     """
+    Lazy module attributes: logging handler is imported on first access, so
+    importing the package does not import logging machinery
 
-    def emit(self, record) -> None:
-        """
-        Get corresponding Loguru level if it exists
-
-        :param		record:	 The record
-        :type		record:	 record
+    :param		name:			 The name
+    :type		name:			 str
 
-        :returns:	None
-        :rtype:		None
-        """
-        try:
-            level = logger.level(record.levelname).name
-        except ValueError:
-            level = record.levelno
+    :returns:	attribute
+    :rtype:		Any
 
-        frame, depth = logging.currentframe(), 2
+    :raises		AttributeError:	 unknown attribute
+    """
+    if name == "InterceptHandler":
+        from sqlsymphony_orm.utils.intercept import InterceptHandler
 
-        while frame.f_code.co_filename == logging.__file__:
-            frame = frame.f_back
-            depth += 1
+        return InterceptHandler
 
-        logger.opt(depth=depth, exception=record.exc_info).log(
-            level, record.getMessage()
-        )
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-def setup_logger(level: Union[str, int] = "DEBUG", ignored: List[str] = "") -> None:
+def setup_logger(
+    level: Union[str, int] = "DEBUG",
+    ignored: Optional[List[str]] = None,
+    log_file: Optional[str] = "sqlsymphony_orm.log",
+    enqueue: bool = True,
+    replace_default: bool = True,
+) -> None:
     """
-    Setup logger
-
-    :param		level:	  The level
-    :type		level:	  str
-    :param		ignored:  The ignored
-    :type		ignored:  List[str]
+    Setup logger. Sinks filtered at `level` are added: messages below it are
+    dropped before formatting, so debug logging on hot paths costs one level
+    comparison. With `enqueue` records are written by a background worker and
+    callers never block on sink I/O. Sinks added by a previous call are
+    replaced, sinks added by the application are kept.
+
+    :param		level:			  The level
+    :type		level:			  Union[str, int]
+    :param		ignored:		  The ignored
+    :type		ignored:		  Optional[List[str]]
+    :param		log_file:		  The log file (None - do not add file sink)
+    :type		log_file:		  Optional[str]
+    :param		enqueue:		  Write records in background worker
+    :type		enqueue:		  bool
+    :param		replace_default:  Remove default loguru stderr sink, if present
+    :type		replace_default:  bool
     """
+    import logging
+    import sys
+
+    from loguru import logger
+
+    from sqlsymphony_orm.utils.intercept import InterceptHandler
+
     logging.basicConfig(
         handlers=[InterceptHandler()], level=logging.getLevelName(level)
     )
 
-    for ignore in ignored:
+    for ignore in ignored or ():
         logger.disable(ignore)
 
-    logger.add("sqlsymphony_orm.log")
+    removed = [0] if replace_default else []
+
+    while _handler_ids:
+        removed.append(_handler_ids.pop())
+
+    for handler_id in removed:
+        try:
+            logger.remove(handler_id)
+        except ValueError:
+            pass  # already removed by the application
+
+    _handler_ids.append(logger.add(sys.stderr, level=level, enqueue=enqueue))
+
+    if log_file is not None:
+        _handler_ids.append(logger.add(log_file, level=level, enqueue=enqueue))
 
     logger.info("Logging is successfully configured")
 
 
-introduction()
-setup_logger()
+def configure(
+    level: Union[str, int] = "DEBUG",
+    ignored: Optional[List[str]] = None,
+    log_file: Optional[str] = "sqlsymphony_orm.log",
+    rich_traceback: bool = False,
+    show_locals: bool = False,
+    show_introduction: bool = False,
+    enqueue: bool = True,
+) -> None:
+    """
+    Opt-in setup of logging, rich traceback handler and introduction table.
+    Importing the package has no side effects, call it once at startup of
+    application if you need them.
+
+    :param		level:				The logging level
+    :type		level:				Union[str, int]
+    :param		ignored:			The ignored loggers
+    :type		ignored:			Optional[List[str]]
+    :param		log_file:			The log file (None - do not add file sink)
+    :type		log_file:			Optional[str]
+    :param		rich_traceback:		Install rich traceback handler
+    :type		rich_traceback:		bool
+    :param		show_locals:		Show locals in rich tracebacks
+    :type		show_locals:		bool
+    :param		show_introduction:	Print introduction table
+    :type		show_introduction:	bool
+    :param		enqueue:			Write log records in background worker
+    :type		enqueue:			bool
+    """
+    if rich_traceback:
+        from rich.traceback import install
+
+        install(show_locals=show_locals)
+
+    if show_introduction:
+        introduction()
+
+    setup_logger(level, ignored, log_file, enqueue)
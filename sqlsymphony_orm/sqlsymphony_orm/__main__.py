@@ -0,0 +1,3 @@
+from sqlsymphony_orm.cli import cli
+
+cli(prog_name="sqlsymphony")
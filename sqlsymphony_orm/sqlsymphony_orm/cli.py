@@ -0,0 +1,304 @@
+import os
+import sys
+import runpy
+import pstats
+import cProfile
+import importlib
+from typing import Any, List, Optional
+
+import click
+
+from sqlsymphony_orm import __version__, setup_logger
+from sqlsymphony_orm.database.connection import SQLiteDBConnector
+from sqlsymphony_orm.database.maintenance import SQLiteMaintenance
+from sqlsymphony_orm.exceptions import MigrationError
+from sqlsymphony_orm.migrations.migrations_manager import SQLiteMigrationManager
+from sqlsymphony_orm.models.session_models import SQLiteSession
+from sqlsymphony_orm.performance.benchmarks import bench_command
+from sqlsymphony_orm.performance.explain import QueryPlanAnalyzer
+from sqlsymphony_orm.performance.profiler import QueryProfiler
+
+DATABASE = click.argument(
+    "database", type=click.Path(exists=True, dir_okay=False, resolve_path=True)
+)
+MIGRATIONS_DIR = click.option(
+    "--migrations-dir",
+    default="migrations",
+    show_default=True,
+    type=click.Path(file_okay=False),
+    help="Directory of migration backups.",
+)
+
+
+def load_object(path: str) -> Any:
+    """
+    Import object by path `package.module:Name` (current directory is added to
+    the import path)
+
+    :param		path:				 The object path
+    :type		path:				 str
+
+    :returns:	object
+    :rtype:		Any
+
+    :raises		click.BadParameter:	 invalid path
+    """
+    module_name, _, name = path.partition(":")
+
+    if not module_name or not name:
+        raise click.BadParameter(f"expected module:Name, got {path}")
+
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+
+    try:
+        return getattr(importlib.import_module(module_name), name)
+    except (ImportError, AttributeError) as ex:
+        raise click.BadParameter(f"cannot import {path}: {ex}")
+
+
+def read_statements(path: str) -> List[str]:
+    """
+    Read sql statements separated by `;` from file
+
+    :param		path:  The file path
+    :type		path:  str
+
+    :returns:	statements
+    :rtype:		List[str]
+    """
+    with open(path, "r") as read_file:
+        return [
+            statement.strip()
+            for statement in read_file.read().split(";")
+            if statement.strip()
+        ]
+
+
+@click.group()
+@click.version_option(__version__, prog_name="sqlsymphony")
+@click.option(
+    "--log-level",
+    default="WARNING",
+    show_default=True,
+    help="Level of ORM log messages written to stderr.",
+)
+def cli(log_level: str):
+    """
+    SQLSymphony ORM command-line tool: benchmarks, profiling and database
+    maintenance
+    """
+    setup_logger(log_level.upper(), log_file=None)
+
+
+cli.add_command(bench_command)
+
+
+@cli.command(
+    "profile",
+    context_settings={"ignore_unknown_options": True, "allow_extra_args": True},
+)
+@click.argument("script", type=click.Path(exists=True, dir_okay=False))
+@click.argument("args", nargs=-1, type=click.UNPROCESSED)
+@click.option(
+    "--sort", default="cumulative", show_default=True, help="pstats sort key."
+)
+@click.option("--limit", default=20, show_default=True, help="Rows of each report.")
+@click.option(
+    "--slow-threshold", type=float, default=None, help="Log queries slower (seconds)."
+)
+@click.option(
+    "--output", type=click.Path(dir_okay=False), help="Write cProfile stats to file."
+)
+def profile_command(
+    script: str,
+    args: tuple,
+    sort: str,
+    limit: int,
+    slow_threshold: Optional[float],
+    output: Optional[str],
+):
+    """
+    Run python SCRIPT under cProfile and report ORM query statistics
+    """
+    connector = SQLiteDBConnector()
+    previous_profiler = connector.profiler
+    previous_argv = sys.argv[:]
+    profiler = QueryProfiler(slow_query_threshold=slow_threshold)
+    python_profiler = cProfile.Profile()
+
+    connector.set_profiler(profiler)
+    sys.argv = [script, *args]
+    sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+
+    try:
+        python_profiler.runcall(runpy.run_path, script, run_name="__main__")
+    except SystemExit:
+        pass
+    finally:
+        connector.set_profiler(previous_profiler)
+        sys.argv = previous_argv
+        sys.path.pop(0)
+
+    stats = pstats.Stats(python_profiler, stream=sys.stdout)
+    stats.sort_stats(sort).print_stats(limit)
+
+    if output is not None:
+        stats.dump_stats(output)
+
+    profiler.view_table_info(limit)
+
+
+@cli.command("analyze")
+@DATABASE
+@click.option(
+    "-q", "--query", "queries", multiple=True, help="Statement to explain (repeatable)."
+)
+@click.option(
+    "-f",
+    "--file",
+    "queries_file",
+    type=click.Path(exists=True, dir_okay=False),
+    help="File with statements separated by ';'.",
+)
+def analyze_command(database: str, queries: tuple, queries_file: Optional[str]):
+    """
+    Run ANALYZE and explain statements, suggesting missing indexes
+    """
+    session = SQLiteSession(database)
+    SQLiteMaintenance(session).analyze()
+
+    statements = list(queries)
+
+    if queries_file is not None:
+        statements += read_statements(queries_file)
+
+    analyzer = QueryPlanAnalyzer(warn=False)
+
+    for statement in statements:
+        if analyzer.analyze(statement) is None:
+            click.echo(f"Cannot explain: {statement}", err=True)
+
+    if statements:
+        analyzer.view_table_info()
+
+    click.echo(
+        f"Analyzed {database}, {len(analyzer.get_issues())} statements with issues"
+    )
+
+
+@cli.command("vacuum")
+@DATABASE
+@click.option(
+    "--into",
+    type=click.Path(dir_okay=False),
+    help="Write compacted copy to file instead of rebuilding in place.",
+)
+def vacuum_command(database: str, into: Optional[str]):
+    """
+    Rebuild database file to free unused pages
+    """
+    maintenance = SQLiteMaintenance(SQLiteSession(database))
+    before = maintenance.get_stats()["file_size"]
+    maintenance.vacuum(into)
+
+    if into is None:
+        after = maintenance.get_stats()["file_size"]
+        click.echo(f"Vacuumed {database}: {before} -> {after} bytes")
+    else:
+        click.echo(f"Vacuumed {database} into {into}: {os.path.getsize(into)} bytes")
+
+
+@cli.command("optimize")
+@DATABASE
+@click.option(
+    "--analysis-limit",
+    type=int,
+    default=400,
+    show_default=True,
+    help="Rows scanned per index (0 - no limit).",
+)
+def optimize_command(database: str, analysis_limit: int):
+    """
+    Run PRAGMA optimize (refresh stale planner statistics)
+    """
+    SQLiteMaintenance(SQLiteSession(database)).optimize(analysis_limit)
+    click.echo(f"Optimized {database}")
+
+
+@cli.command("migrate")
+@DATABASE
+@click.argument("old_model")
+@click.argument("new_model")
+@click.option("--table", required=True, help="Table of the models.")
+@click.option("--new-table", default=None, help="Rename table to.")
+@click.option("--name", default=None, help="Migration name (checksum by default).")
+@MIGRATIONS_DIR
+def migrate_command(
+    database: str,
+    old_model: str,
+    new_model: str,
+    table: str,
+    new_table: Optional[str],
+    name: Optional[str],
+    migrations_dir: str,
+):
+    """
+    Migrate table from OLD_MODEL to NEW_MODEL (given as module:Class)
+    """
+    # models are imported first: their modules may connect the process-wide
+    # connector to another database, the session reconnects it to DATABASE
+    old_class, new_class = load_object(old_model), load_object(new_model)
+    manager = SQLiteMigrationManager(
+        SQLiteSession(database), migrations_dir=migrations_dir
+    )
+
+    try:
+        applied = manager.migrate_from_model(
+            old_class, new_class, table, new_table, name
+        )
+    except MigrationError as ex:
+        raise click.ClickException(str(ex))
+
+    click.echo("Migration applied" if applied else "Migration is already applied")
+    manager.view_table_info()
+
+
+@cli.command("revert")
+@DATABASE
+@click.option(
+    "--id",
+    "index_key",
+    type=int,
+    default=-1,
+    show_default=True,
+    help="Migration id in history (-1 - last).",
+)
+@MIGRATIONS_DIR
+def revert_command(database: str, index_key: int, migrations_dir: str):
+    """
+    Restore database from the backup taken before migration
+    """
+    manager = SQLiteMigrationManager(
+        SQLiteSession(database), migrations_dir=migrations_dir
+    )
+
+    try:
+        manager.revert_migration(index_key)
+    except MigrationError as ex:
+        raise click.ClickException(str(ex))
+
+    click.echo(f"Reverted {database}")
+
+
+@cli.command("stats")
+@DATABASE
+def stats_command(database: str):
+    """
+    Show page count, freelist and table sizes (dbstat)
+    """
+    SQLiteMaintenance(SQLiteSession(database)).view_table_info()
+
+
+if __name__ == "__main__":
+    cli()
@@ -1,11 +1,20 @@
+import os
+import time
 import sqlite3
+import tempfile
 from abc import ABC, abstractmethod
-from typing import Tuple
-
-from rich import print
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Tuple, Callable, Optional, Iterable, Iterator
 
 from loguru import logger
 
+from sqlsymphony_orm.datatypes.adapters import DETECT_TYPES, adapt_values
+from sqlsymphony_orm.exceptions import SQLSymphonyException
+from sqlsymphony_orm.performance.profiler import QueryProfiler
+
+if TYPE_CHECKING:
+    from sqlsymphony_orm.database.maintenance import MaintenanceScheduler
+
 
 class DBConnector(ABC):
     """
@@ -70,6 +79,9 @@ class SQLiteDBConnector(DBConnector):
     This class describes a sqlite db connector.
     """
 
+    profiler: Optional[QueryProfiler] = None
+    maintenance: Optional["MaintenanceScheduler"] = None
+
     def __new__(cls, *args, **kwargs):
         """
         New class
@@ -93,25 +105,66 @@ class SQLiteDBConnector(DBConnector):
         """
         Closes a connection.
         """
+        from rich import print
+
+        if self.maintenance is not None:
+            self.maintenance.before_close(self._connection)
+            self.maintenance.stop()
+
         self._connection.close()
         print("[bold]Connection has been closed[/bold]")
         logger.info("Close Database Connection")
 
     def connect(self, database_name: str = "database.db"):
         """
-        Connect to database
+        Connect to database. Columns declared with registered field types are
+        decoded by the sqlite3 cursor (see datatypes.adapters).
 
         :param		database_name:	The database name
         :type		database_name:	str
         """
         pragmas = ["PRAGMA foreign_keys = 1"]
-        self._connection = sqlite3.connect(database_name)
+
+        if self.maintenance is not None and hasattr(self, "_connection"):
+            self.maintenance.before_close(self._connection)
+
+        self._connection = sqlite3.connect(database_name, detect_types=DETECT_TYPES)
         self.database_name = database_name
-        logger.info(f"[{database_name}] Connect database...")
+        self._transaction_depth = 0
+        logger.info("[{}] Connect database...", database_name)
 
         for pragma in pragmas:
             self._connection.execute(pragma)
-            logger.debug(f"Set pragma: {pragma}")
+            logger.debug("Set pragma: {}", pragma)
+
+        if self.maintenance is not None:
+            self.maintenance.start(database_name)
+
+    def set_profiler(self, profiler: Optional[QueryProfiler]):
+        """
+        Record wall time and rows of every executed statement in profiler
+        (None - disable profiling)
+
+        :param		profiler:  The profiler
+        :type		profiler:  Optional[QueryProfiler]
+        """
+        self.profiler = profiler
+
+    def set_maintenance(self, maintenance: Optional["MaintenanceScheduler"]):
+        """
+        Attach maintenance scheduler to the connection: it is started for the
+        current database and restarted on connect (None - detach)
+
+        :param		maintenance:  The maintenance scheduler
+        :type		maintenance:  Optional[MaintenanceScheduler]
+        """
+        if self.maintenance is not None and self.maintenance is not maintenance:
+            self.maintenance.stop()
+
+        self.maintenance = maintenance
+
+        if maintenance is not None and hasattr(self, "database_name"):
+            maintenance.start(self.database_name)
 
     def commit(self):
         """
@@ -120,6 +173,157 @@ class SQLiteDBConnector(DBConnector):
         logger.info("Commit changes to database")
         self._connection.commit()
 
+    @contextmanager
+    def transaction(self) -> Iterator["SQLiteDBConnector"]:
+        """
+        Run statements in one transaction: commit on success, rollback on
+        exception. Inside it `fetch` does not commit, nested calls join the
+        outer transaction.
+
+        :returns:	connector
+        :rtype:		Iterator[SQLiteDBConnector]
+        """
+        if self._transaction_depth:
+            self._transaction_depth += 1
+
+            try:
+                yield self
+            finally:
+                self._transaction_depth -= 1
+
+            return
+
+        self.commit()
+        self._connection.execute("BEGIN IMMEDIATE")
+        self._transaction_depth = 1
+        logger.debug("[{}] Begin transaction", self.database_name)
+
+        try:
+            yield self
+        except BaseException:
+            logger.warning("[{}] Rollback transaction", self.database_name)
+            self._connection.rollback()
+            raise
+        else:
+            self._connection.commit()
+            logger.debug("[{}] Commit transaction", self.database_name)
+        finally:
+            self._transaction_depth = 0
+
+    def backup(
+        self,
+        target_name: str,
+        pages: int = 1024,
+        progress: Optional[Callable[[int, int, int], None]] = None,
+        sleep: float = 0.05,
+        compact: bool = False,
+    ):
+        """
+        Online backup of database with the SQLite backup API. Pages are copied
+        in batches of `pages` with `sleep` seconds between them, so writers
+        are not blocked for the whole copy and the result is consistent. With
+        `compact` the database is written compacted in one pass with VACUUM
+        INTO (a consistent snapshot, without batches and progress) and the
+        copy replaces the target file; the copy holds one read transaction
+        until it is written, so it is not incremental.
+
+        :param		target_name:  The backup file name
+        :type		target_name:  str
+        :param		pages:		  The number of pages copied per step
+        :type		pages:		  int
+        :param		progress:	  The progress callback (status, remaining, total)
+        :type		progress:	  Optional[Callable[[int, int, int], None]]
+        :param		sleep:		  The pause between steps in seconds
+        :type		sleep:		  float
+        :param		compact:	  Write compacted copy with VACUUM INTO
+        :type		compact:	  bool
+
+        :raises		SQLSymphonyException:  compact with pages or progress
+        """
+        if compact and (pages != 1024 or progress is not None):
+            raise SQLSymphonyException(
+                "Compacted backup is written in one pass, without pages and progress"
+            )
+
+        logger.info("[{}] Backup database to {}", self.database_name, target_name)
+        self.commit()
+
+        if compact:
+            # VACUUM INTO needs a new or empty file: write it next to target
+            handle, temp_name = tempfile.mkstemp(
+                dir=os.path.dirname(os.path.abspath(target_name)), suffix=".db"
+            )
+            os.close(handle)
+
+            try:
+                self._connection.execute("VACUUM INTO ?", (temp_name,))
+                os.replace(temp_name, target_name)
+            except BaseException:
+                os.remove(temp_name)
+                raise
+
+            return
+
+        target = sqlite3.connect(target_name)
+
+        try:
+            self._connection.backup(
+                target,
+                pages=pages,
+                progress=progress or self._log_backup_progress,
+                sleep=sleep,
+            )
+        finally:
+            target.close()
+
+    def restore(
+        self,
+        source_name: str,
+        pages: int = 1024,
+        progress: Optional[Callable[[int, int, int], None]] = None,
+        sleep: float = 0.05,
+    ):
+        """
+        Restore database from backup file with the SQLite backup API.
+
+        :param		source_name:  The backup file name
+        :type		source_name:  str
+        :param		pages:		  The number of pages copied per step
+        :type		pages:		  int
+        :param		progress:	  The progress callback (status, remaining, total)
+        :type		progress:	  Optional[Callable[[int, int, int], None]]
+        :param		sleep:		  The pause between steps in seconds
+        :type		sleep:		  float
+        """
+        logger.info("[{}] Restore database from {}", self.database_name, source_name)
+        self.commit()
+
+        source = sqlite3.connect(source_name)
+
+        try:
+            source.backup(
+                self._connection,
+                pages=pages,
+                progress=progress or self._log_backup_progress,
+                sleep=sleep,
+            )
+        finally:
+            source.close()
+
+    @staticmethod
+    def _log_backup_progress(status: int, remaining: int, total: int):
+        """
+        Default backup progress callback
+
+        :param		status:		The status of the last step
+        :type		status:		int
+        :param		remaining:	The remaining pages
+        :type		remaining:	int
+        :param		total:		The total pages
+        :type		total:		int
+        """
+        logger.debug("[Backup] {}/{} pages copied", total - remaining, total)
+
     def fetch(self, query: str, values: Tuple = (), get_cursor: bool = False) -> list:
         """
         Fetch SQL query
@@ -133,14 +337,84 @@ class SQLiteDBConnector(DBConnector):
         :rtype:		list
         """
         cursor = self._connection.cursor()
-        self.commit()
 
-        logger.debug(f"Fetch query: {query} {values}")
+        if not self._transaction_depth:
+            self.commit()
+
+        logger.debug("Fetch query: {} {}", query, values)
+        profiler = self.profiler
+
+        if self.maintenance is not None:
+            self.maintenance.touch()
+
+        if profiler is not None:
+            started = time.perf_counter()
+
+        try:
+            cursor.execute(query, adapt_values(values))
+        except Exception as ex:
+            logger.error("An exception occurred while executing the request: {}", ex)
+            raise ex
+
+        result = cursor.fetchall()
+
+        if profiler is not None:
+            profiler.record(query, values, time.perf_counter() - started, len(result))
+
+        return [cursor, result] if get_cursor else result
+
+    def explain(self, query: str, values: Tuple = ()) -> list:
+        """
+        Get EXPLAIN QUERY PLAN rows of query. The query is only prepared, so
+        it is neither committed nor profiled.
+
+        :param		query:	 The query
+        :type		query:	 str
+        :param		values:	 The values
+        :type		values:	 Tuple
+
+        :returns:	rows (id, parent, notused, detail)
+        :rtype:		list
+        """
+        return self._connection.execute(
+            f"EXPLAIN QUERY PLAN {query}", adapt_values(values)
+        ).fetchall()
+
+    def executemany(self, query: str, values: Iterable[Tuple]) -> int:
+        """
+        Execute SQL query for each values tuple
+
+        :param		query:	 The query
+        :type		query:	 str
+        :param		values:	 The values
+        :type		values:	 Iterable[Tuple]
+
+        :returns:	number of modified rows
+        :rtype:		int
+        """
+        if not self._transaction_depth:
+            self.commit()
+
+        logger.debug("Execute many: {}", query)
+        profiler = self.profiler
+
+        if self.maintenance is not None:
+            self.maintenance.touch()
+
+        if profiler is not None:
+            started = time.perf_counter()
 
         try:
-            cursor.execute(query, values)
+            cursor = self._connection.executemany(
+                query, (adapt_values(row) for row in values)
+            )
         except Exception as ex:
-            logger.error(f"An exception occurred while executing the request: {ex}")
+            logger.error("An exception occurred while executing the request: {}", ex)
             raise ex
 
-        return [cursor, cursor.fetchall()] if get_cursor else cursor.fetchall()
+        if profiler is not None:
+            profiler.record(
+                query, "<executemany>", time.perf_counter() - started, cursor.rowcount
+            )
+
+        return cursor.rowcount
@@ -0,0 +1,444 @@
+import os
+import time
+import atexit
+import sqlite3
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from sqlsymphony_orm.models.session_models import SQLiteSession
+
+MEMORY_DATABASE = ":memory:"
+AUTO_VACUUM_INCREMENTAL = 2
+# check all tables, not only those used by the connection (SQLite 3.46+)
+OPTIMIZE_ALL_TABLES = 0x10002
+
+
+class SQLiteMaintenance:
+    """
+    Maintenance operations of session database: statistics of pages and
+    table sizes (dbstat), ANALYZE, PRAGMA optimize and VACUUM.
+    """
+
+    def __init__(self, session: "SQLiteSession"):
+        """
+        Constructs a new instance.
+
+        :param		session:  The session
+        :type		session:  SQLiteSession
+        """
+        self.session = session
+
+    def pragma(self, name: str) -> object:
+        """
+        Get value of pragma
+
+        :param		name:  The pragma name
+        :type		name:  str
+
+        :returns:	pragma value
+        :rtype:		object
+        """
+        rows = self.session.execute(f"PRAGMA {name}")
+
+        return rows[0][0] if rows else None
+
+    def get_table_sizes(self) -> Optional[List[Dict]]:
+        """
+        Gets sizes of tables and indexes from dbstat virtual table.
+
+        :returns:	name, pages, bytes and unused bytes of every btree, largest
+                    first, or None if sqlite is compiled without dbstat
+        :rtype:		Optional[List[Dict]]
+        """
+        try:
+            rows = self.session.execute(
+                "SELECT name, COUNT(*), SUM(pgsize), SUM(unused) FROM dbstat "
+                "GROUP BY name ORDER BY SUM(pgsize) DESC"
+            )
+        except sqlite3.OperationalError as ex:
+            logger.warning("[Maintenance] dbstat is not available: {}", ex)
+            return None
+
+        return [
+            {"name": row[0], "pages": row[1], "bytes": row[2], "unused": row[3]}
+            for row in rows
+        ]
+
+    def get_stats(self) -> Dict:
+        """
+        Gets the database statistics.
+
+        :returns:	page size and counts, freelist, journal mode, file size and
+                    table sizes
+        :rtype:		Dict
+        """
+        database_file = str(self.session.database_file)
+        page_size = self.pragma("page_size")
+        page_count = self.pragma("page_count")
+        freelist_count = self.pragma("freelist_count")
+
+        return {
+            "database": database_file,
+            "file_size": (
+                os.path.getsize(database_file) if os.path.exists(database_file) else 0
+            ),
+            "page_size": page_size,
+            "page_count": page_count,
+            "freelist_count": freelist_count,
+            "free_bytes": page_size * freelist_count,
+            "journal_mode": self.pragma("journal_mode"),
+            "auto_vacuum": self.pragma("auto_vacuum"),
+            "tables": self.get_table_sizes(),
+        }
+
+    def analyze(self, table_name: Optional[str] = None):
+        """
+        Gather statistics for the query planner (ANALYZE)
+
+        :param		table_name:	 The table name (whole database by default)
+        :type		table_name:	 Optional[str]
+        """
+        logger.info("[Maintenance] Analyze {}", table_name or "database")
+        self.session.execute(
+            "ANALYZE" if table_name is None else f"ANALYZE {table_name}"
+        )
+
+    def optimize(self, analysis_limit: Optional[int] = None):
+        """
+        Run PRAGMA optimize: ANALYZE only tables whose statistics are stale.
+        `analysis_limit` bounds rows scanned per index, so it is cheap enough
+        to run periodically.
+
+        :param		analysis_limit:	 The analysis limit
+        :type		analysis_limit:	 Optional[int]
+        """
+        logger.info("[Maintenance] Optimize {}", self.session.database_file)
+
+        if analysis_limit is not None:
+            self.session.execute(f"PRAGMA analysis_limit = {int(analysis_limit)}")
+
+        self.session.execute("PRAGMA optimize")
+
+    def vacuum(self, into: Optional[str] = None):
+        """
+        Rebuild database file to free unused pages (VACUUM), or write
+        compacted copy of it to `into` (VACUUM INTO)
+
+        :param		into:  The target file
+        :type		into:  Optional[str]
+        """
+        logger.info("[Maintenance] Vacuum {}", self.session.database_file)
+
+        if into is None:
+            self.session.execute("VACUUM")
+        else:
+            self.session.execute("VACUUM INTO ?", (str(into),))
+
+    def enable_incremental_vacuum(self):
+        """
+        Switch database to auto_vacuum = INCREMENTAL, so freed pages can be
+        reclaimed in slices (see MaintenanceScheduler). Existing databases
+        are rebuilt with VACUUM to apply it.
+        """
+        if self.pragma("auto_vacuum") == AUTO_VACUUM_INCREMENTAL:
+            return
+
+        self.session.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self.vacuum()
+
+    def view_table_info(self):
+        """
+        View database statistics in table view
+        """
+        from rich.console import Console
+        from rich.table import Table
+
+        stats = self.get_stats()
+        table = Table(title=f"SQLSymphonyORM Database {stats['database']}")
+        table.add_column("Name", style="blue")
+        table.add_column("Pages", style="cyan")
+        table.add_column("Bytes", style="green")
+        table.add_column("Unused bytes", style="magenta")
+
+        for key in ("file_size", "page_size", "page_count", "freelist_count"):
+            table.add_row(key, "", str(stats[key]), "")
+
+        table.add_row("journal_mode", "", str(stats["journal_mode"]), "")
+
+        for size in stats["tables"] or []:
+            table.add_row(
+                size["name"],
+                str(size["pages"]),
+                str(size["bytes"]),
+                str(size["unused"]),
+            )
+
+        console = Console()
+        console.print(table)
+
+
+class MaintenanceScheduler(object):
+    """
+    Background maintenance of the connector database.
+
+    Attached to SQLiteDBConnector (see set_maintenance) it runs PRAGMA
+    optimize on the connection before it is closed (the connection knows
+    which tables its queries used), and a daemon thread with its own
+    connection runs, when the database was idle for `idle_after` seconds:
+    passive WAL checkpoints, `incremental_vacuum` in slices of
+    `vacuum_pages` pages (only with auto_vacuum = INCREMENTAL) and interval
+    PRAGMA optimize. The thread connection never waits for locks: a task
+    that meets a busy database is skipped until the next tick, so
+    foreground statements wait at most for one slice.
+    """
+
+    def __init__(
+        self,
+        optimize_on_close: bool = True,
+        optimize_interval: Optional[float] = 3600.0,
+        analysis_limit: int = 400,
+        vacuum_pages: int = 64,
+        checkpoint_interval: Optional[float] = 60.0,
+        idle_after: float = 1.0,
+        poll_interval: float = 0.5,
+    ) -> None:
+        """
+        Constructs a new instance.
+
+        :param		optimize_on_close:	  Run PRAGMA optimize before close
+        :type		optimize_on_close:	  bool
+        :param		optimize_interval:	  The optimize interval in seconds
+        :type		optimize_interval:	  Optional[float]
+        :param		analysis_limit:		  Rows scanned per index by optimize
+        :type		analysis_limit:		  int
+        :param		vacuum_pages:		  Pages freed per slice (0 - disable)
+        :type		vacuum_pages:		  int
+        :param		checkpoint_interval:  The WAL checkpoint interval in seconds
+        :type		checkpoint_interval:  Optional[float]
+        :param		idle_after:			  Idle time before background tasks run
+        :type		idle_after:			  float
+        :param		poll_interval:		  The background thread tick in seconds
+        :type		poll_interval:		  float
+        """
+        self.optimize_on_close = optimize_on_close
+        self.optimize_interval = optimize_interval
+        self.analysis_limit = analysis_limit
+        self.vacuum_pages = vacuum_pages
+        self.checkpoint_interval = checkpoint_interval
+        self.idle_after = idle_after
+        self.poll_interval = poll_interval
+        self.database_file: Optional[str] = None
+        self.last_activity = time.monotonic()
+        self.last_run = {"optimize": time.monotonic(), "checkpoint": 0.0}
+        self.stats = {"optimize": 0, "checkpoint": 0, "vacuum_pages": 0, "skipped": 0}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def touch(self):
+        """
+        Mark database as used (called by connector for every statement)
+        """
+        self.last_activity = time.monotonic()
+
+    def is_idle(self) -> bool:
+        """
+        Determines if database was idle for `idle_after` seconds.
+
+        :returns:	True if idle, False otherwise.
+        :rtype:		bool
+        """
+        return time.monotonic() - self.last_activity >= self.idle_after
+
+    def start(self, database_file: str):
+        """
+        Start background thread for database file (restarting it for another
+        file). In-memory databases are private to their connection, so only
+        the optimize on close is done for them.
+
+        :param		database_file:	The database file
+        :type		database_file:	str
+        """
+        database_file = str(database_file)
+
+        with self._lock:
+            if self._thread is not None and self.database_file == database_file:
+                return
+
+        self.stop()
+        self.database_file = database_file
+
+        if database_file == MEMORY_DATABASE:
+            return
+
+        with self._lock:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="sqlsymphony-maintenance", daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.stop)
+
+        logger.debug("[Maintenance] Scheduler started for {}", database_file)
+
+    def stop(self):
+        """
+        Stop background thread
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+
+        if thread is None:
+            return
+
+        self._stop.set()
+        thread.join()
+        atexit.unregister(self.stop)
+        logger.debug("[Maintenance] Scheduler stopped for {}", self.database_file)
+
+    def _run(self):
+        """
+        Background thread: run pending tasks on idle database
+        """
+        connection = sqlite3.connect(
+            self.database_file, timeout=0, isolation_level=None
+        )
+
+        try:
+            while not self._stop.wait(self.poll_interval):
+                if self.is_idle():
+                    self.run_pending(connection)
+        finally:
+            connection.close()
+
+    def is_due(self, task: str, interval: Optional[float]) -> bool:
+        """
+        Determines if interval task is due.
+
+        :param		task:	   The task name
+        :type		task:	   str
+        :param		interval:  The interval (None - disabled)
+        :type		interval:  Optional[float]
+
+        :returns:	True if due, False otherwise.
+        :rtype:		bool
+        """
+        return (
+            interval is not None and time.monotonic() - self.last_run[task] >= interval
+        )
+
+    def run_pending(self, connection: sqlite3.Connection):
+        """
+        Run due tasks on connection: one task failing on busy database does
+        not stop the others
+
+        :param		connection:	 The connection (autocommit)
+        :type		connection:	 sqlite3.Connection
+        """
+        tasks = []
+
+        if self.is_due("checkpoint", self.checkpoint_interval):
+            tasks.append(self.checkpoint)
+
+        if self.vacuum_pages:
+            tasks.append(self.incremental_vacuum)
+
+        if self.is_due("optimize", self.optimize_interval):
+            tasks.append(self.optimize)
+
+        for task in tasks:
+            try:
+                task(connection)
+            except sqlite3.OperationalError as ex:
+                self.stats["skipped"] += 1
+                logger.debug("[Maintenance] {} skipped: {}", task.__name__, ex)
+
+    def checkpoint(self, connection: sqlite3.Connection):
+        """
+        Passive WAL checkpoint: copies frames readers do not need any more,
+        never waits for readers or writers
+
+        :param		connection:	 The connection
+        :type		connection:	 sqlite3.Connection
+        """
+        self.last_run["checkpoint"] = time.monotonic()
+
+        if connection.execute("PRAGMA journal_mode").fetchone()[0].lower() != "wal":
+            return
+
+        busy, log, checkpointed = connection.execute(
+            "PRAGMA wal_checkpoint(PASSIVE)"
+        ).fetchone()
+        self.stats["checkpoint"] += 1
+        logger.debug("[Maintenance] Checkpoint: {}/{} frames", checkpointed, log)
+
+    def incremental_vacuum(self, connection: sqlite3.Connection):
+        """
+        Free one slice of `vacuum_pages` pages from the freelist (only with
+        auto_vacuum = INCREMENTAL)
+
+        :param		connection:	 The connection
+        :type		connection:	 sqlite3.Connection
+        """
+        if connection.execute("PRAGMA auto_vacuum").fetchone()[0] != (
+            AUTO_VACUUM_INCREMENTAL
+        ):
+            return
+
+        freelist_count = connection.execute("PRAGMA freelist_count").fetchone()[0]
+
+        if not freelist_count:
+            return
+
+        pages = min(freelist_count, self.vacuum_pages)
+        connection.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+        self.stats["vacuum_pages"] += pages
+        logger.debug("[Maintenance] Incremental vacuum: {} pages", pages)
+
+    def optimize(self, connection: sqlite3.Connection, all_tables: bool = True):
+        """
+        PRAGMA optimize with `analysis_limit`. Interval runs use a connection
+        without query history, so they check all tables (SQLite 3.46+, older
+        versions rely on optimize before close).
+
+        :param		connection:	 The connection
+        :type		connection:	 sqlite3.Connection
+        :param		all_tables:	 Check all tables
+        :type		all_tables:	 bool
+        """
+        self.last_run["optimize"] = time.monotonic()
+        connection.execute(f"PRAGMA analysis_limit = {int(self.analysis_limit)}")
+        connection.execute(
+            f"PRAGMA optimize = {OPTIMIZE_ALL_TABLES}"
+            if all_tables
+            else "PRAGMA optimize"
+        )
+        self.stats["optimize"] += 1
+        logger.debug("[Maintenance] Optimize {}", self.database_file)
+
+    def before_close(self, connection: sqlite3.Connection):
+        """
+        Run PRAGMA optimize on connection that is about to be closed (closed
+        connections and connections inside a transaction are left alone)
+
+        :param		connection:	 The connection
+        :type		connection:	 sqlite3.Connection
+        """
+        if not self.optimize_on_close:
+            return
+
+        try:
+            in_transaction = connection.in_transaction
+        except sqlite3.ProgrammingError:
+            return
+
+        if in_transaction:
+            return
+
+        try:
+            self.optimize(connection, all_tables=False)
+        except sqlite3.Error as ex:
+            logger.warning("[Maintenance] Optimize before close failed: {}", ex)
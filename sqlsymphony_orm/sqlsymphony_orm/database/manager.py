@@ -1,10 +1,19 @@
+import time
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable, Optional
 from loguru import logger
 
 from sqlsymphony_orm.queries import QueryBuilder
+from sqlsymphony_orm.performance.cache import QueryResultCache, get_query_tables
+from sqlsymphony_orm.performance.profiler import QueryProfiler
+from sqlsymphony_orm.performance.explain import QueryPlanAnalyzer
 from sqlsymphony_orm.database.connection import DBConnector, SQLiteDBConnector
-from sqlsymphony_orm.models.orm_models import Model
+from sqlsymphony_orm.models.relations import prefetch_related, select_related
+
+if TYPE_CHECKING:
+    from sqlsymphony_orm.database.maintenance import MaintenanceScheduler
+    from sqlsymphony_orm.performance.parallel import ParallelScanner
+    from sqlsymphony_orm.models.orm_models import Model
 
 
 class DatabaseSession(ABC):
@@ -82,7 +91,7 @@ class SQLiteDatabaseSession(DatabaseSession):
             try:
                 self.connector.commit()
             except Exception as ex:
-                logger.error(f"Error commit changes: {ex}")
+                logger.error("Error commit changes: {}", ex)
 
         self.connector.close_connection()
 
@@ -92,7 +101,7 @@ class ModelManager(ABC):
     This class describes a db manager.
     """
 
-    def __init__(self, model_class: Model):
+    def __init__(self, model_class: "Model"):
         """
         Constructs a new instance.
 
@@ -136,7 +145,13 @@ class SQLiteModelManager(ModelManager):
     This class describes a sqlite db manager.
     """
 
-    def __init__(self, model_class: Model, database_name: str = "database.db"):
+    def __init__(
+        self,
+        model_class: "Model",
+        database_name: str = "database.db",
+        result_cache: Optional[QueryResultCache] = None,
+        plan_analyzer: Optional[QueryPlanAnalyzer] = None,
+    ):
         """
         Constructs a new instance.
 
@@ -144,14 +159,23 @@ class SQLiteModelManager(ModelManager):
         :type		model_class:	Model
         :param		database_name:	The database name
         :type		database_name:	str
+        :param		result_cache:	The opt-in query result cache
+        :type		result_cache:	Optional[QueryResultCache]
+        :param		plan_analyzer:	The opt-in query plan analyzer
+        :type		plan_analyzer:	Optional[QueryPlanAnalyzer]
         """
         self.model_class = model_class
         self._model_fields = model_class._original_fields.keys()
+        self.result_cache = result_cache
+        self.plan_analyzer = plan_analyzer
 
         q = QueryBuilder()
 
         self.q = q.SELECT(*self._model_fields).FROM(self.model_class.table_name)
         self._connector = SQLiteDBConnector()
+        self._select_related: tuple = ()
+        self._select_related_options: dict = {}
+        self._prefetch_related: tuple = ()
 
         if self.model_class.table_name != "model":
             self._connector.connect(database_name)
@@ -162,20 +186,31 @@ class SQLiteModelManager(ModelManager):
 
         query = f"DROP TABLE IF EXISTS {table_name}"
 
-        logger.warning(f"Drop table: {table_name}")
+        logger.warning("Drop table: {}", table_name)
 
         self._connector.fetch(query)
         self._connector.commit()
+        self.invalidate_result_cache(table_name)
 
     def close_connection(self):
         self._connector.close_connection()
 
+    def invalidate_result_cache(self, table_name: str):
+        """
+        Drop cached query results of table
+
+        :param		table_name:	 The table name
+        :type		table_name:	 str
+        """
+        if self.result_cache is not None:
+            self.result_cache.invalidate_table(table_name)
+
     def insert(
         self,
         table_name: str,
         formatted_fields: dict,
         pk: int,
-        model_class: Model,
+        model_class: "Model",
         ignore: bool = False,
     ):
         """
@@ -211,10 +246,13 @@ class SQLiteModelManager(ModelManager):
         query += f"INTO {table_name} ({columns}) VALUES ({count})"
 
         logger.info(
-            f'[{table_name}] Insert {"(or ignore)" if ignore else ""} new model into database'
+            "[{}] Insert {} new model into database",
+            table_name,
+            "(or ignore)" if ignore else "",
         )
 
         self._connector.fetch(query, values)
+        self.invalidate_result_cache(table_name)
 
     def update(self, table_name: str, key: str, orig_field: str, new_value: str):
         """
@@ -231,9 +269,10 @@ class SQLiteModelManager(ModelManager):
         """
         query = f"UPDATE {table_name} SET {key} = ? WHERE {key} = ?"
 
-        logger.info(f"[{table_name}] Update model: {key}={new_value}")
+        logger.info("[{}] Update model: {}={}", table_name, key, new_value)
 
         self._connector.fetch(query, (new_value, orig_field))
+        self.invalidate_result_cache(table_name)
 
     def filter(self, first: bool = False, *args, **kwargs) -> list:
         """
@@ -256,6 +295,45 @@ class SQLiteModelManager(ModelManager):
         else:
             return result
 
+    def select_related(
+        self,
+        *relations: str,
+        order_by: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> "SQLiteModelManager":
+        """
+        Load models referenced by foreign keys with the next fetch/filter in
+        the same query (LEFT JOIN per relation). The joined query is not
+        served from the result cache.
+
+        :param		relations:	The accessor names
+        :type		relations:	str
+        :param		order_by:	The ORDER BY expression of joined query
+        :type		order_by:	Optional[str]
+        :param		limit:		The maximum number of models
+        :type		limit:		Optional[int]
+
+        :returns:	model manager
+        :rtype:		SQLiteModelManager
+        """
+        self._select_related = relations
+        self._select_related_options = {"order_by": order_by, "limit": limit}
+        return self
+
+    def prefetch_related(self, *relations: str) -> "SQLiteModelManager":
+        """
+        Load relations of models of the next fetch/filter with one IN (...)
+        query per relation per batch
+
+        :param		relations:	The accessor or related names
+        :type		relations:	str
+
+        :returns:	model manager
+        :rtype:		SQLiteModelManager
+        """
+        self._prefetch_related = relations
+        return self
+
     def commit(self):
         """
         Commits changes.
@@ -281,7 +359,7 @@ class SQLiteModelManager(ModelManager):
         query = query[:-1]
         query += ")"
 
-        logger.info(f"Create new table: {table_name}")
+        logger.info("Create new table: {}", table_name)
 
         self._connector.fetch(query)
         self._connector.commit()
@@ -298,19 +376,75 @@ class SQLiteModelManager(ModelManager):
         :type		field_value:  Any
         """
         query = f"DELETE FROM {table_name} WHERE {field_name} = ?"
-        logger.info(f"[{table_name}] Delete model ({field_name}={field_value})")
+        logger.info("[{}] Delete model ({}={})", table_name, field_name, field_value)
 
         self._connector.fetch(query, (field_value,))
+        self.invalidate_result_cache(table_name)
 
     def fetch(self) -> list:
         """
-        Fetches the object.
+        Fetches the object. If result cache is enabled, rows are served from
+        it until the table is written through the ORM or the entry expires.
+        The pending query, select_related and prefetch_related of the manager
+        (shared by the model class) are taken and reset first, so they never
+        leak into the next fetch, even if this one fails.
 
         :returns:	list of objects
         :rtype:		list
         """
-        q = str(self.q)
-        db_results = self._connector.fetch(q)
+        query = self.q
+        select_relations = self._select_related
+        select_options = self._select_related_options
+        prefetch_relations = self._prefetch_related
+
+        self.q = (
+            QueryBuilder().SELECT(*self._model_fields).FROM(self.model_class.table_name)
+        )
+        self._select_related, self._select_related_options = (), {}
+        self._prefetch_related = ()
+
+        if select_relations:
+            results = self._fetch_related(query, select_relations, **select_options)
+        else:
+            results = self._fetch_rows(query)
+
+        if prefetch_relations:
+            prefetch_related(results, *prefetch_relations, connector=self._connector)
+
+        return results
+
+    def _fetch_rows(self, query: QueryBuilder) -> list:
+        """
+        Fetch models of query, through the result cache if it is enabled
+
+        :param		query:	The query
+        :type		query:	QueryBuilder
+
+        :returns:	list of objects
+        :rtype:		list
+        """
+        q = str(query)
+        db_results = None
+
+        if self.result_cache is not None:
+            cache_key = QueryResultCache.make_key(q)
+            db_results = self.result_cache.get(cache_key)
+
+        if db_results is None:
+            if self.plan_analyzer is not None:
+                self.plan_analyzer.analyze(q)
+
+            if self.result_cache is not None:
+                # results read before a concurrent write are not cached
+                tables = get_query_tables(q)
+                version = self.result_cache.get_version(tables)
+
+            db_results = self._connector.fetch(q)
+
+            if self.result_cache is not None:
+                self.result_cache.set(
+                    cache_key, db_results, time.time(), tables, version
+                )
 
         results = []
 
@@ -322,11 +456,89 @@ class SQLiteModelManager(ModelManager):
 
             results.append(model)
 
-        self.q = (
-            QueryBuilder().SELECT(*self._model_fields).FROM(self.model_class.table_name)
+        return results
+
+    def _fetch_related(
+        self,
+        query: QueryBuilder,
+        relations: tuple,
+        order_by: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> list:
+        """
+        Fetch models of query with select_related relations. The WHERE of
+        query is carried over to the joined query, which is not cached: its
+        rows come from several tables.
+
+        :param		query:		The query
+        :type		query:		QueryBuilder
+        :param		relations:	The accessor names
+        :type		relations:	tuple
+        :param		order_by:	The ORDER BY expression
+        :type		order_by:	Optional[str]
+        :param		limit:		The maximum number of models
+        :type		limit:		Optional[int]
+
+        :returns:	list of objects
+        :rtype:		list
+        """
+        table_name = self.model_class.table_name
+        where = query._data["where"]._q
+        condition = f" {where.separator} ".join(
+            f"{table_name}.{key} = ?" for key in where._params
         )
 
-        return results
+        return select_related(
+            self.model_class,
+            *relations,
+            where=condition or None,
+            values=tuple(where._params.values()),
+            order_by=order_by,
+            limit=limit,
+            connector=self._connector,
+        )
+
+    def scan(
+        self,
+        scanner: "ParallelScanner",
+        where: Optional[str] = None,
+        values: tuple = (),
+        reducer: Optional[Callable[[list], Any]] = None,
+        combiner: Optional[Callable[[Any, Any], Any]] = None,
+    ) -> Any:
+        """
+        Scan table of model in parallel over rowid ranges (see
+        ParallelScanner). Rows are not hydrated into models and are streamed
+        range by range with a bounded number of ranges in flight, so exports
+        and aggregations of large tables are not bound by one core and hold
+        only a few ranges in memory.
+
+        :param		scanner:   The parallel scanner
+        :type		scanner:   ParallelScanner
+        :param		where:	   The condition with ? placeholders
+        :type		where:	   Optional[str]
+        :param		values:	   The values of condition
+        :type		values:	   tuple
+        :param		reducer:   The reducer of range rows, run in workers
+        :type		reducer:   Optional[Callable[[list], Any]]
+        :param		combiner:  The combiner of partial results
+        :type		combiner:  Optional[Callable[[Any, Any], Any]]
+
+        :returns:	iterator of rows of model fields in rowid order, iterator of
+                    partial results of ranges (without combiner) or combined
+                    result
+        :rtype:		Any
+        """
+        table_name = self.model_class.table_name
+        columns = list(self._model_fields)
+
+        if combiner is None and reducer is None:
+            return scanner.scan(table_name, columns, where, values)
+
+        if combiner is None:
+            return scanner.map_ranges(table_name, columns, where, values, reducer)
+
+        return scanner.aggregate(table_name, combiner, reducer, columns, where, values)
 
 
 class MultiModelManager(ABC):
@@ -345,7 +557,7 @@ class MultiModelManager(ABC):
         self.database_name = database_name
 
     @abstractmethod
-    def add_model(self, model: Model):
+    def add_model(self, model: "Model"):
         """
         Adds a model.
 
@@ -368,7 +580,7 @@ class MultiModelManager(ABC):
         try:
             del self.models[model_name]
         except KeyError:
-            logger.error(f'Not found model "{model_name}"')
+            logger.error('Not found model "{}"', model_name)
 
     @abstractmethod
     def model_manager(self, model_name: str) -> "ModelManager":
@@ -384,7 +596,7 @@ class MultiModelManager(ABC):
         model = self.models.get(model_name, None)
 
         if model is None:
-            logger.error(f'Not found model "{model_name}"')
+            logger.error('Not found model "{}"', model_name)
             return
 
         return model["manager"]
@@ -403,7 +615,7 @@ class MultiModelManager(ABC):
         model = self.models.get(model_name, None)
 
         if model is None:
-            logger.error(f'Not found model "{model_name}"')
+            logger.error('Not found model "{}"', model_name)
             return
 
         return model["model"]
@@ -424,14 +636,14 @@ class SQLiteMultiModelManager(MultiModelManager):
         self.models = {}
         self.database_name = database_name
 
-    def add_model(self, model: Model):
+    def add_model(self, model: "Model"):
         """
         Adds a model.
 
         :param		model:	The model
         :type		model:	Model
         """
-        logger.info(f"[SQLiteMultiModelManager] New model added: {model._model_name}")
+        logger.info("[SQLiteMultiModelManager] New model added: {}", model._model_name)
         self.models[model._model_name] = {
             "model": model,
             "manager": SQLiteModelManager(model, self.database_name),
@@ -444,11 +656,11 @@ class SQLiteMultiModelManager(MultiModelManager):
         :param		model_name:	 The model name
         :type		model_name:	 str
         """
-        logger.info(f"[SQLiteMultiModelManager] Remove model: {model_name}")
+        logger.info("[SQLiteMultiModelManager] Remove model: {}", model_name)
         try:
             del self.models[model_name]
         except KeyError:
-            logger.error(f'Not found model "{model_name}"')
+            logger.error('Not found model "{}"', model_name)
 
     def model_manager(self, model_name: str) -> "ModelManager":
         """
@@ -463,7 +675,7 @@ class SQLiteMultiModelManager(MultiModelManager):
         model = self.models.get(model_name, None)
 
         if model is None:
-            logger.error(f'Not found model "{model_name}"')
+            logger.error('Not found model "{}"', model_name)
             return
 
         return model["manager"]
@@ -481,7 +693,7 @@ class SQLiteMultiModelManager(MultiModelManager):
         model = self.models.get(model_name, None)
 
         if model is None:
-            logger.error(f'Not found model "{model_name}"')
+            logger.error('Not found model "{}"', model_name)
             return
 
         return model["model"]
@@ -528,7 +740,7 @@ class MultiManager(ABC):
         table_name: str,
         formatted_fields: dict,
         pk: int,
-        model_class: Model,
+        model_class: "Model",
         ignore: bool = False,
     ):
         """
@@ -638,6 +850,70 @@ class SQLiteMultiManager(MultiManager):
     def execute(self, raw_sql_query: str, values: tuple = (), get_cursor: bool = False):
         return self._connector.fetch(raw_sql_query, values, get_cursor)
 
+    def execute_many(self, raw_sql_query: str, values: list) -> int:
+        """
+        Execute raw sql query for each values tuple
+
+        :param		raw_sql_query:	The raw sql query
+        :type		raw_sql_query:	str
+        :param		values:			The values
+        :type		values:			list
+
+        :returns:	number of modified rows
+        :rtype:		int
+        """
+        return self._connector.executemany(raw_sql_query, values)
+
+    def set_profiler(self, profiler: Optional[QueryProfiler]):
+        """
+        Set query profiler of connector (see SQLiteDBConnector.set_profiler)
+
+        :param		profiler:  The profiler
+        :type		profiler:  Optional[QueryProfiler]
+        """
+        self._connector.set_profiler(profiler)
+
+    def set_maintenance(self, maintenance: Optional["MaintenanceScheduler"]):
+        """
+        Set maintenance scheduler of connector (see
+        SQLiteDBConnector.set_maintenance)
+
+        :param		maintenance:  The maintenance scheduler
+        :type		maintenance:  Optional[MaintenanceScheduler]
+        """
+        self._connector.set_maintenance(maintenance)
+
+    def transaction(self):
+        """
+        Transaction context manager (see SQLiteDBConnector.transaction)
+
+        :returns:	context manager
+        :rtype:		ContextManager
+        """
+        return self._connector.transaction()
+
+    def backup(self, target_name: str, **kwargs):
+        """
+        Online backup of database (see SQLiteDBConnector.backup)
+
+        :param		target_name:  The backup file name
+        :type		target_name:  str
+        :param		kwargs:		  The keywords arguments
+        :type		kwargs:		  dictionary
+        """
+        self._connector.backup(target_name, **kwargs)
+
+    def restore(self, source_name: str, **kwargs):
+        """
+        Restore database from backup (see SQLiteDBConnector.restore)
+
+        :param		source_name:  The backup file name
+        :type		source_name:  str
+        :param		kwargs:		  The keywords arguments
+        :type		kwargs:		  dictionary
+        """
+        self._connector.restore(source_name, **kwargs)
+
     def reconnect(self, database_file: str = None):
         """
         reconnect to database
@@ -655,7 +931,7 @@ class SQLiteMultiManager(MultiManager):
         """
         query = f"DROP TABLE IF EXISTS {table_name}"
 
-        logger.warning(f"Drop table: {table_name}")
+        logger.warning("Drop table: {}", table_name)
 
         self._connector.fetch(query)
         self._connector.commit()
@@ -671,7 +947,7 @@ class SQLiteMultiManager(MultiManager):
         table_name: str,
         formatted_fields: dict,
         pk: int,
-        model_class: Model,
+        model_class: "Model",
         ignore: bool = False,
     ):
         """
@@ -707,7 +983,9 @@ class SQLiteMultiManager(MultiManager):
         query += f"INTO {table_name} ({columns}) VALUES ({count})"
 
         logger.info(
-            f'[{table_name}] Insert {"(or ignore)" if ignore else ""} new model into database'
+            "[{}] Insert {} new model into database",
+            table_name,
+            "(or ignore)" if ignore else "",
         )
 
         self._connector.fetch(query, values)
@@ -727,7 +1005,7 @@ class SQLiteMultiManager(MultiManager):
         """
         query = f"UPDATE {table_name} SET {key} = ? WHERE {key} = ?"
 
-        logger.info(f"[{table_name}] Update model: {key}={new_value}")
+        logger.info("[{}] Update model: {}={}", table_name, key, new_value)
 
         self._connector.fetch(query, (new_value, orig_field))
 
@@ -770,7 +1048,7 @@ class SQLiteMultiManager(MultiManager):
         query = query[:-1]
         query += ")"
 
-        logger.info(f"Create new table: {table_name}")
+        logger.info("Create new table: {}", table_name)
 
         self._connector.fetch(query)
         self._connector.commit()
@@ -787,6 +1065,6 @@ class SQLiteMultiManager(MultiManager):
         :type		field_value:  Any
         """
         query = f"DELETE FROM {table_name} WHERE {field_name} = ?"
-        logger.info(f"[{table_name}] Delete model ({field_name}={field_value})")
+        logger.info("[{}] Delete model ({}={})", table_name, field_name, field_value)
 
         self._connector.fetch(query, (field_value,))
@@ -0,0 +1,932 @@
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Type, Union
+
+from loguru import logger
+
+from sqlsymphony_orm.database.connection import SQLiteDBConnector
+from sqlsymphony_orm.datatypes.adapters import DATETIME_SQL_TYPE
+from sqlsymphony_orm.exceptions import SQLSymphonyException
+from sqlsymphony_orm.models.orm_models import Model
+from sqlsymphony_orm.models.session_models import SessionModel
+
+CATALOG_TABLE = "sqlsymphony_partitions"
+ARCHIVE_SCHEMA = "sqlsymphony_archive"
+PERIOD_FORMATS = {"day": "%Y_%m_%d", "month": "%Y_%m", "year": "%Y"}
+
+
+class PartitionTier(Enum):
+    """
+    This class describes a storage tier of partition.
+    """
+
+    HOT = "hot"  # table in the main database
+    WARM = "warm"  # own database file, attached for queries
+    COLD = "cold"  # gzip-compressed database file
+
+
+@dataclass
+class Partition:
+    """
+    This dataclass describes a partition of time-partitioned table.
+    """
+
+    name: str
+    table_name: str
+    start: datetime
+    end: datetime
+    tier: PartitionTier = PartitionTier.HOT
+    file: Optional[str] = None
+
+
+def to_naive_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    """
+    Convert aware datetime to naive UTC, as DateTimeField stores it (naive
+    datetimes are returned as is)
+
+    :param		moment:	 The moment
+    :type		moment:	 Optional[datetime]
+
+    :returns:	naive datetime
+    :rtype:		Optional[datetime]
+    """
+    if moment is None or moment.tzinfo is None:
+        return moment
+
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def get_period_start(moment: datetime, period: str) -> datetime:
+    """
+    Gets the start of period containing moment (aware moment is converted to
+    UTC first).
+
+    :param		moment:	 The moment
+    :type		moment:	 datetime
+    :param		period:	 The period (day, month or year)
+    :type		period:	 str
+
+    :returns:	The period start
+    :rtype:		datetime
+    """
+    moment = to_naive_utc(moment)
+
+    if period == "day":
+        return datetime(moment.year, moment.month, moment.day)
+
+    if period == "month":
+        return datetime(moment.year, moment.month, 1)
+
+    return datetime(moment.year, 1, 1)
+
+
+def get_period_end(start: datetime, period: str) -> datetime:
+    """
+    Gets the start of next period.
+
+    :param		start:	 The period start
+    :type		start:	 datetime
+    :param		period:	 The period (day, month or year)
+    :type		period:	 str
+
+    :returns:	The next period start
+    :rtype:		datetime
+    """
+    if period == "day":
+        return start + timedelta(days=1)
+
+    if period == "month":
+        return (
+            datetime(start.year + 1, 1, 1)
+            if start.month == 12
+            else datetime(start.year, start.month + 1, 1)
+        )
+
+    return datetime(start.year + 1, 1, 1)
+
+
+class TimePartitionedTable:
+    """
+    This class describes a table of model partitioned by time.
+
+    Rows are routed by `timestamp_field` into a table per period
+    (`<table>_2024_05` for months), so inserts and index maintenance touch
+    only the current, small partition. Range queries read only partitions
+    overlapping the range. Old partitions are archived into their own files
+    (warm tier, attached only while they are queried), compressed with gzip
+    (cold tier), detached from the table or dropped, so the main database
+    keeps only the hot working set. The catalog of partitions is kept in
+    `sqlsymphony_partitions` of the main database. Periods are naive, aware
+    timestamps and range bounds are converted to UTC.
+    """
+
+    def __init__(
+        self,
+        model_class: Type[Union[SessionModel, Model]],
+        timestamp_field: str,
+        period: str = "month",
+        archive_dir: str = "archive",
+        connector: Optional[SQLiteDBConnector] = None,
+    ):
+        """
+        Constructs a new instance.
+
+        :param		model_class:		   The model class
+        :type		model_class:		   Type[Union[SessionModel, Model]]
+        :param		timestamp_field:	   The timestamp (DateTimeField) field
+        :type		timestamp_field:	   str
+        :param		period:				   The period (day, month or year)
+        :type		period:				   str
+        :param		archive_dir:		   The directory of archived partitions
+        :type		archive_dir:		   str
+        :param		connector:			   The connector (process-wide by default)
+        :type		connector:			   Optional[SQLiteDBConnector]
+
+        :raises		SQLSymphonyException:  unknown period or timestamp field
+        """
+        if period not in PERIOD_FORMATS:
+            raise SQLSymphonyException(
+                f"Unknown period {period}, expected one of {list(PERIOD_FORMATS)}"
+            )
+
+        if timestamp_field not in model_class._original_fields:
+            raise SQLSymphonyException(
+                f"Model {model_class.__name__} has no field {timestamp_field}"
+            )
+
+        self.model_class = model_class
+        self.table_name = model_class.table_name
+        self.timestamp_field = timestamp_field
+        self.period = period
+        self.archive_dir = Path(archive_dir)
+        self.connector = connector if connector is not None else SQLiteDBConnector()
+        self.fields = list(model_class._original_fields)
+        self.pk_name = next(
+            name
+            for name, field in model_class._original_fields.items()
+            if field.primary_key
+        )
+        self.columns = [field for field in self.fields if field != self.pk_name]
+        self._partitions: Optional[Dict[str, Partition]] = None
+
+        self.connector.fetch(
+            f"CREATE TABLE IF NOT EXISTS {CATALOG_TABLE} (name TEXT PRIMARY KEY, "
+            f"table_name TEXT NOT NULL, start {DATETIME_SQL_TYPE} NOT NULL, "
+            f"end {DATETIME_SQL_TYPE} NOT NULL, tier TEXT NOT NULL, file TEXT)"
+        )
+
+    @property
+    def partitions(self) -> Dict[str, Partition]:
+        """
+        Get partitions of table by name, loaded from catalog on first use
+
+        :returns:	partitions ordered by start
+        :rtype:		Dict[str, Partition]
+        """
+        if self._partitions is None:
+            rows = self.connector.fetch(
+                f"SELECT name, start, end, tier, file FROM {CATALOG_TABLE} "
+                "WHERE table_name = ? ORDER BY start",
+                (self.table_name,),
+            )
+            self._partitions = {
+                name: Partition(
+                    name, self.table_name, start, end, PartitionTier(tier), file
+                )
+                for name, start, end, tier, file in rows
+            }
+
+        return self._partitions
+
+    def get_partition_name(self, moment: datetime) -> str:
+        """
+        Gets the partition name of moment.
+
+        :param		moment:	 The moment
+        :type		moment:	 datetime
+
+        :returns:	The partition name
+        :rtype:		str
+        """
+        start = get_period_start(moment, self.period)
+
+        return f"{self.table_name}_{start.strftime(PERIOD_FORMATS[self.period])}"
+
+    def _save_partition(self, partition: Partition):
+        """
+        Write partition to catalog and cache it
+
+        :param		partition:	The partition
+        :type		partition:	Partition
+        """
+        self._write_partition(partition)
+        self._cache_partition(partition)
+
+    def _write_partition(self, partition: Partition):
+        """
+        Write partition to catalog (in the current transaction, if any)
+
+        :param		partition:	The partition
+        :type		partition:	Partition
+        """
+        self.connector.fetch(
+            f"INSERT OR REPLACE INTO {CATALOG_TABLE} "
+            "(name, table_name, start, end, tier, file) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                partition.name,
+                partition.table_name,
+                partition.start,
+                partition.end,
+                partition.tier.value,
+                partition.file,
+            ),
+        )
+
+    def _cache_partition(self, partition: Partition):
+        """
+        Replace cached partition, keeping partitions ordered by start
+
+        :param		partition:	The partition
+        :type		partition:	Partition
+        """
+        self.partitions[partition.name] = partition
+        self._partitions = dict(
+            sorted(self.partitions.items(), key=lambda item: item[1].start)
+        )
+
+    def _create_table(self, name: str, schema: str = "main"):
+        """
+        Create partition table (with index on timestamp field)
+
+        :param		name:	 The partition name
+        :type		name:	 str
+        :param		schema:	 The database schema
+        :type		schema:	 str
+        """
+        fields = ", ".join(
+            f"{field_name} {sql_type}"
+            for field_name, sql_type in (
+                self.model_class._class_get_formatted_sql_fields().items()
+            )
+        )
+        self.connector.fetch(f"CREATE TABLE IF NOT EXISTS {schema}.{name} ({fields})")
+        self.connector.fetch(
+            f"CREATE INDEX IF NOT EXISTS {schema}.idx_{name}_{self.timestamp_field} "
+            f"ON {name} ({self.timestamp_field})"
+        )
+
+    def get_or_create_partition(self, moment: datetime) -> Partition:
+        """
+        Gets the partition of moment, creating hot partition if needed.
+
+        :param		moment:				   The moment
+        :type		moment:				   datetime
+
+        :returns:	The partition
+        :rtype:		Partition
+
+        :raises		SQLSymphonyException:  partition is archived
+        """
+        name = self.get_partition_name(moment)
+        partition = self.partitions.get(name, None)
+
+        if partition is None:
+            start = get_period_start(moment, self.period)
+            partition = Partition(
+                name, self.table_name, start, get_period_end(start, self.period)
+            )
+            self._create_table(name)
+            self._save_partition(partition)
+            logger.info("[Partitioning] Create partition {}", name)
+        elif partition.tier != PartitionTier.HOT:
+            raise SQLSymphonyException(
+                f"Partition {name} is archived ({partition.tier.value}), "
+                "restore it before writing"
+            )
+
+        return partition
+
+    def _get_moment(self, model: Union[SessionModel, Model]) -> datetime:
+        """
+        Gets the timestamp of model.
+
+        :param		model:				   The model
+        :type		model:				   Union[SessionModel, Model]
+
+        :returns:	The timestamp
+        :rtype:		datetime
+
+        :raises		SQLSymphonyException:  timestamp is not set
+        """
+        moment = getattr(model, self.timestamp_field)
+
+        if not isinstance(moment, datetime):
+            raise SQLSymphonyException(
+                f"Field {self.timestamp_field} of partitioned model is not datetime"
+            )
+
+        return to_naive_utc(moment)
+
+    def _insert_query(self, name: str) -> str:
+        """
+        Build insert query of partition
+
+        :param		name:  The partition name
+        :type		name:  str
+
+        :returns:	query
+        :rtype:		str
+        """
+        return (
+            f"INSERT INTO {name} ({', '.join(self.columns)}) "
+            f"VALUES ({', '.join('?' for _ in self.columns)})"
+        )
+
+    def insert(self, model: Union[SessionModel, Model]) -> Partition:
+        """
+        Insert model into partition of its timestamp. Primary key is
+        assigned by the partition table, so it is unique within partition.
+
+        :param		model:	The model
+        :type		model:	Union[SessionModel, Model]
+
+        :returns:	The partition
+        :rtype:		Partition
+        """
+        partition = self.get_or_create_partition(self._get_moment(model))
+        cursor, _ = self.connector.fetch(
+            self._insert_query(partition.name),
+            tuple(getattr(model, column) for column in self.columns),
+            get_cursor=True,
+        )
+
+        setattr(model, self.pk_name, cursor.lastrowid)
+        model._primary_key["value"] = cursor.lastrowid
+
+        return partition
+
+    def insert_many(self, models: Iterable[Union[SessionModel, Model]]) -> int:
+        """
+        Insert models in one transaction, grouped by partition
+
+        :param		models:	 The models
+        :type		models:	 Iterable[Union[SessionModel, Model]]
+
+        :returns:	number of inserted rows
+        :rtype:		int
+        """
+        groups: Dict[str, List[tuple]] = {}
+
+        for model in models:
+            partition = self.get_or_create_partition(self._get_moment(model))
+            groups.setdefault(partition.name, []).append(
+                tuple(getattr(model, column) for column in self.columns)
+            )
+
+        with self.connector.transaction():
+            for name, rows in groups.items():
+                self.connector.executemany(self._insert_query(name), rows)
+
+        return sum(len(rows) for rows in groups.values())
+
+    def get_partitions(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> List[Partition]:
+        """
+        Gets partitions overlapping time range [start, end).
+
+        :param		start:	The range start (unbounded by default)
+        :type		start:	Optional[datetime]
+        :param		end:	The range end (unbounded by default)
+        :type		end:	Optional[datetime]
+
+        :returns:	partitions ordered by start
+        :rtype:		List[Partition]
+        """
+        start, end = to_naive_utc(start), to_naive_utc(end)
+
+        return [
+            partition
+            for partition in self.partitions.values()
+            if (start is None or partition.end > start)
+            and (end is None or partition.start < end)
+        ]
+
+    def select(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        where: Optional[str] = None,
+        values: Sequence = (),
+        include_cold: bool = False,
+    ) -> List[tuple]:
+        """
+        Select rows of time range [start, end) ordered by timestamp. Only
+        overlapping partitions are read, one by one (warm partitions are
+        attached for the query).
+
+        :param		start:				   The range start
+        :type		start:				   Optional[datetime]
+        :param		end:				   The range end
+        :type		end:				   Optional[datetime]
+        :param		where:				   The condition with ? placeholders
+        :type		where:				   Optional[str]
+        :param		values:				   The values of condition
+        :type		values:				   Sequence
+        :param		include_cold:		   Decompress cold partitions to query them
+        :type		include_cold:		   bool
+
+        :returns:	rows of model fields
+        :rtype:		List[tuple]
+
+        :raises		SQLSymphonyException:  range contains cold partition
+        """
+        rows = []
+
+        for partition_rows in self._query_partitions(
+            ", ".join(self.fields),
+            start,
+            end,
+            where,
+            values,
+            include_cold,
+            f" ORDER BY {self.timestamp_field}",
+        ):
+            rows.extend(partition_rows)
+
+        return rows
+
+    def count(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        where: Optional[str] = None,
+        values: Sequence = (),
+        include_cold: bool = False,
+    ) -> int:
+        """
+        Count rows of time range [start, end) with SELECT COUNT(*) in every
+        overlapping partition. Cold partitions are counted only with
+        include_cold, as in select.
+
+        :param		start:				   The range start
+        :type		start:				   Optional[datetime]
+        :param		end:				   The range end
+        :type		end:				   Optional[datetime]
+        :param		where:				   The condition with ? placeholders
+        :type		where:				   Optional[str]
+        :param		values:				   The values of condition
+        :type		values:				   Sequence
+        :param		include_cold:		   Decompress cold partitions to query them
+        :type		include_cold:		   bool
+
+        :returns:	number of rows
+        :rtype:		int
+
+        :raises		SQLSymphonyException:  range contains cold partition
+        """
+        return sum(
+            rows[0][0]
+            for rows in self._query_partitions(
+                "COUNT(*)", start, end, where, values, include_cold
+            )
+        )
+
+    def _query_partitions(
+        self,
+        columns: str,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        where: Optional[str],
+        values: Sequence,
+        include_cold: bool,
+        suffix: str = "",
+    ) -> Iterator[List[tuple]]:
+        """
+        Run query on every partition overlapping time range [start, end),
+        one by one (warm partitions are attached for the query)
+
+        :param		columns:			   The selected columns
+        :type		columns:			   str
+        :param		start:				   The range start
+        :type		start:				   Optional[datetime]
+        :param		end:				   The range end
+        :type		end:				   Optional[datetime]
+        :param		where:				   The condition with ? placeholders
+        :type		where:				   Optional[str]
+        :param		values:				   The values of condition
+        :type		values:				   Sequence
+        :param		include_cold:		   Decompress cold partitions to query them
+        :type		include_cold:		   bool
+        :param		suffix:				   The query suffix (ORDER BY)
+        :type		suffix:				   str
+
+        :returns:	rows of every partition
+        :rtype:		Iterator[List[tuple]]
+
+        :raises		SQLSymphonyException:  range contains cold partition
+        """
+        start, end = to_naive_utc(start), to_naive_utc(end)
+        conditions, params = [], []
+
+        if start is not None:
+            conditions.append(f"{self.timestamp_field} >= ?")
+            params.append(start)
+
+        if end is not None:
+            conditions.append(f"{self.timestamp_field} < ?")
+            params.append(end)
+
+        if where:
+            conditions.append(f"({where})")
+            params.extend(values)
+
+        condition = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        for partition in self.get_partitions(start, end):
+            if partition.tier == PartitionTier.COLD and not include_cold:
+                raise SQLSymphonyException(
+                    f"Partition {partition.name} is compressed, pass include_cold "
+                    "or decompress it"
+                )
+
+            query = f"SELECT {columns} FROM {{}}{partition.name}{condition}{suffix}"
+
+            if partition.tier == PartitionTier.HOT:
+                yield self.connector.fetch(query.format(""), tuple(params))
+                continue
+
+            with self._attached(partition):
+                yield self.connector.fetch(
+                    query.format(f"{ARCHIVE_SCHEMA}."), tuple(params)
+                )
+
+    def _attached(self, partition: Partition):
+        """
+        Attach file of archived partition as ARCHIVE_SCHEMA
+
+        :param		partition:	The partition
+        :type		partition:	Partition
+
+        :returns:	context manager
+        :rtype:		ContextManager
+        """
+        return _AttachedPartition(self, partition)
+
+    def _get_file(self, partition: Partition) -> str:
+        """
+        Gets the database file of archived partition (temporary decompressed
+        copy of cold partition, to be removed after the query).
+
+        :param		partition:	The partition
+        :type		partition:	Partition
+
+        :returns:	The database file
+        :rtype:		str
+        """
+        if partition.tier == PartitionTier.WARM:
+            return partition.file
+
+        handle, copy = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+
+        try:
+            with gzip.open(partition.file, "rb") as source, open(copy, "wb") as target:
+                shutil.copyfileobj(source, target)
+        except BaseException:
+            os.remove(copy)
+            raise
+
+        return copy
+
+    def archive(self, name: str) -> Partition:
+        """
+        Move hot partition into its own file in archive directory (warm
+        tier). Pages freed in the main database are reclaimed by VACUUM or
+        incremental vacuum.
+
+        :param		name:				   The partition name
+        :type		name:				   str
+
+        :returns:	The partition
+        :rtype:		Partition
+
+        :raises		SQLSymphonyException:  partition is not hot
+        """
+        partition = replace(
+            self._get_partition(name, PartitionTier.HOT),
+            tier=PartitionTier.WARM,
+            file=str((self.archive_dir / f"{name}.db").resolve()),
+        )
+
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+
+        try:
+            with self._attached(partition):
+                self._create_table(name, ARCHIVE_SCHEMA)
+
+                with self.connector.transaction():
+                    self.connector.fetch(
+                        f"INSERT INTO {ARCHIVE_SCHEMA}.{name} SELECT * FROM main.{name}"
+                    )
+                    self.connector.fetch(f"DROP TABLE main.{name}")
+                    self._write_partition(partition)
+        except BaseException:
+            Path(partition.file).unlink(missing_ok=True)
+            raise
+
+        self._cache_partition(partition)
+        logger.info("[Partitioning] Archive partition {} to {}", name, partition.file)
+
+        return partition
+
+    def archive_before(self, moment: datetime) -> List[Partition]:
+        """
+        Archive hot partitions ending before moment
+
+        :param		moment:	 The moment
+        :type		moment:	 datetime
+
+        :returns:	archived partitions
+        :rtype:		List[Partition]
+        """
+        moment = to_naive_utc(moment)
+
+        return [
+            self.archive(partition.name)
+            for partition in list(self.partitions.values())
+            if partition.tier == PartitionTier.HOT and partition.end <= moment
+        ]
+
+    def restore(self, name: str) -> Partition:
+        """
+        Move warm or cold partition back into the main database (hot tier)
+
+        :param		name:  The partition name
+        :type		name:  str
+
+        :returns:	The partition
+        :rtype:		Partition
+        """
+        partition = self._get_partition(name)
+
+        if partition.tier == PartitionTier.HOT:
+            return partition
+
+        if partition.tier == PartitionTier.COLD:
+            partition = self.decompress(name)
+
+        restored = replace(partition, tier=PartitionTier.HOT, file=None)
+        self._create_table(name)
+
+        with self._attached(partition):
+            with self.connector.transaction():
+                self.connector.fetch(
+                    f"INSERT INTO main.{name} SELECT * FROM {ARCHIVE_SCHEMA}.{name}"
+                )
+                self._write_partition(restored)
+
+        self._cache_partition(restored)
+        os.remove(partition.file)
+        logger.info("[Partitioning] Restore partition {}", name)
+
+        return restored
+
+    def compress(self, name: str) -> Partition:
+        """
+        Compress file of warm partition with gzip (cold tier)
+
+        :param		name:  The partition name
+        :type		name:  str
+
+        :returns:	The partition
+        :rtype:		Partition
+        """
+        partition = self._get_partition(name, PartitionTier.WARM)
+        compressed = f"{partition.file}.gz"
+
+        with (
+            open(partition.file, "rb") as source,
+            gzip.open(compressed, "wb") as target,
+        ):
+            shutil.copyfileobj(source, target)
+
+        new_partition = replace(partition, tier=PartitionTier.COLD, file=compressed)
+        self._save_partition(new_partition)
+        os.remove(partition.file)
+        logger.info("[Partitioning] Compress partition {}", name)
+
+        return new_partition
+
+    def decompress(self, name: str) -> Partition:
+        """
+        Decompress file of cold partition (warm tier)
+
+        :param		name:  The partition name
+        :type		name:  str
+
+        :returns:	The partition
+        :rtype:		Partition
+        """
+        partition = self._get_partition(name, PartitionTier.COLD)
+        decompressed = partition.file[: -len(".gz")]
+
+        with (
+            gzip.open(partition.file, "rb") as source,
+            open(decompressed, "wb") as target,
+        ):
+            shutil.copyfileobj(source, target)
+
+        new_partition = replace(partition, tier=PartitionTier.WARM, file=decompressed)
+        self._save_partition(new_partition)
+        os.remove(partition.file)
+        logger.info("[Partitioning] Decompress partition {}", name)
+
+        return new_partition
+
+    def detach(self, name: str) -> str:
+        """
+        Remove archived partition from the table, keeping its file (to be
+        moved to other storage or attached back with attach)
+
+        :param		name:  The partition name
+        :type		name:  str
+
+        :returns:	The partition file
+        :rtype:		str
+        """
+        partition = self._get_partition(name)
+
+        if partition.tier == PartitionTier.HOT:
+            partition = self.archive(name)
+
+        self.connector.fetch(f"DELETE FROM {CATALOG_TABLE} WHERE name = ?", (name,))
+        del self.partitions[name]
+        logger.info("[Partitioning] Detach partition {}: {}", name, partition.file)
+
+        return partition.file
+
+    def attach(self, database_file: str) -> Partition:
+        """
+        Add archived partition file (made by archive or compress) to the
+        table. Period of partition is parsed from its name.
+
+        :param		database_file:		   The partition file (.db or .db.gz)
+        :type		database_file:		   str
+
+        :returns:	The partition
+        :rtype:		Partition
+
+        :raises		SQLSymphonyException:  file name is not partition name
+        """
+        database_file = str(Path(database_file).resolve())
+        name = Path(database_file).name.split(".")[0]
+        prefix = f"{self.table_name}_"
+
+        try:
+            if not name.startswith(prefix):
+                raise ValueError(name)
+
+            start = datetime.strptime(name[len(prefix) :], PERIOD_FORMATS[self.period])
+        except ValueError:
+            raise SQLSymphonyException(
+                f"File {database_file} is not a partition of {self.table_name}"
+            )
+
+        partition = Partition(
+            name,
+            self.table_name,
+            start,
+            get_period_end(start, self.period),
+            PartitionTier.COLD if database_file.endswith(".gz") else PartitionTier.WARM,
+            database_file,
+        )
+        self._save_partition(partition)
+        logger.info("[Partitioning] Attach partition {}: {}", name, database_file)
+
+        return partition
+
+    def drop(self, name: str):
+        """
+        Drop partition with its data (retention)
+
+        :param		name:  The partition name
+        :type		name:  str
+        """
+        partition = self._get_partition(name)
+
+        if partition.tier == PartitionTier.HOT:
+            self.connector.fetch(f"DROP TABLE IF EXISTS main.{name}")
+        elif os.path.exists(partition.file):
+            os.remove(partition.file)
+
+        self.connector.fetch(f"DELETE FROM {CATALOG_TABLE} WHERE name = ?", (name,))
+        del self.partitions[name]
+        logger.info("[Partitioning] Drop partition {}", name)
+
+    def _get_partition(
+        self, name: str, tier: Optional[PartitionTier] = None
+    ) -> Partition:
+        """
+        Gets the partition by name.
+
+        :param		name:				   The partition name
+        :type		name:				   str
+        :param		tier:				   The expected tier
+        :type		tier:				   Optional[PartitionTier]
+
+        :returns:	The partition
+        :rtype:		Partition
+
+        :raises		SQLSymphonyException:  unknown partition or other tier
+        """
+        partition = self.partitions.get(name, None)
+
+        if partition is None:
+            raise SQLSymphonyException(f"Unknown partition {name}")
+
+        if tier is not None and partition.tier != tier:
+            raise SQLSymphonyException(
+                f"Partition {name} is {partition.tier.value}, expected {tier.value}"
+            )
+
+        return partition
+
+    def view_table_info(self):
+        """
+        View partitions in table view
+        """
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table(title=f"SQLSymphonyORM Partitions of {self.table_name}")
+        table.add_column("Partition", style="blue")
+        table.add_column("Start", style="cyan")
+        table.add_column("End", style="cyan")
+        table.add_column("Tier", style="magenta")
+        table.add_column("File", style="green")
+
+        for partition in self.partitions.values():
+            table.add_row(
+                partition.name,
+                str(partition.start),
+                str(partition.end),
+                partition.tier.value,
+                partition.file or "",
+            )
+
+        console = Console()
+        console.print(table)
+
+
+class _AttachedPartition:
+    """
+    Context manager attaching file of archived partition (decompressed copy
+    of cold partition is removed on exit).
+    """
+
+    def __init__(self, table: TimePartitionedTable, partition: Partition):
+        """
+        Constructs a new instance.
+
+        :param		table:		The partitioned table
+        :type		table:		TimePartitionedTable
+        :param		partition:	The partition
+        :type		partition:	Partition
+        """
+        self.table = table
+        self.partition = partition
+        self.file: Optional[str] = None
+
+    def __enter__(self):
+        self.file = self.table._get_file(self.partition)
+
+        try:
+            self.table.connector.fetch(
+                f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (self.file,)
+            )
+        except BaseException:
+            self._remove_copy()
+            raise
+
+    def __exit__(self, *args):
+        try:
+            self.table.connector.fetch(f"DETACH DATABASE {ARCHIVE_SCHEMA}")
+        except sqlite3.OperationalError as ex:
+            logger.warning("[Partitioning] Cannot detach {}: {}", ARCHIVE_SCHEMA, ex)
+        finally:
+            self._remove_copy()
+
+    def _remove_copy(self):
+        """
+        Remove decompressed copy of cold partition
+        """
+        if self.file != self.partition.file:
+            os.remove(self.file)
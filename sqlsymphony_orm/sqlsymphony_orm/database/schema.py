@@ -0,0 +1,312 @@
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+
+
+@dataclass
+class ColumnInfo:
+    """
+    This dataclass describes a table column (PRAGMA table_info row).
+    """
+
+    cid: int
+    name: str
+    type: str
+    notnull: bool
+    default: Optional[str]
+    pk: int
+
+
+@dataclass
+class IndexInfo:
+    """
+    This dataclass describes a table index (PRAGMA index_list row).
+    """
+
+    name: str
+    unique: bool
+    origin: str
+    partial: bool
+    columns: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ForeignKeyInfo:
+    """
+    This dataclass describes a foreign key (PRAGMA foreign_key_list row).
+    """
+
+    id: int
+    seq: int
+    table: str
+    from_column: str
+    to_column: Optional[str]
+    on_update: str
+    on_delete: str
+
+
+@dataclass
+class TableSchema:
+    """
+    This dataclass describes a table schema.
+    """
+
+    name: str
+    columns: List[ColumnInfo] = field(default_factory=list)
+    indexes: List[IndexInfo] = field(default_factory=list)
+    foreign_keys: List[ForeignKeyInfo] = field(default_factory=list)
+
+    @property
+    def column_names(self) -> List[str]:
+        """
+        Get column names
+
+        :returns:	column names
+        :rtype:		List[str]
+        """
+        return [column.name for column in self.columns]
+
+
+class SQLiteSchemaInspector:
+    """
+    Schema introspection built on PRAGMA table_info, index_list and
+    foreign_key_list, with a cached catalog.
+
+    The catalog is keyed by table name and dropped whenever `PRAGMA
+    schema_version` changes, so it stays valid across DDL from any connection
+    while lookups cost O(columns) instead of reading the table.
+    """
+
+    def __init__(self, execute: Callable[..., list], check_version: bool = True):
+        """
+        Constructs a new instance.
+
+        :param		execute:		The sql executor, e.g. SQLiteSession.execute
+        :type		execute:		Callable[..., list]
+        :param		check_version:	Check schema_version before cached lookups
+        :type		check_version:	bool
+        """
+        self.execute = execute
+        self.check_version = check_version
+        self.catalog: Dict[str, TableSchema] = {}
+        self._schema_version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def schema_version(self) -> int:
+        """
+        Get current schema version of database
+
+        :returns:	schema version
+        :rtype:		int
+        """
+        return self.execute("SELECT schema_version FROM pragma_schema_version")[0][0]
+
+    def invalidate(self, table_name: Optional[str] = None):
+        """
+        Drop cached schema of table (or whole catalog)
+
+        :param		table_name:	 The table name
+        :type		table_name:	 Optional[str]
+        """
+        with self._lock:
+            if table_name is None:
+                self.catalog.clear()
+            else:
+                self.catalog.pop(table_name.lower(), None)
+
+    def tables(self) -> List[str]:
+        """
+        Get names of tables in database
+
+        :returns:	table names
+        :rtype:		List[str]
+        """
+        rows = self.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        )
+
+        return [row[0] for row in rows]
+
+    def get_table(self, table_name: str) -> Optional[TableSchema]:
+        """
+        Gets the table schema.
+
+        :param		table_name:	 The table name
+        :type		table_name:	 str
+
+        :returns:	The table schema or None if table does not exist
+        :rtype:		Optional[TableSchema]
+        """
+        if self.check_version:
+            version = self.schema_version()
+
+            if version != self._schema_version:
+                self.invalidate()
+                self._schema_version = version
+
+        key = table_name.lower()
+        schema = self.catalog.get(key, None)
+
+        if schema is None:
+            schema = self._load_table(table_name)
+
+            if schema is not None:
+                with self._lock:
+                    self.catalog[key] = schema
+
+        return schema
+
+    def get_columns(self, table_name: str) -> List[ColumnInfo]:
+        """
+        Gets the table columns.
+
+        :param		table_name:	 The table name
+        :type		table_name:	 str
+
+        :returns:	The columns.
+        :rtype:		List[ColumnInfo]
+        """
+        schema = self.get_table(table_name)
+
+        return schema.columns if schema is not None else []
+
+    def get_indexes(self, table_name: str) -> List[IndexInfo]:
+        """
+        Gets the table indexes.
+
+        :param		table_name:	 The table name
+        :type		table_name:	 str
+
+        :returns:	The indexes.
+        :rtype:		List[IndexInfo]
+        """
+        schema = self.get_table(table_name)
+
+        return schema.indexes if schema is not None else []
+
+    def get_foreign_keys(self, table_name: str) -> List[ForeignKeyInfo]:
+        """
+        Gets the table foreign keys.
+
+        :param		table_name:	 The table name
+        :type		table_name:	 str
+
+        :returns:	The foreign keys.
+        :rtype:		List[ForeignKeyInfo]
+        """
+        schema = self.get_table(table_name)
+
+        return schema.foreign_keys if schema is not None else []
+
+    def _load_table(self, table_name: str) -> Optional[TableSchema]:
+        """
+        Load table schema from PRAGMA functions
+
+        :param		table_name:	 The table name
+        :type		table_name:	 str
+
+        :returns:	The table schema or None
+        :rtype:		Optional[TableSchema]
+        """
+        logger.debug(f"[Schema] Load schema of table {table_name}")
+
+        columns = [
+            ColumnInfo(
+                cid=row[0],
+                name=row[1],
+                type=row[2],
+                notnull=bool(row[3]),
+                default=row[4],
+                pk=row[5],
+            )
+            for row in self.execute(
+                'SELECT cid, name, type, "notnull", dflt_value, pk '
+                "FROM pragma_table_info(?)",
+                (table_name,),
+            )
+        ]
+
+        if not columns:
+            return None
+
+        indexes = []
+
+        for row in self.execute(
+            'SELECT name, "unique", origin, partial FROM pragma_index_list(?)',
+            (table_name,),
+        ):
+            index_columns = self.execute(
+                "SELECT name FROM pragma_index_info(?) ORDER BY seqno", (row[0],)
+            )
+            indexes.append(
+                IndexInfo(
+                    name=row[0],
+                    unique=bool(row[1]),
+                    origin=row[2],
+                    partial=bool(row[3]),
+                    columns=[column[0] for column in index_columns],
+                )
+            )
+
+        foreign_keys = [
+            ForeignKeyInfo(
+                id=row[0],
+                seq=row[1],
+                table=row[2],
+                from_column=row[3],
+                to_column=row[4],
+                on_update=row[5],
+                on_delete=row[6],
+            )
+            for row in self.execute(
+                'SELECT id, seq, "table", "from", "to", on_update, on_delete '
+                "FROM pragma_foreign_key_list(?)",
+                (table_name,),
+            )
+        ]
+
+        return TableSchema(
+            name=table_name, columns=columns, indexes=indexes, foreign_keys=foreign_keys
+        )
+
+    def view_table_info(self, table_name: str):
+        """
+        View table schema in table view
+
+        :param		table_name:	 The table name
+        :type		table_name:	 str
+        """
+        from rich.console import Console
+        from rich.table import Table
+
+        schema = self.get_table(table_name)
+        table = Table(title=f"Table {table_name} schema")
+
+        table.add_column("Column", style="blue")
+        table.add_column("Type", style="cyan")
+        table.add_column("NOT NULL", style="magenta")
+        table.add_column("DEFAULT", style="green")
+        table.add_column("PK", style="green")
+        table.add_column("Indexes", style="yellow")
+
+        if schema is not None:
+            for column in schema.columns:
+                indexes = [
+                    index.name
+                    for index in schema.indexes
+                    if column.name in index.columns
+                ]
+                table.add_row(
+                    column.name,
+                    column.type,
+                    str(column.notnull),
+                    str(column.default),
+                    str(column.pk),
+                    ", ".join(indexes),
+                )
+
+        console = Console()
+        console.print(table)
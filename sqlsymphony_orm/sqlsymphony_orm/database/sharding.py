@@ -0,0 +1,793 @@
+import heapq
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Type
+
+from loguru import logger
+
+from sqlsymphony_orm.datatypes.adapters import DETECT_TYPES, adapt_values
+from sqlsymphony_orm.exceptions import SQLSymphonyException
+from sqlsymphony_orm.models.session_models import SessionModel
+from sqlsymphony_orm.security.hashing import ConsistentHashRing
+
+
+class Shard:
+    """
+    This class describes a shard: database file with its own connection.
+    """
+
+    def __init__(self, name: str, database_file: str):
+        """
+        Constructs a new instance.
+
+        :param		name:			The shard name
+        :type		name:			str
+        :param		database_file:	The database file
+        :type		database_file:	str
+        """
+        self.name = name
+        self.database_file = str(database_file)
+        self.connection = sqlite3.connect(
+            self.database_file, detect_types=DETECT_TYPES, check_same_thread=False
+        )
+        self.connection.execute("PRAGMA foreign_keys = 1")
+        self.lock = threading.RLock()
+        self.tables = set()
+
+    def execute(self, query: str, values: Sequence = ()) -> list:
+        """
+        Execute query
+
+        :param		query:	 The query
+        :type		query:	 str
+        :param		values:	 The values
+        :type		values:	 Sequence
+
+        :returns:	fetched rows
+        :rtype:		list
+        """
+        with self.lock:
+            return self.connection.execute(query, adapt_values(values)).fetchall()
+
+    def insert(self, query: str, values: Sequence) -> int:
+        """
+        Execute insert query
+
+        :param		query:	 The query
+        :type		query:	 str
+        :param		values:	 The values
+        :type		values:	 Sequence
+
+        :returns:	rowid of inserted row
+        :rtype:		int
+        """
+        with self.lock:
+            return self.connection.execute(query, adapt_values(values)).lastrowid
+
+    @contextmanager
+    def transaction(self) -> Iterator["Shard"]:
+        """
+        Run statements in one transaction of shard
+
+        :returns:	shard
+        :rtype:		Iterator[Shard]
+        """
+        with self.lock:
+            try:
+                yield self
+            except BaseException:
+                self.connection.rollback()
+                raise
+            else:
+                self.connection.commit()
+
+    def commit(self):
+        """
+        Commit changes
+        """
+        with self.lock:
+            self.connection.commit()
+
+    def close(self):
+        """
+        Commit changes and close connection
+        """
+        with self.lock:
+            self.connection.commit()
+            self.connection.close()
+
+
+class ShardedSession:
+    """
+    This class describes a session over several SQLite files (shards).
+
+    Every model instance lives in the shard chosen by consistent hash of its
+    shard key (`__shard_key__` of model class or `shard_key` of session), so
+    writes are spread over files, each with its own connection and write
+    lock. Queries with shard key go to one shard, other queries fan out to
+    all shards in threads and their rows are merged (in order for
+    `order_by`). Primary keys are local to shard and may change when rows
+    are moved by rebalance, identify rows by shard key instead.
+    """
+
+    def __init__(
+        self,
+        shards: Dict[str, str],
+        shard_key: Optional[str] = None,
+        replicas: int = 100,
+        max_workers: Optional[int] = None,
+    ):
+        """
+        Constructs a new instance.
+
+        :param		shards:		   The database files by shard name
+        :type		shards:		   Dict[str, str]
+        :param		shard_key:	   The default shard key field
+        :type		shard_key:	   Optional[str]
+        :param		replicas:	   The virtual nodes of shard on hash ring
+        :type		replicas:	   int
+        :param		max_workers:   The threads of fan-out queries
+        :type		max_workers:   Optional[int]
+        """
+        self.shard_key = shard_key
+        self.ring = ConsistentHashRing(replicas=replicas)
+        self.shards: Dict[str, Shard] = {}
+        self.models = {}
+        self.model_classes: Dict[str, Type[SessionModel]] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="sqlsymphony-shard"
+        )
+
+        for name, database_file in shards.items():
+            self.add_shard(name, database_file, rebalance=False)
+
+    def __enter__(self) -> "ShardedSession":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get_shard_key(self, model_class: Type[SessionModel]) -> str:
+        """
+        Gets the shard key field of model class.
+
+        :param		model_class:		   The model class
+        :type		model_class:		   Type[SessionModel]
+
+        :returns:	The shard key field
+        :rtype:		str
+
+        :raises		SQLSymphonyException:  shard key is not set
+        """
+        shard_key = getattr(model_class, "__shard_key__", None) or self.shard_key
+
+        if shard_key is None or shard_key not in model_class._original_fields:
+            raise SQLSymphonyException(
+                f"Shard key of model {model_class.__name__} is not set: {shard_key}"
+            )
+
+        return shard_key
+
+    def get_shard(self, key: Any) -> Shard:
+        """
+        Gets the shard of shard key value.
+
+        :param		key:  The shard key value
+        :type		key:  Any
+
+        :returns:	The shard
+        :rtype:		Shard
+        """
+        return self.shards[self.ring.get_node(key)]
+
+    def get_model_shard(self, model: SessionModel) -> Shard:
+        """
+        Gets the shard of model instance (loaded or by its shard key).
+
+        :param		model:	The model
+        :type		model:	SessionModel
+
+        :returns:	The shard
+        :rtype:		Shard
+        """
+        current_model = self.models.get(model.unique_id, None)
+
+        if current_model is not None:
+            return self.shards[current_model["shard"]]
+
+        return self.get_shard(getattr(model, self.get_shard_key(type(model))))
+
+    def create_table(self, shard: Shard, model_class: Type[SessionModel]):
+        """
+        Create table of model class in shard (with index on shard key)
+
+        :param		shard:		  The shard
+        :type		shard:		  Shard
+        :param		model_class:  The model class
+        :type		model_class:  Type[SessionModel]
+        """
+        table_name = model_class.table_name
+
+        if table_name in shard.tables:
+            return
+
+        shard_key = self.get_shard_key(model_class)
+        fields = ", ".join(
+            f"{name} {sql_type}"
+            for name, sql_type in model_class._class_get_formatted_sql_fields().items()
+        )
+
+        with shard.transaction():
+            shard.execute(f"CREATE TABLE IF NOT EXISTS {table_name} ({fields})")
+            shard.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table_name}_{shard_key} "
+                f"ON {table_name} ({shard_key})"
+            )
+
+        shard.tables.add(table_name)
+        self.model_classes[table_name] = model_class
+
+    def fan_out(
+        self, query: str, values: Sequence = (), shards: Optional[Iterable[str]] = None
+    ) -> Dict[str, list]:
+        """
+        Execute query on shards in parallel
+
+        :param		query:	 The query
+        :type		query:	 str
+        :param		values:	 The values
+        :type		values:	 Sequence
+        :param		shards:	 The shard names (all by default)
+        :type		shards:	 Optional[Iterable[str]]
+
+        :returns:	rows by shard name
+        :rtype:		Dict[str, list]
+        """
+        names = list(self.shards if shards is None else shards)
+        logger.debug("[Sharding] Fan out to {} shards: {}", len(names), query)
+
+        results = self._executor.map(
+            lambda name: self.shards[name].execute(query, values), names
+        )
+
+        return dict(zip(names, results))
+
+    def _hydrate(
+        self, model_class: Type[SessionModel], row: Sequence, shard_name: str
+    ) -> SessionModel:
+        """
+        Build model instance from row of its fields
+
+        :param		model_class:  The model class
+        :type		model_class:  Type[SessionModel]
+        :param		row:		  The row
+        :type		row:		  Sequence
+        :param		shard_name:	  The shard name
+        :type		shard_name:	  str
+
+        :returns:	model
+        :rtype:		SessionModel
+        """
+        model = model_class(manager=True)
+
+        for field_name, value in zip(model_class._original_fields, row):
+            setattr(model, field_name, value)
+            model.fields[field_name] = value
+
+        model._primary_key["value"] = getattr(model, model_class._pk_name)
+        self.models[model.unique_id] = {"model": model, "shard": shard_name}
+
+        return model
+
+    def _insert(self, shard: Shard, model: SessionModel, ignore: bool = False):
+        """
+        Insert model into shard and set its primary key
+
+        :param		shard:	 The shard
+        :type		shard:	 Shard
+        :param		model:	 The model
+        :type		model:	 SessionModel
+        :param		ignore:	 The ignore
+        :type		ignore:	 bool
+        """
+        columns = list(model.get_formatted_sql_fields(skip_primary_key=True))
+        query = (
+            f"INSERT {'OR IGNORE ' if ignore else ''}INTO {model.table_name} "
+            f"({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+        )
+        pk = shard.insert(query, [getattr(model, column) for column in columns])
+
+        setattr(model, model._primary_key["field_name"], pk)
+        model._primary_key["value"] = pk
+        self.models[model.unique_id] = {"model": model, "shard": shard.name}
+
+    def _delete(self, shard: Shard, model: SessionModel, pk: Any = None):
+        """
+        Delete row of model from shard
+
+        :param		shard:	The shard
+        :type		shard:	Shard
+        :param		model:	The model
+        :type		model:	SessionModel
+        :param		pk:		The primary key in shard (of model by default)
+        :type		pk:		Any
+        """
+        shard.execute(
+            f"DELETE FROM {model.table_name} "
+            f"WHERE {model._primary_key['field_name']} = ?",
+            (model.pk if pk is None else pk,),
+        )
+
+    def add(self, model: SessionModel, ignore: bool = False):
+        """
+        Add new model to shard of its shard key
+
+        :param		model:	 The model
+        :type		model:	 SessionModel
+        :param		ignore:	 The ignore
+        :type		ignore:	 bool
+        """
+        if self.models.get(model.unique_id, None) is not None:
+            logger.warning("Model {} already added", model.unique_id)
+            return
+
+        hook = model.hooks.get("save", None)
+
+        if hook is not None:
+            logger.debug("Exec Model Hook[save]: {}", hook["function"].__name__)
+            hook["function"](*hook["args"])
+
+        shard = self.get_model_shard(model)
+        self.create_table(shard, type(model))
+        self._insert(shard, model, ignore)
+
+        logger.info("[Sharding] {}: insert model {}", shard.name, model.unique_id)
+
+    def add_all(self, models: Iterable[SessionModel], ignore: bool = False):
+        """
+        Add models: every shard inserts its models in one transaction, shards
+        in parallel
+
+        :param		models:	 The models
+        :type		models:	 Iterable[SessionModel]
+        :param		ignore:	 The ignore
+        :type		ignore:	 bool
+        """
+        groups: Dict[str, List[SessionModel]] = {}
+
+        for model in models:
+            shard = self.get_model_shard(model)
+            self.create_table(shard, type(model))
+            groups.setdefault(shard.name, []).append(model)
+
+        def insert_group(name: str):
+            shard = self.shards[name]
+
+            with shard.transaction():
+                for model in groups[name]:
+                    self._insert(shard, model, ignore)
+
+        list(self._executor.map(insert_group, groups))
+        logger.info(
+            "[Sharding] Insert {} models into {} shards",
+            sum(len(group) for group in groups.values()),
+            len(groups),
+        )
+
+    def update(self, model: SessionModel, **kwargs):
+        """
+        Update model. Changing shard key moves the row to its new shard.
+
+        :param		model:	 The model
+        :type		model:	 SessionModel
+        :param		kwargs:	 The keywords arguments
+        :type		kwargs:	 dictionary
+        """
+        if self.models.get(model.unique_id, None) is None:
+            self.add(model)
+
+        hook = model.hooks.get("update", None)
+
+        if hook is not None:
+            logger.debug("Exec Model Hook[update]: {}", hook["function"].__name__)
+            hook["function"](*hook["args"])
+
+        shard = self.get_model_shard(model)
+        changes = {}
+
+        for key, value in kwargs.items():
+            if value is not None and model._original_fields[key].validate(value):
+                value = model._original_fields[key].to_db_value(value)
+                setattr(model, key, value)
+                model.fields[key] = value
+                changes[key] = value
+
+        if not changes:
+            return
+
+        target = self.get_shard(getattr(model, self.get_shard_key(type(model))))
+
+        if target is not shard:
+            # copy then delete: a failure in between leaves a duplicate, not a loss
+            source_pk = model.pk
+            self.create_table(target, type(model))
+
+            with target.transaction():
+                self._insert(target, model)
+
+            with shard.transaction():
+                self._delete(shard, model, source_pk)
+
+            logger.info(
+                "[Sharding] Move model {}: {} -> {}",
+                model.unique_id,
+                shard.name,
+                target.name,
+            )
+            return
+
+        shard.execute(
+            f"UPDATE {model.table_name} SET "
+            f"{', '.join(f'{key} = ?' for key in changes)} "
+            f"WHERE {model._primary_key['field_name']} = ?",
+            [*changes.values(), model.pk],
+        )
+        logger.info("[Sharding] {}: update model {}", shard.name, model.unique_id)
+
+    def delete(self, model: SessionModel):
+        """
+        Deletes the given model.
+
+        :param		model:	The model
+        :type		model:	SessionModel
+        """
+        current_model = self.models.pop(model.unique_id, None)
+
+        if current_model is None:
+            logger.error("Model {} does not exists", model.unique_id)
+            return
+
+        hook = model.hooks.get("delete", None)
+
+        if hook is not None:
+            logger.debug("Exec Model Hook[delete]: {}", hook["function"].__name__)
+            hook["function"](*hook["args"])
+
+        self._delete(self.shards[current_model["shard"]], model)
+        logger.info(
+            "[Sharding] {}: delete model {}", current_model["shard"], model.unique_id
+        )
+
+    def filter(
+        self,
+        model_class: Type[SessionModel],
+        where: Optional[str] = None,
+        values: Sequence = (),
+        shard_key: Any = None,
+        order_by: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[SessionModel]:
+        """
+        Filter models. With shard key value only its shard is queried, else
+        all shards are queried in parallel; every shard applies `order_by`
+        and `limit`, and sorted rows are merged.
+
+        :param		model_class:  The model class
+        :type		model_class:  Type[SessionModel]
+        :param		where:		  The condition with ? placeholders
+        :type		where:		  Optional[str]
+        :param		values:		  The values of condition
+        :type		values:		  Sequence
+        :param		shard_key:	  The shard key value
+        :type		shard_key:	  Any
+        :param		order_by:	  The field name (with optional DESC)
+        :type		order_by:	  Optional[str]
+        :param		limit:		  The limit
+        :type		limit:		  Optional[int]
+
+        :returns:	models
+        :rtype:		List[SessionModel]
+        """
+        fields = list(model_class._original_fields)
+        query = f"SELECT {', '.join(fields)} FROM {model_class.table_name}"
+
+        if where:
+            query += f" WHERE {where}"
+
+        if order_by:
+            query += f" ORDER BY {order_by}"
+
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+
+        names = (
+            [self.ring.get_node(shard_key)] if shard_key is not None else self.shards
+        )
+
+        for name in names:
+            self.create_table(self.shards[name], model_class)
+
+        results = self.fan_out(query, values, names)
+        rows = [
+            [(row, name) for row in shard_rows] for name, shard_rows in results.items()
+        ]
+
+        if order_by:
+            field_name, _, direction = order_by.partition(" ")
+            index = itemgetter(fields.index(field_name))
+            merged = heapq.merge(
+                *rows,
+                key=lambda item: index(item[0]),
+                reverse=direction.strip().upper() == "DESC",
+            )
+        else:
+            merged = (item for shard_rows in rows for item in shard_rows)
+
+        return [
+            self._hydrate(model_class, row, name) for row, name in islice(merged, limit)
+        ]
+
+    def count(
+        self,
+        model_class: Type[SessionModel],
+        where: Optional[str] = None,
+        values: Sequence = (),
+    ) -> int:
+        """
+        Count rows of model in all shards
+
+        :param		model_class:  The model class
+        :type		model_class:  Type[SessionModel]
+        :param		where:		  The condition with ? placeholders
+        :type		where:		  Optional[str]
+        :param		values:		  The values of condition
+        :type		values:		  Sequence
+
+        :returns:	number of rows
+        :rtype:		int
+        """
+        return sum(self.get_distribution(model_class, where, values).values())
+
+    def get_distribution(
+        self,
+        model_class: Type[SessionModel],
+        where: Optional[str] = None,
+        values: Sequence = (),
+    ) -> Dict[str, int]:
+        """
+        Gets number of rows of model per shard.
+
+        :param		model_class:  The model class
+        :type		model_class:  Type[SessionModel]
+        :param		where:		  The condition with ? placeholders
+        :type		where:		  Optional[str]
+        :param		values:		  The values of condition
+        :type		values:		  Sequence
+
+        :returns:	number of rows by shard name
+        :rtype:		Dict[str, int]
+        """
+        for shard in self.shards.values():
+            self.create_table(shard, model_class)
+
+        query = f"SELECT COUNT(*) FROM {model_class.table_name}"
+
+        if where:
+            query += f" WHERE {where}"
+
+        return {name: rows[0][0] for name, rows in self.fan_out(query, values).items()}
+
+    def get_model_classes(
+        self, model_classes: Optional[Iterable[Type[SessionModel]]] = None
+    ) -> List[Type[SessionModel]]:
+        """
+        Gets all model classes stored in shards. Given model classes are
+        registered first; every table found in sqlite_master of shards must
+        belong to a registered model class, so rebalancing never leaves rows
+        of unknown tables on a wrong shard.
+
+        :param		model_classes:		   The model classes to register
+        :type		model_classes:		   Optional[Iterable[Type[SessionModel]]]
+
+        :returns:	The model classes
+        :rtype:		List[Type[SessionModel]]
+
+        :raises		SQLSymphonyException:  shards have tables of unknown models
+        """
+        for model_class in model_classes or ():
+            self.model_classes[model_class.table_name] = model_class
+
+        tables = set()
+
+        for rows in self.fan_out(
+            "SELECT name FROM sqlite_master "
+            "WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        ).values():
+            tables.update(row[0] for row in rows)
+
+        unknown = sorted(tables - set(self.model_classes))
+
+        if unknown:
+            raise SQLSymphonyException(
+                f"Shards have tables without model classes: {unknown}, "
+                "pass their model_classes"
+            )
+
+        return list(self.model_classes.values())
+
+    def add_shard(
+        self,
+        name: str,
+        database_file: str,
+        weight: int = 1,
+        rebalance: bool = True,
+        model_classes: Optional[Iterable[Type[SessionModel]]] = None,
+    ) -> int:
+        """
+        Add shard to the ring
+
+        :param		name:			The shard name
+        :type		name:			str
+        :param		database_file:	The database file
+        :type		database_file:	str
+        :param		weight:			The weight (share of keys)
+        :type		weight:			int
+        :param		rebalance:		Move rows that now belong to new shard
+        :type		rebalance:		bool
+        :param		model_classes:	The model classes of tables in shards
+        :type		model_classes:	Optional[Iterable[Type[SessionModel]]]
+
+        :returns:	number of moved rows
+        :rtype:		int
+        """
+        if rebalance:
+            model_classes = self.get_model_classes(model_classes)
+
+        self.shards[name] = Shard(name, database_file)
+        self.ring.add_node(name, weight)
+        logger.info("[Sharding] Add shard {}: {}", name, database_file)
+
+        return self.rebalance(model_classes) if rebalance else 0
+
+    def remove_shard(
+        self,
+        name: str,
+        model_classes: Optional[Iterable[Type[SessionModel]]] = None,
+    ) -> int:
+        """
+        Remove shard from the ring, moving its rows to other shards
+
+        :param		name:			The shard name
+        :type		name:			str
+        :param		model_classes:	The model classes of tables in shards
+        :type		model_classes:	Optional[Iterable[Type[SessionModel]]]
+
+        :returns:	number of moved rows
+        :rtype:		int
+        """
+        model_classes = self.get_model_classes(model_classes)
+        self.ring.remove_node(name)
+        moved = self.rebalance(model_classes, shards=[name])
+        self.shards.pop(name).close()
+        logger.info("[Sharding] Remove shard {}", name)
+
+        return moved
+
+    def rebalance(
+        self,
+        model_classes: Optional[Iterable[Type[SessionModel]]] = None,
+        shards: Optional[Iterable[str]] = None,
+        batch_size: int = 1000,
+    ) -> int:
+        """
+        Move rows whose shard key belongs to another shard on the ring (after
+        adding or removing shards). Rows are copied to target shard before
+        they are deleted from source, in batches of `batch_size`. Primary
+        keys of moved rows are assigned by target shard, and loaded models
+        are dropped from the session.
+
+        :param		model_classes:	The model classes (all stored in shards)
+        :type		model_classes:	Optional[Iterable[Type[SessionModel]]]
+        :param		shards:			The source shard names (all by default)
+        :type		shards:			Optional[Iterable[str]]
+        :param		batch_size:		The batch size
+        :type		batch_size:		int
+
+        :returns:	number of moved rows
+        :rtype:		int
+        """
+        model_classes = (
+            self.get_model_classes() if model_classes is None else list(model_classes)
+        )
+        moved = 0
+
+        for model_class in model_classes:
+            fields = list(model_class._original_fields)
+            pk_name = model_class._pk_name
+            columns = [field for field in fields if field != pk_name]
+            key_index = fields.index(self.get_shard_key(model_class))
+            pk_index = fields.index(pk_name)
+            table_name = model_class.table_name
+            insert_query = (
+                f"INSERT INTO {table_name} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})"
+            )
+
+            for name in list(self.shards if shards is None else shards):
+                source = self.shards[name]
+                self.create_table(source, model_class)
+                last_pk = None
+
+                while True:
+                    rows = source.execute(
+                        f"SELECT {', '.join(fields)} FROM {table_name} "
+                        f"{'' if last_pk is None else f'WHERE {pk_name} > ? '}"
+                        f"ORDER BY {pk_name} LIMIT {int(batch_size)}",
+                        () if last_pk is None else (last_pk,),
+                    )
+
+                    if not rows:
+                        break
+
+                    last_pk = rows[-1][pk_index]
+                    targets: Dict[str, list] = {}
+
+                    for row in rows:
+                        target = self.ring.get_node(row[key_index])
+
+                        if target != name:
+                            targets.setdefault(target, []).append(row)
+
+                    for target_name, target_rows in targets.items():
+                        target = self.shards[target_name]
+                        self.create_table(target, model_class)
+
+                        with target.transaction():
+                            target.connection.executemany(
+                                insert_query,
+                                [
+                                    adapt_values(
+                                        [
+                                            value
+                                            for i, value in enumerate(row)
+                                            if i != pk_index
+                                        ]
+                                    )
+                                    for row in target_rows
+                                ],
+                            )
+
+                        with source.transaction():
+                            source.connection.executemany(
+                                f"DELETE FROM {table_name} WHERE {pk_name} = ?",
+                                [(row[pk_index],) for row in target_rows],
+                            )
+
+                        moved += len(target_rows)
+
+        if moved:
+            self.models.clear()
+
+        logger.info("[Sharding] Rebalance: {} rows moved", moved)
+
+        return moved
+
+    def commit(self):
+        """
+        Commit changes of all shards
+        """
+        for shard in self.shards.values():
+            shard.commit()
+
+    def close(self):
+        """
+        Commit changes and close shards
+        """
+        for shard in self.shards.values():
+            shard.close()
+
+        self._executor.shutdown()
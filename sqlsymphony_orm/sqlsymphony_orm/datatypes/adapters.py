@@ -0,0 +1,315 @@
+import sqlite3
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone, timedelta
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, Type, Union
+from uuid import UUID
+
+from sqlsymphony_orm.exceptions import SQLSymphonyException
+from sqlsymphony_orm.patterns import Singleton
+
+DETECT_TYPES = sqlite3.PARSE_DECLTYPES
+EPOCH = datetime(1970, 1, 1)
+
+# declared types of ORM columns: converters are registered only under these
+# names, so columns of other sqlite3 users are not converted
+BOOLEAN_SQL_TYPE = "SQLSYMPHONY_BOOL"
+DATETIME_SQL_TYPE = "SQLSYMPHONY_EPOCH_US"
+DECIMAL_SQL_TYPE = "SQLSYMPHONY_DECIMAL_TEXT"
+UUID_SQL_TYPE = "SQLSYMPHONY_UUID"
+ENUM_SQL_TYPE_PREFIX = "SQLSYMPHONY_ENUM_"
+
+
+def adapt_bool(value: bool) -> int:
+    """
+    Adapt boolean to INTEGER 0/1
+
+    :param		value:	The value
+    :type		value:	bool
+
+    :returns:	0 or 1
+    :rtype:		int
+    """
+    return int(value)
+
+
+def convert_bool(value: bytes) -> bool:
+    """
+    Convert INTEGER 0/1 (or legacy "TRUE"/"FALSE" text) to boolean
+
+    :param		value:	The value
+    :type		value:	bytes
+
+    :returns:	boolean
+    :rtype:		bool
+    """
+    return value not in (b"0", b"FALSE", b"False", b"")
+
+
+def adapt_datetime(value: datetime) -> int:
+    """
+    Adapt datetime to integer epoch in microseconds. Aware datetimes are
+    normalized to UTC, naive datetimes are stored as is.
+
+    :param		value:	The value
+    :type		value:	datetime
+
+    :returns:	microseconds since epoch
+    :rtype:		int
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def convert_datetime(value: bytes) -> datetime:
+    """
+    Convert integer epoch in microseconds to naive datetime
+
+    :param		value:	The value
+    :type		value:	bytes
+
+    :returns:	datetime
+    :rtype:		datetime
+    """
+    return EPOCH + timedelta(microseconds=int(value))
+
+
+def adapt_decimal(value: Decimal) -> str:
+    """
+    Adapt decimal to lossless text
+
+    :param		value:	The value
+    :type		value:	Decimal
+
+    :returns:	decimal string
+    :rtype:		str
+    """
+    return str(value)
+
+
+def convert_decimal(value: bytes) -> Decimal:
+    """
+    Convert text to decimal
+
+    :param		value:	The value
+    :type		value:	bytes
+
+    :returns:	decimal
+    :rtype:		Decimal
+    """
+    return Decimal(value.decode("utf-8"))
+
+
+def adapt_uuid(value: UUID) -> bytes:
+    """
+    Adapt UUID to 16-byte BLOB
+
+    :param		value:	The value
+    :type		value:	UUID
+
+    :returns:	uuid bytes
+    :rtype:		bytes
+    """
+    return value.bytes
+
+
+def convert_uuid(value: bytes) -> UUID:
+    """
+    Convert 16-byte BLOB to UUID
+
+    :param		value:	The value
+    :type		value:	bytes
+
+    :returns:	uuid
+    :rtype:		UUID
+    """
+    return UUID(bytes=value)
+
+
+@dataclass
+class TypeAdapter:
+    """
+    This dataclass describes a type adapter.
+    """
+
+    field_class: Type
+    python_type: Type
+    sql_type: str
+    adapter: Callable[[Any], Any]
+    converter: Callable[[bytes], Any]
+
+
+class TypeAdapterRegistry(metaclass=Singleton):
+    """
+    Registry of adapters and converters per field class.
+
+    Adapters are applied by the ORM to query parameters (see adapt_values),
+    not registered in sqlite3, so other sqlite3 users of the process bind
+    values as before. Converters are applied by the cursor itself (the
+    connection must be opened with `detect_types=DETECT_TYPES`) and are
+    registered only under ORM declared types (`SQLSYMPHONY_*`), so fetched
+    rows of ORM columns arrive already decoded.
+    """
+
+    def __init__(self):
+        """
+        Constructs a new instance.
+        """
+        self.adapters: Dict[Type, TypeAdapter] = {}
+        self.sql_types: Dict[str, TypeAdapter] = {}
+
+    def register(
+        self,
+        field_class: Type,
+        python_type: Type,
+        sql_type: str,
+        adapter: Callable[[Any], Any],
+        converter: Callable[[bytes], Any],
+    ) -> TypeAdapter:
+        """
+        Register adapter and converter for field class
+
+        :param		field_class:  The field class
+        :type		field_class:  Type
+        :param		python_type:  The python type
+        :type		python_type:  Type
+        :param		sql_type:	  The declared sql type
+        :type		sql_type:	  str
+        :param		adapter:	  The adapter (python value -> sqlite value)
+        :type		adapter:	  Callable[[Any], Any]
+        :param		converter:	  The converter (bytes -> python value)
+        :type		converter:	  Callable[[bytes], Any]
+
+        :returns:	type adapter
+        :rtype:		TypeAdapter
+
+        :raises		SQLSymphonyException:  declared sql type is registered for
+                                       another python type
+        """
+        type_adapter = TypeAdapter(
+            field_class=field_class,
+            python_type=python_type,
+            sql_type=sql_type.upper(),
+            adapter=adapter,
+            converter=converter,
+        )
+
+        registered = self.sql_types.get(type_adapter.sql_type, None)
+
+        if registered is not None and registered.python_type is not python_type:
+            raise SQLSymphonyException(
+                f"SQL type {type_adapter.sql_type} is already registered for "
+                f"{registered.python_type.__module__}."
+                f"{registered.python_type.__qualname__}"
+            )
+
+        # converters are process-wide, the declared type must be unique
+        sqlite3.register_converter(type_adapter.sql_type, converter)
+
+        self.adapters[python_type] = type_adapter
+        self.sql_types[type_adapter.sql_type] = type_adapter
+
+        return type_adapter
+
+    def register_enum(self, field_class: Type, enum_class: Type[Enum]) -> TypeAdapter:
+        """
+        Register enum class, stored as INTEGER member value. The declared
+        type contains a hash of the full name of the class, so enums of the
+        same name from different modules get different converters.
+
+        :param		field_class:  The field class
+        :type		field_class:  Type
+        :param		enum_class:	  The enum class
+        :type		enum_class:	  Type[Enum]
+
+        :returns:	type adapter
+        :rtype:		TypeAdapter
+
+        :raises		SQLSymphonyException:  declared sql type is registered for
+                                       another enum class
+        """
+        type_adapter = self.adapters.get(enum_class, None)
+
+        if type_adapter is not None:
+            return type_adapter
+
+        full_name = f"{enum_class.__module__}.{enum_class.__qualname__}"
+        digest = hashlib.sha1(full_name.encode("utf-8")).hexdigest()[:8]
+
+        return self.register(
+            field_class,
+            enum_class,
+            f"{ENUM_SQL_TYPE_PREFIX}{enum_class.__name__}_{digest}",
+            lambda member: int(member.value),
+            lambda value: enum_class(int(value)),
+        )
+
+    def get(self, python_type: Type) -> Optional[TypeAdapter]:
+        """
+        Gets type adapter by python type.
+
+        :param		python_type:  The python type
+        :type		python_type:  Type
+
+        :returns:	type adapter or None
+        :rtype:		Optional[TypeAdapter]
+        """
+        return self.adapters.get(python_type, None)
+
+    def adapt(self, value: Any) -> Any:
+        """
+        Adapt value of registered python type to sqlite value
+
+        :param		value:	The value
+        :type		value:	Any
+
+        :returns:	sqlite value (value itself for other types)
+        :rtype:		Any
+        """
+        type_adapter = self.adapters.get(type(value), None)
+
+        return value if type_adapter is None else type_adapter.adapter(value)
+
+    def view_table_info(self):
+        """
+        View info in table view
+        """
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table(title="SQLSymphonyORM TypeAdapterRegistry")
+        table.add_column("Field class", style="blue")
+        table.add_column("Python type", style="cyan")
+        table.add_column("SQL type", style="green")
+
+        for type_adapter in self.adapters.values():
+            table.add_row(
+                type_adapter.field_class.__name__,
+                type_adapter.python_type.__name__,
+                type_adapter.sql_type,
+            )
+
+        console = Console()
+        console.print(table)
+
+
+def adapt_values(values: Union[Sequence, Mapping]) -> Union[tuple, dict]:
+    """
+    Adapt query parameters with registered adapters
+
+    :param		values:	 The positional or named parameters
+    :type		values:	 Union[Sequence, Mapping]
+
+    :returns:	adapted parameters
+    :rtype:		Union[tuple, dict]
+    """
+    registry = TypeAdapterRegistry()
+
+    if isinstance(values, Mapping):
+        return {key: registry.adapt(value) for key, value in values.items()}
+
+    return tuple(registry.adapt(value) for value in values)
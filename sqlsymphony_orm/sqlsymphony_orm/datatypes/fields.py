@@ -1,11 +1,27 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Any
-
-from rich.console import Console
-from rich.table import Table
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from enum import Enum
+from typing import Any, Type
+from uuid import UUID
 
 from sqlsymphony_orm.utils.slugger import SlugGenerator
+from sqlsymphony_orm.datatypes.adapters import (
+    BOOLEAN_SQL_TYPE,
+    DATETIME_SQL_TYPE,
+    DECIMAL_SQL_TYPE,
+    UUID_SQL_TYPE,
+    TypeAdapterRegistry,
+    adapt_bool,
+    convert_bool,
+    adapt_datetime,
+    convert_datetime,
+    adapt_decimal,
+    convert_decimal,
+    adapt_uuid,
+    convert_uuid,
+)
 
 
 class BaseDataType(ABC):
@@ -81,6 +97,9 @@ class BaseDataType(ABC):
         """
         View info in table view
         """
+        from rich.console import Console
+        from rich.table import Table
+
         table = Table(title="SQLSymphonyORM BaseDataType")
         table.add_column("Parameters", style="blue")
         table.add_column("Parameters values", style="green")
@@ -106,6 +125,26 @@ class BaseDataType(ABC):
         """
         raise NotImplementedError()
 
+    def to_sql_default(self) -> str:
+        """
+        Returns a sql literal representation of the default value.
+
+        :returns:	Sql literal of the default value.
+        :rtype:		str
+        """
+        value = self.to_db_value(self.default)
+        type_adapter = TypeAdapterRegistry().get(type(value))
+
+        if type_adapter is not None:
+            value = type_adapter.adapter(value)
+
+        if isinstance(value, str):
+            return "'{}'".format(value.replace("'", "''"))
+        if isinstance(value, bytes):
+            return f"X'{value.hex()}'"
+
+        return str(value)
+
     def __str__(self):
         return "<BaseDataType>"
 
@@ -207,6 +246,9 @@ class SlugField(BaseDataType):
         """
         View info in table view
         """
+        from rich.console import Console
+        from rich.table import Table
+
         table = Table(title="SQLSymphonyORM SlagField (CharField)")
         table.add_column("Parameters", style="blue")
         table.add_column("Parameters values", style="green")
@@ -318,6 +360,9 @@ class IntegerField(BaseDataType):
         """
         View info in table view
         """
+        from rich.console import Console
+        from rich.table import Table
+
         table = Table(title="SQLSymphonyORM IntegerField")
         table.add_column("Parameters", style="blue")
         table.add_column("Parameters values", style="green")
@@ -422,6 +467,9 @@ class RealField(BaseDataType):
         """
         View info in table view
         """
+        from rich.console import Console
+        from rich.table import Table
+
         table = Table(title="SQLSymphonyORM RealField")
         table.add_column("Parameters", style="blue")
         table.add_column("Parameters values", style="green")
@@ -523,6 +571,9 @@ class CharField(BaseDataType):
         """
         View info in table view
         """
+        from rich.console import Console
+        from rich.table import Table
+
         table = Table(title="SQLSymphonyORM CharField")
         table.add_column("Parameters", style="blue")
         table.add_column("Parameters values", style="green")
@@ -542,7 +593,14 @@ class CharField(BaseDataType):
 
 class BooleanField(BaseDataType):
     """
-    This class describes a boolean field.
+    This class describes a boolean field (stored as INTEGER 0/1).
+
+    Columns created by older versions are declared BOOLEAN and hold 'True'
+    and 'False' text. No converter is registered for BOOLEAN, so only
+    from_db_value decodes them (model fetches); raw queries and parallel
+    scans return the stored text. Convert such columns once with
+    `UPDATE <table> SET <column> = <column> NOT IN ('False', 'FALSE', '0', '')`
+    to store 0/1 everywhere.
     """
 
     def __init__(
@@ -569,7 +627,7 @@ class BooleanField(BaseDataType):
         self.default: Any = default
 
     def to_sql_type(self) -> str:
-        return "BOOLEAN"
+        return BOOLEAN_SQL_TYPE
 
     def validate(self, value: Any) -> bool:
         """
@@ -586,19 +644,19 @@ class BooleanField(BaseDataType):
         else:
             return False
 
-    def to_db_value(self, value: Any) -> str:
+    def to_db_value(self, value: Any) -> bool:
         """
-        Convert to db value
+        Convert to db value (stored as INTEGER 0/1 by the type adapter)
 
         :param		value:	The value
         :type		value:	Any
 
         :returns:	db value
-        :rtype:		str
+        :rtype:		bool
         """
-        return str(value).upper() if value is not None else self.default
+        return bool(value) if value is not None else self.default
 
-    def from_db_value(self, value: Any) -> str:
+    def from_db_value(self, value: Any) -> bool:
         """
         Convert from db value
 
@@ -606,15 +664,23 @@ class BooleanField(BaseDataType):
         :type		value:	Any
 
         :returns:	db value
-        :rtype:		str
+        :rtype:		bool
         """
-        return str(value).upper() if value is not None else self.default
+        if value is None:
+            return self.default
+        if isinstance(value, (bytes, str)):
+            return convert_bool(value.encode() if isinstance(value, str) else value)
+
+        return bool(value)
 
     def view_table_info(self):
         """
         View info in table view
         """
-        table = Table(title="SQLSymphonyORM TextField")
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table(title="SQLSymphonyORM BooleanField")
         table.add_column("Parameters", style="blue")
         table.add_column("Parameters values", style="green")
 
@@ -703,6 +769,9 @@ class TextField(BaseDataType):
         """
         View info in table view
         """
+        from rich.console import Console
+        from rich.table import Table
+
         table = Table(title="SQLSymphonyORM TextField")
         table.add_column("Parameters", style="blue")
         table.add_column("Parameters values", style="green")
@@ -800,6 +869,9 @@ class BlobField(BaseDataType):
         """
         View info in table view
         """
+        from rich.console import Console
+        from rich.table import Table
+
         table = Table(title="SQLSymphonyORM BlobField")
         table.add_column("Parameters", style="blue")
         table.add_column("Parameters values", style="green")
@@ -817,6 +889,545 @@ class BlobField(BaseDataType):
         return "<BlobField>"
 
 
+class DateTimeField(BaseDataType):
+    """
+    This class describes a datetime field (stored as INTEGER epoch).
+    """
+
+    def __init__(
+        self,
+        unique: bool = False,
+        null: bool = True,
+        default: datetime = None,
+    ):
+        """
+        Constructs a new instance.
+
+        :param		unique:		  The unique
+        :type		unique:		  bool
+        :param		null:		  The null
+        :type		null:		  bool
+        :param		default:	  The default
+        :type		default:	  datetime
+        """
+        self.primary_key = False
+        self.unique: bool = unique
+        self.null: bool = null
+        self.default: datetime = default
+
+    def to_sql_type(self) -> str:
+        return DATETIME_SQL_TYPE
+
+    def validate(self, value: Any) -> bool:
+        """
+        Validate value
+
+        :param		value:	The value
+        :type		value:	Any
+
+        :returns:	if the value is verified then True, otherwise False
+        :rtype:		bool
+        """
+        if value is None and self.null:
+            return True
+
+        return isinstance(value, datetime)
+
+    def to_db_value(self, value: Any) -> datetime:
+        """
+        Convert to db value
+
+        :param		value:	The value
+        :type		value:	Any
+
+        :returns:	db value
+        :rtype:		datetime
+        """
+        return value if value is not None else self.default
+
+    def from_db_value(self, value: Any) -> datetime:
+        """
+        Convert from db value
+
+        :param		value:	The value
+        :type		value:	Any
+
+        :returns:	db value
+        :rtype:		datetime
+        """
+        if value is None or isinstance(value, datetime):
+            return value
+
+        return convert_datetime(str(value).encode())
+
+    def view_table_info(self):
+        """
+        View info in table view
+        """
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table(title="SQLSymphonyORM DateTimeField")
+        table.add_column("Parameters", style="blue")
+        table.add_column("Parameters values", style="green")
+
+        table.add_row("UNIQUE", str(self.unique))
+        table.add_row("NULL", str(self.null))
+        table.add_row("DEFAULT", str(self.default))
+
+        console = Console()
+        console.print(table)
+
+    def __str__(self):
+        return "<DateTimeField>"
+
+
+class DecimalField(BaseDataType):
+    """
+    This class describes a decimal field (stored as lossless TEXT).
+    """
+
+    def __init__(
+        self,
+        unique: bool = False,
+        null: bool = True,
+        default: Decimal = None,
+    ):
+        """
+        Constructs a new instance.
+
+        :param		unique:		  The unique
+        :type		unique:		  bool
+        :param		null:		  The null
+        :type		null:		  bool
+        :param		default:	  The default
+        :type		default:	  Decimal
+        """
+        self.primary_key = False
+        self.unique: bool = unique
+        self.null: bool = null
+        self.default: Decimal = default
+
+    def to_sql_type(self) -> str:
+        return DECIMAL_SQL_TYPE
+
+    def validate(self, value: Any) -> bool:
+        """
+        Validate value
+
+        :param		value:	The value
+        :type		value:	Any
+
+        :returns:	if the value is verified then True, otherwise False
+        :rtype:		bool
+        """
+        if value is None and self.null:
+            return True
+
+        if isinstance(value, (Decimal, int)):
+            return True
+
+        if isinstance(value, str):
+            try:
+                Decimal(value)
+            except InvalidOperation:
+                return False
+            return True
+
+        return False
+
+    def to_db_value(self, value: Any) -> Decimal:
+        """
+        Convert to db value
+
+        :param		value:	The value
+        :type		value:	Any
+
+        :returns:	db value
+        :rtype:		Decimal
+        """
+        return Decimal(value) if value is not None else self.default
+
+    def from_db_value(self, value: Any) -> Decimal:
+        """
+        Convert from db value
+
+        :param		value:	The value
+        :type		value:	Any
+
+        :returns:	db value
+        :rtype:		Decimal
+        """
+        return Decimal(str(value)) if value is not None else None
+
+    def view_table_info(self):
+        """
+        View info in table view
+        """
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table(title="SQLSymphonyORM DecimalField")
+        table.add_column("Parameters", style="blue")
+        table.add_column("Parameters values", style="green")
+
+        table.add_row("UNIQUE", str(self.unique))
+        table.add_row("NULL", str(self.null))
+        table.add_row("DEFAULT", str(self.default))
+
+        console = Console()
+        console.print(table)
+
+    def __str__(self):
+        return "<DecimalField>"
+
+
+class UUIDField(BaseDataType):
+    """
+    This class describes an uuid field (stored as 16-byte BLOB).
+    """
+
+    def __init__(
+        self,
+        unique: bool = False,
+        null: bool = True,
+        default: UUID = None,
+    ):
+        """
+        Constructs a new instance.
+
+        :param		unique:		  The unique
+        :type		unique:		  bool
+        :param		null:		  The null
+        :type		null:		  bool
+        :param		default:	  The default
+        :type		default:	  UUID
+        """
+        self.primary_key = False
+        self.unique: bool = unique
+        self.null: bool = null
+        self.default: UUID = default
+
+    def to_sql_type(self) -> str:
+        return UUID_SQL_TYPE
+
+    def validate(self, value: Any) -> bool:
+        """
+        Validate value
+
+        :param		value:	The value
+        :type		value:	Any
+
+        :returns:	if the value is verified then True, otherwise False
+        :rtype:		bool
+        """
+        if value is None and self.null:
+            return True
+
+        if isinstance(value, UUID):
+            return True
+
+        if isinstance(value, str):
+            try:
+                UUID(value)
+            except ValueError:
+                return False
+            return True
+
+        return False
+
+    def to_db_value(self, value: Any) -> UUID:
+        """
+        Convert to db value
+
+        :param		value:	The value
+        :type		value:	Any
+
+        :returns:	db value
+        :rtype:		UUID
+        """
+        if value is None:
+            return self.default
+
+        return value if isinstance(value, UUID) else UUID(str(value))
+
+    def from_db_value(self, value: Any) -> UUID:
+        """
+        Convert from db value
+
+        :param		value:	The value
+        :type		value:	Any
+
+        :returns:	db value
+        :rtype:		UUID
+        """
+        if value is None or isinstance(value, UUID):
+            return value
+
+        return convert_uuid(value) if isinstance(value, bytes) else UUID(str(value))
+
+    def view_table_info(self):
+        """
+        View info in table view
+        """
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table(title="SQLSymphonyORM UUIDField")
+        table.add_column("Parameters", style="blue")
+        table.add_column("Parameters values", style="green")
+
+        table.add_row("UNIQUE", str(self.unique))
+        table.add_row("NULL", str(self.null))
+        table.add_row("DEFAULT", str(self.default))
+
+        console = Console()
+        console.print(table)
+
+    def __str__(self):
+        return "<UUIDField>"
+
+
+class EnumField(BaseDataType):
+    """
+    This class describes an enum field (stored as INTEGER member value).
+    """
+
+    def __init__(
+        self,
+        enum_class: Type[Enum],
+        unique: bool = False,
+        null: bool = True,
+        default: Enum = None,
+    ):
+        """
+        Constructs a new instance.
+
+        :param		enum_class:	  The enum class (members must have int values)
+        :type		enum_class:	  Type[Enum]
+        :param		unique:		  The unique
+        :type		unique:		  bool
+        :param		null:		  The null
+        :type		null:		  bool
+        :param		default:	  The default
+        :type		default:	  Enum
+        """
+        self.primary_key = False
+        self.unique: bool = unique
+        self.null: bool = null
+        self.default: Enum = default
+
+        self.enum_class = enum_class
+        self.type_adapter = TypeAdapterRegistry().register_enum(
+            EnumField, self.enum_class
+        )
+
+    def to_sql_type(self) -> str:
+        return self.type_adapter.sql_type
+
+    def validate(self, value: Any) -> bool:
+        """
+        Validate value
+
+        :param		value:	The value
+        :type		value:	Any
+
+        :returns:	if the value is verified then True, otherwise False
+        :rtype:		bool
+        """
+        if value is None and self.null:
+            return True
+
+        return isinstance(value, self.enum_class)
+
+    def to_db_value(self, value: Any) -> Enum:
+        """
+        Convert to db value
+
+        :param		value:	The value
+        :type		value:	Any
+
+        :returns:	db value
+        :rtype:		Enum
+        """
+        return self.enum_class(value) if value is not None else self.default
+
+    def from_db_value(self, value: Any) -> Enum:
+        """
+        Convert from db value
+
+        :param		value:	The value
+        :type		value:	Any
+
+        :returns:	db value
+        :rtype:		Enum
+        """
+        if value is None or isinstance(value, self.enum_class):
+            return value
+
+        return self.enum_class(int(value))
+
+    def view_table_info(self):
+        """
+        View info in table view
+        """
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table(title="SQLSymphonyORM EnumField")
+        table.add_column("Parameters", style="blue")
+        table.add_column("Parameters values", style="green")
+
+        table.add_row("UNIQUE", str(self.unique))
+        table.add_row("NULL", str(self.null))
+        table.add_row("DEFAULT", str(self.default))
+        table.add_row("ENUM", self.enum_class.__name__)
+
+        console = Console()
+        console.print(table)
+
+    def __str__(self):
+        return "<EnumField>"
+
+
+class ForeignKey(BaseDataType):
+    """
+    This class describes a foreign key field (stored as INTEGER primary key
+    of related model). The related model is available through accessor of
+    the field (`user_id` -> `user`) and the list of referencing models
+    through `related_name` of the related model.
+    """
+
+    def __init__(
+        self,
+        to: Any,
+        related_name: str = None,
+        accessor: str = None,
+        on_delete: str = "CASCADE",
+        unique: bool = False,
+        null: bool = True,
+        default: int = None,
+    ):
+        """
+        Constructs a new instance.
+
+        :param		to:			   The related model class or "self"
+        :type		to:			   Any
+        :param		related_name:  The reverse relation name (<model>_set)
+        :type		related_name:  str
+        :param		accessor:	   The related model accessor (name without _id)
+        :type		accessor:	   str
+        :param		on_delete:	   The ON DELETE action
+        :type		on_delete:	   str
+        :param		unique:		   The unique
+        :type		unique:		   bool
+        :param		null:		   The null
+        :type		null:		   bool
+        :param		default:	   The default
+        :type		default:	   int
+        """
+        self.primary_key = False
+        self.unique: bool = unique
+        self.null: bool = null
+        self.default: int = default
+
+        self.to = to
+        self.related_name = related_name
+        self.accessor = accessor
+        self.on_delete = on_delete.upper()
+        self.name: str = None
+        self.model_class: Type = None
+
+    @property
+    def related_pk_name(self) -> str:
+        """
+        Get primary key name of related model
+
+        :returns:	primary key name
+        :rtype:		str
+        """
+        return next(
+            field_name
+            for field_name, field in self.to._original_fields.items()
+            if field.primary_key
+        )
+
+    def to_sql_type(self) -> str:
+        return (
+            f"INTEGER REFERENCES {self.to.table_name}({self.related_pk_name}) "
+            f"ON DELETE {self.on_delete}"
+        )
+
+    def validate(self, value: Any) -> bool:
+        """
+        Validate value
+
+        :param		value:	The value
+        :type		value:	Any
+
+        :returns:	if the value is verified then True, otherwise False
+        :rtype:		bool
+        """
+        if value is None:
+            return self.null
+
+        return isinstance(value, int) or hasattr(value, "_primary_key")
+
+    def to_db_value(self, value: Any) -> int:
+        """
+        Convert to db value (model instance to its primary key)
+
+        :param		value:	The value
+        :type		value:	Any
+
+        :returns:	db value
+        :rtype:		int
+        """
+        if value is None:
+            return self.default
+
+        if hasattr(value, "_primary_key"):
+            return value.pk
+
+        return int(value)
+
+    def from_db_value(self, value: Any) -> int:
+        """
+        Convert from db value
+
+        :param		value:	The value
+        :type		value:	Any
+
+        :returns:	db value
+        :rtype:		int
+        """
+        return int(value) if value is not None else None
+
+    def view_table_info(self):
+        """
+        View info in table view
+        """
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table(title="SQLSymphonyORM ForeignKey")
+        table.add_column("Parameters", style="blue")
+        table.add_column("Parameters values", style="green")
+
+        table.add_row("UNIQUE", str(self.unique))
+        table.add_row("NULL", str(self.null))
+        table.add_row("DEFAULT", str(self.default))
+        table.add_row("TO", getattr(self.to, "__name__", str(self.to)))
+        table.add_row("RELATED NAME", str(self.related_name))
+        table.add_row("ON DELETE", self.on_delete)
+
+        console = Console()
+        console.print(table)
+
+    def __str__(self):
+        return "<ForeignKey>"
+
+
 class FieldMeta(type):
     """
     This class describes a field meta.
@@ -856,3 +1467,14 @@ class FieldMeta(type):
 
     def __str__(self):
         return "<FieldMeta>"
+
+
+type_adapters = TypeAdapterRegistry()
+type_adapters.register(BooleanField, bool, BOOLEAN_SQL_TYPE, adapt_bool, convert_bool)
+type_adapters.register(
+    DateTimeField, datetime, DATETIME_SQL_TYPE, adapt_datetime, convert_datetime
+)
+type_adapters.register(
+    DecimalField, Decimal, DECIMAL_SQL_TYPE, adapt_decimal, convert_decimal
+)
+type_adapters.register(UUIDField, UUID, UUID_SQL_TYPE, adapt_uuid, convert_uuid)
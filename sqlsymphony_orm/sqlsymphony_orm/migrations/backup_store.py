@@ -0,0 +1,396 @@
+import os
+import json
+import time
+import zlib
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Union
+
+from loguru import logger
+
+from sqlsymphony_orm.exceptions import MigrationError
+from sqlsymphony_orm.models.session_models import SQLiteSession
+from sqlsymphony_orm.security.hashing import PlainHasher, HashAlgorithm
+
+SQLITE_HEADER_SIZE = 100
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+def get_page_size(path: Union[str, Path]) -> int:
+    """
+    Gets the page size of sqlite database file from its header.
+
+    :param		path:  The database file path
+    :type		path:  Union[str, Path]
+
+    :returns:	The page size.
+    :rtype:		int
+    """
+    with open(path, "rb") as file:
+        header = file.read(SQLITE_HEADER_SIZE)
+
+    page_size = int.from_bytes(header[16:18], "big")
+
+    return 65536 if page_size == 1 else page_size
+
+
+class ChunkedBackupStore:
+    """
+    Deduplicated, compressed store of database backups.
+
+    A backup is split into fixed-size chunks of whole database pages (1 MB
+    by default), every chunk is stored once zlib-compressed and addressed by
+    its hash, and the backup itself is a JSON manifest listing chunk hashes.
+    Successive backups share every chunk that did not change, so N backups
+    cost one full copy plus changed chunks.
+    """
+
+    def __init__(
+        self,
+        store_dir: Union[str, Path],
+        algorithm: HashAlgorithm = HashAlgorithm.SHA256,
+        compression_level: int = 6,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        """
+        Constructs a new instance.
+
+        :param		store_dir:			The store directory
+        :type		store_dir:			Union[str, Path]
+        :param		algorithm:			The chunk hash algorithm
+        :type		algorithm:			HashAlgorithm
+        :param		compression_level:	The zlib compression level
+        :type		compression_level:	int
+        :param		chunk_size:			The chunk size in bytes, rounded down to
+                                        whole database pages
+        :type		chunk_size:			int
+        """
+        self.store_dir = Path(store_dir)
+        self.chunks_dir = self.store_dir / "chunks"
+        self.manifests_dir = self.store_dir / "manifests"
+        self.hasher = PlainHasher(algorithm)
+        self.algorithm = algorithm
+        self.compression_level = compression_level
+        self.chunk_size = chunk_size
+
+        os.makedirs(self.chunks_dir, exist_ok=True)
+        os.makedirs(self.manifests_dir, exist_ok=True)
+
+    def _chunk_path(self, digest: str) -> Path:
+        """
+        Get path of chunk file
+
+        :param		digest:	 The chunk digest
+        :type		digest:	 str
+
+        :returns:	chunk path
+        :rtype:		Path
+        """
+        return self.chunks_dir / digest[:2] / digest
+
+    def _iter_chunks(self) -> Iterator[Path]:
+        """
+        Iterate over stored chunk files, skipping unfinished temporary files
+
+        :returns:	chunk paths
+        :rtype:		Iterator[Path]
+        """
+        for path in self.chunks_dir.glob("*/*"):
+            if path.suffix != ".tmp":
+                yield path
+
+    def _manifest_path(self, name: str) -> Path:
+        """
+        Get path of manifest file
+
+        :param		name:  The backup name
+        :type		name:  str
+
+        :returns:	manifest path
+        :rtype:		Path
+        """
+        return self.manifests_dir / f"{name}.json"
+
+    def exists(self, name: str) -> bool:
+        """
+        Determines if backup exists.
+
+        :param		name:  The backup name
+        :type		name:  str
+
+        :returns:	True if exists, False otherwise.
+        :rtype:		bool
+        """
+        return self._manifest_path(name).exists()
+
+    def list_backups(self) -> List[str]:
+        """
+        Get names of stored backups
+
+        :returns:	backup names
+        :rtype:		List[str]
+        """
+        return sorted(path.stem for path in self.manifests_dir.glob("*.json"))
+
+    def get_manifest(self, name: str) -> Dict:
+        """
+        Gets the manifest of backup.
+
+        :param		name:			 The backup name
+        :type		name:			 str
+
+        :returns:	The manifest.
+        :rtype:		Dict
+
+        :raises		MigrationError:	 backup does not exist
+        """
+        path = self._manifest_path(name)
+
+        if not path.exists():
+            raise MigrationError(f"Backup {name} does not exist in {self.store_dir}")
+
+        with open(path, "r") as read_file:
+            return json.load(read_file)
+
+    def save(self, session: SQLiteSession, name: str, **kwargs) -> Dict:
+        """
+        Backup session database into the store. The database is copied online
+        with the SQLite backup API (see SQLiteSession.backup, kwargs are passed
+        there) and then split into chunks.
+
+        :param		session:  The session
+        :type		session:  SQLiteSession
+        :param		name:	  The backup name
+        :type		name:	  str
+        :param		kwargs:	  The backup arguments (pages, progress, sleep)
+        :type		kwargs:	  dict
+
+        :returns:	The manifest.
+        :rtype:		Dict
+        """
+        fd, snapshot = tempfile.mkstemp(dir=self.store_dir, suffix=".db")
+        os.close(fd)
+
+        try:
+            session.backup(snapshot, compact=False, **kwargs)
+            manifest = self.save_file(snapshot, name)
+        finally:
+            os.remove(snapshot)
+
+        return manifest
+
+    def save_file(self, path: Union[str, Path], name: str) -> Dict:
+        """
+        Save sqlite database file into the store
+
+        :param		path:  The database file path
+        :type		path:  Union[str, Path]
+        :param		name:  The backup name
+        :type		name:  str
+
+        :returns:	The manifest.
+        :rtype:		Dict
+        """
+        page_size = get_page_size(path)
+        chunk_size = max(1, self.chunk_size // page_size) * page_size
+        chunks = []
+        new_chunks = 0
+        stored_bytes = 0
+
+        with open(path, "rb") as file:
+            while chunk := file.read(chunk_size):
+                digest = self.hasher.hash(chunk).hex()
+                chunk_path = self._chunk_path(digest)
+                chunks.append(digest)
+
+                if chunk_path.exists():
+                    continue
+
+                data = zlib.compress(chunk, self.compression_level)
+                os.makedirs(chunk_path.parent, exist_ok=True)
+                self._write_atomic(chunk_path, data)
+                new_chunks += 1
+                stored_bytes += len(data)
+
+        manifest = {
+            "name": name,
+            "created_at": time.time(),
+            "algorithm": self.algorithm.name,
+            "page_size": page_size,
+            "chunk_size": chunk_size,
+            "size": os.path.getsize(path),
+            "chunks": chunks,
+        }
+        self._write_atomic(
+            self._manifest_path(name), json.dumps(manifest).encode("utf-8")
+        )
+
+        logger.info(
+            "[BackupStore] Save {}: {} chunks, {} new ({} bytes)",
+            name,
+            len(chunks),
+            new_chunks,
+            stored_bytes,
+        )
+
+        return manifest
+
+    def restore(self, session: SQLiteSession, name: str, **kwargs):
+        """
+        Restore session database from the store. The backup is assembled into
+        a temporary file and copied with the SQLite backup API (see
+        SQLiteSession.restore, kwargs are passed there).
+
+        :param		session:  The session
+        :type		session:  SQLiteSession
+        :param		name:	  The backup name
+        :type		name:	  str
+        :param		kwargs:	  The restore arguments (pages, progress, sleep)
+        :type		kwargs:	  dict
+        """
+        fd, snapshot = tempfile.mkstemp(dir=self.store_dir, suffix=".db")
+        os.close(fd)
+
+        try:
+            self.restore_file(name, snapshot)
+            session.restore(snapshot, **kwargs)
+        finally:
+            os.remove(snapshot)
+
+    def restore_file(self, name: str, path: Union[str, Path]):
+        """
+        Assemble backup into sqlite database file
+
+        :param		name:			 The backup name
+        :type		name:			 str
+        :param		path:			 The target file path
+        :type		path:			 Union[str, Path]
+
+        :raises		MigrationError:	 chunk is missing or corrupted
+        """
+        manifest = self.get_manifest(name)
+        hasher = PlainHasher(HashAlgorithm[manifest["algorithm"]])
+
+        logger.info("[BackupStore] Restore {} to {}", name, path)
+
+        with open(path, "wb") as file:
+            for digest in manifest["chunks"]:
+                try:
+                    chunk = zlib.decompress(self._chunk_path(digest).read_bytes())
+                except (OSError, zlib.error) as ex:
+                    raise MigrationError(
+                        f"Backup {name}: cannot read chunk {digest}: {ex}"
+                    ) from ex
+
+                if hasher.hash(chunk).hex() != digest:
+                    raise MigrationError(f"Backup {name}: chunk {digest} is corrupted")
+
+                file.write(chunk)
+
+    def remove(self, name: str):
+        """
+        Remove backup manifest. Chunks are freed by `collect_garbage`.
+
+        :param		name:  The backup name
+        :type		name:  str
+        """
+        self._manifest_path(name).unlink(missing_ok=True)
+
+    def collect_garbage(self) -> int:
+        """
+        Remove chunks not referenced by any backup
+
+        :returns:	number of removed chunks
+        :rtype:		int
+        """
+        referenced = set()
+
+        for name in self.list_backups():
+            referenced.update(self.get_manifest(name)["chunks"])
+
+        removed = 0
+
+        for chunk_path in self._iter_chunks():
+            if chunk_path.name not in referenced:
+                chunk_path.unlink()
+                removed += 1
+
+        logger.debug("[BackupStore] Collect garbage: {} chunks removed", removed)
+
+        return removed
+
+    def get_stats(self) -> Dict:
+        """
+        Gets the store statistics.
+
+        :returns:	backups count, logical size and stored size in bytes
+        :rtype:		Dict
+        """
+        logical_bytes = sum(
+            self.get_manifest(name)["size"] for name in self.list_backups()
+        )
+        stored_bytes = sum(path.stat().st_size for path in self._iter_chunks())
+
+        return {
+            "backups": len(self.list_backups()),
+            "logical_bytes": logical_bytes,
+            "stored_bytes": stored_bytes,
+            "ratio": logical_bytes / stored_bytes if stored_bytes else 0.0,
+        }
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        """
+        Write file through unique temporary file in the same directory and
+        rename, so concurrent writers of one path never share a temporary file
+
+        :param		path:  The path
+        :type		path:  Path
+        :param		data:  The data
+        :type		data:  bytes
+        """
+        fd, temp_path = tempfile.mkstemp(
+            dir=path.parent, prefix=f"{path.name}.", suffix=".tmp"
+        )
+
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                temp_file.write(data)
+
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def view_table_info(self):
+        """
+        View stored backups in table view
+        """
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table(title=f"SQLSymphonyORM Backup Store {self.store_dir}")
+        table.add_column("Backup", style="blue")
+        table.add_column("Chunks", style="cyan")
+        table.add_column("Chunk size", style="cyan")
+        table.add_column("Size", style="green")
+
+        for name in self.list_backups():
+            manifest = self.get_manifest(name)
+            table.add_row(
+                name,
+                str(len(manifest["chunks"])),
+                str(manifest["chunk_size"]),
+                str(manifest["size"]),
+            )
+
+        stats = self.get_stats()
+        table.add_row(
+            "Total",
+            "",
+            "",
+            f"{stats['logical_bytes']} ({stats['stored_bytes']} stored)",
+        )
+
+        console = Console()
+        console.print(table)
@@ -0,0 +1,286 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+
+from sqlsymphony_orm.database.schema import SQLiteSchemaInspector
+from sqlsymphony_orm.exceptions import MigrationError
+from sqlsymphony_orm.models.session_models import SQLiteSession
+
+CHECKPOINTS_TABLE = "_sqlsymphony_data_migrations"
+
+
+@dataclass
+class DataMigration:
+    """
+    This dataclass describes a data migration step.
+
+    Rows of `source_table` are read in rowid order, `chunk_size` rows at a
+    time, passed through `transform` (row dict -> dict, or None to skip the
+    row) and inserted into `target_table`. Without `target_table` the source
+    rows are updated in place.
+    """
+
+    name: str
+    source_table: str
+    target_table: Optional[str] = None
+    transform: Optional[Callable[[dict], Optional[dict]]] = None
+    columns: Optional[List[str]] = None
+    chunk_size: int = 1000
+    throttle: float = 0.0
+
+
+class SQLiteDataMigrator:
+    """
+    Batched, resumable runner of data migrations.
+
+    Every chunk is read, written and checkpointed in one transaction, so after
+    a crash the migration resumes from the last committed rowid and no row is
+    copied twice. The write lock is released between chunks and `throttle`
+    seconds are slept there, leaving the write window to the live application.
+    """
+
+    def __init__(
+        self,
+        session: SQLiteSession,
+        schema: Optional[SQLiteSchemaInspector] = None,
+    ):
+        """
+        Constructs a new instance.
+
+        :param		session:  The session
+        :type		session:  SQLiteSession
+        :param		schema:	  The schema inspector
+        :type		schema:	  Optional[SQLiteSchemaInspector]
+        """
+        self.session = session
+        self.schema = (
+            schema if schema is not None else SQLiteSchemaInspector(session.execute)
+        )
+        self.session.execute(
+            f"CREATE TABLE IF NOT EXISTS {CHECKPOINTS_TABLE} ("
+            "name TEXT PRIMARY KEY, source_table TEXT, target_table TEXT, "
+            "last_rowid INTEGER NOT NULL DEFAULT 0, rows_done INTEGER NOT NULL "
+            "DEFAULT 0, status TEXT NOT NULL, updated_at REAL)"
+        )
+
+    def get_checkpoint(self, name: str) -> Optional[Dict]:
+        """
+        Gets the checkpoint of data migration.
+
+        :param		name:  The migration name
+        :type		name:  str
+
+        :returns:	The checkpoint or None if migration never ran
+        :rtype:		Optional[Dict]
+        """
+        rows = self.session.execute(
+            "SELECT last_rowid, rows_done, status, updated_at "
+            f"FROM {CHECKPOINTS_TABLE} WHERE name = ?",
+            (name,),
+        )
+
+        if not rows:
+            return None
+
+        return {
+            "last_rowid": rows[0][0],
+            "rows_done": rows[0][1],
+            "status": rows[0][2],
+            "updated_at": rows[0][3],
+        }
+
+    def reset(self, name: str):
+        """
+        Drop checkpoint, the next run starts from the first row
+
+        :param		name:  The migration name
+        :type		name:  str
+        """
+        logger.debug(f"[DataMigration] Reset checkpoint of {name}")
+        self.session.execute(f"DELETE FROM {CHECKPOINTS_TABLE} WHERE name = ?", (name,))
+
+    def run(self, migration: DataMigration, max_chunks: Optional[int] = None) -> int:
+        """
+        Run (or resume) data migration
+
+        :param		migration:		 The migration
+        :type		migration:		 DataMigration
+        :param		max_chunks:		 Stop after this number of chunks
+        :type		max_chunks:		 Optional[int]
+
+        :returns:	number of migrated rows in total
+        :rtype:		int
+
+        :raises		MigrationError:	 source table does not exist or write failed
+        """
+        checkpoint = self.get_checkpoint(migration.name)
+
+        if checkpoint is not None and checkpoint["status"] == "done":
+            logger.info(f"[DataMigration] {migration.name} is already done")
+            return checkpoint["rows_done"]
+
+        columns = migration.columns
+
+        if columns is None:
+            columns = [
+                column.name
+                for column in self.schema.get_columns(migration.source_table)
+            ]
+
+        if not columns:
+            raise MigrationError(
+                f'Cannot run data migration "{migration.name}": table '
+                f"{migration.source_table} does not exist"
+            )
+
+        last_rowid = checkpoint["last_rowid"] if checkpoint is not None else 0
+        rows_done = checkpoint["rows_done"] if checkpoint is not None else 0
+        chunks = 0
+
+        logger.info(
+            f"[DataMigration] Run {migration.name} from rowid {last_rowid} "
+            f"({rows_done} rows done)"
+        )
+
+        select_query = (
+            f"SELECT rowid, {', '.join(columns)} FROM {migration.source_table} "
+            "WHERE rowid > ? ORDER BY rowid LIMIT ?"
+        )
+
+        while max_chunks is None or chunks < max_chunks:
+            try:
+                with self.session.transaction():
+                    rows = self.session.execute(
+                        select_query, (last_rowid, migration.chunk_size)
+                    )
+
+                    if not rows:
+                        self._save_checkpoint(migration, last_rowid, rows_done, "done")
+                        break
+
+                    rows_done += self._write_chunk(migration, columns, rows)
+                    last_rowid = rows[-1][0]
+                    self._save_checkpoint(migration, last_rowid, rows_done, "running")
+            except Exception as ex:
+                raise MigrationError(
+                    f'Data migration "{migration.name}" failed after rowid '
+                    f"{last_rowid}: {ex}"
+                ) from ex
+
+            chunks += 1
+            logger.debug(
+                f"[DataMigration] {migration.name}: chunk {chunks}, rowid "
+                f"{last_rowid}, {rows_done} rows done"
+            )
+
+            if migration.throttle:
+                time.sleep(migration.throttle)
+
+        return rows_done
+
+    def _write_chunk(self, migration: DataMigration, columns: list, rows: list) -> int:
+        """
+        Transform and write rows of one chunk
+
+        :param		migration:	The migration
+        :type		migration:	DataMigration
+        :param		columns:	The source columns
+        :type		columns:	list
+        :param		rows:		The rows (rowid first)
+        :type		rows:		list
+
+        :returns:	number of written rows
+        :rtype:		int
+        """
+        batches = {}
+
+        for row in rows:
+            values = dict(zip(columns, row[1:]))
+
+            if migration.transform is not None:
+                values = migration.transform(values)
+
+            if values is None:
+                continue
+
+            batch = batches.setdefault(tuple(values.keys()), [])
+
+            if migration.target_table is None:
+                batch.append((*values.values(), row[0]))
+            else:
+                batch.append(tuple(values.values()))
+
+        written = 0
+
+        for keys, values in batches.items():
+            if migration.target_table is None:
+                query = (
+                    f"UPDATE {migration.source_table} SET "
+                    f"{', '.join(f'{key} = ?' for key in keys)} WHERE rowid = ?"
+                )
+            else:
+                query = (
+                    f"INSERT INTO {migration.target_table} ({', '.join(keys)}) "
+                    f"VALUES ({', '.join('?' for _ in keys)})"
+                )
+
+            self.session.execute_many(query, values)
+            written += len(values)
+
+        return written
+
+    def _save_checkpoint(
+        self, migration: DataMigration, last_rowid: int, rows_done: int, status: str
+    ):
+        """
+        Save checkpoint of data migration
+
+        :param		migration:	 The migration
+        :type		migration:	 DataMigration
+        :param		last_rowid:	 The last migrated rowid
+        :type		last_rowid:	 int
+        :param		rows_done:	 The number of migrated rows
+        :type		rows_done:	 int
+        :param		status:		 The status
+        :type		status:		 str
+        """
+        self.session.execute(
+            f"INSERT OR REPLACE INTO {CHECKPOINTS_TABLE} (name, source_table, "
+            "target_table, last_rowid, rows_done, status, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                migration.name,
+                migration.source_table,
+                migration.target_table,
+                last_rowid,
+                rows_done,
+                status,
+                time.time(),
+            ),
+        )
+
+    def view_table_info(self):
+        """
+        View data migrations checkpoints in table view
+        """
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table(title="SQLSymphonyORM Data Migrations")
+        table.add_column("Name", style="blue")
+        table.add_column("Source", style="cyan")
+        table.add_column("Target", style="cyan")
+        table.add_column("Last rowid", style="magenta")
+        table.add_column("Rows done", style="green")
+        table.add_column("Status", style="yellow")
+
+        for row in self.session.execute(
+            "SELECT name, source_table, target_table, last_rowid, rows_done, "
+            f"status FROM {CHECKPOINTS_TABLE} ORDER BY updated_at"
+        ):
+            table.add_row(*[str(value) for value in row])
+
+        console = Console()
+        console.print(table)
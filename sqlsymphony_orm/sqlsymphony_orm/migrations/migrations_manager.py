@@ -1,16 +1,23 @@
-from typing import Optional, Union
+from typing import Optional, Union, Callable, Iterable, List, Dict
 from abc import ABC, abstractmethod
 import os
 import json
-import shutil
+import sqlite3
+import time
 from pathlib import Path
 from datetime import datetime
 from loguru import logger
 from sqlsymphony_orm.models.session_models import SQLiteSession
+from sqlsymphony_orm.database.schema import SQLiteSchemaInspector
+from sqlsymphony_orm.migrations.data_migrations import DataMigration, SQLiteDataMigrator
+from sqlsymphony_orm.migrations.backup_store import ChunkedBackupStore
 from sqlsymphony_orm.exceptions import MigrationError
+from sqlsymphony_orm.security.hashing import PlainHasher, HashAlgorithm
 from sqlsymphony_orm.models.orm_models import Model
 from sqlsymphony_orm.models.session_models import SessionModel
 
+MIGRATIONS_TABLE = "_sqlsymphony_migrations"
+
 
 class MigrationManager(ABC):
     """
@@ -57,38 +64,76 @@ class MigrationManager(ABC):
 class SQLiteMigrationManager(MigrationManager):
     """
     This class describes a sqlite migration manager.
+
+    Migrations history is stored in the `_sqlsymphony_migrations` table of the
+    migrated database itself. DDL and data steps of a migration and its
+    history row are committed in one transaction, so a database is either
+    fully migrated or not migrated at all.
     """
 
-    def __init__(self, session: SQLiteSession, migrations_dir: str = "migrations"):
+    def __init__(
+        self,
+        session: SQLiteSession,
+        migrations_dir: str = "migrations",
+        backup_pages: int = 1024,
+        backup_sleep: float = 0.05,
+        backup_progress: Optional[Callable[[int, int, int], None]] = None,
+        backup_store: Optional[ChunkedBackupStore] = None,
+    ):
         """
         Constructs a new instance.
 
-        :param		session:		 The session
-        :type		session:		 SQLiteSession
-        :param		migrations_dir:	 The migrations dir
-        :type		migrations_dir:	 str
+        :param		session:		  The session
+        :type		session:		  SQLiteSession
+        :param		migrations_dir:	  The migrations dir
+        :type		migrations_dir:	  str
+        :param		backup_pages:	  The pages copied per backup step
+        :type		backup_pages:	  int
+        :param		backup_sleep:	  The pause between backup steps in seconds
+        :type		backup_sleep:	  float
+        :param		backup_progress:  The backup progress callback
+        :type		backup_progress:  Optional[Callable[[int, int, int], None]]
+        :param		backup_store:	  The backup store (chunk store in migrations_dir by default)
+        :type		backup_store:	  Optional[ChunkedBackupStore]
         """
         self.session = session
         self.migrations_dir = migrations_dir
+        self.backup_pages = backup_pages
+        self.backup_sleep = backup_sleep
+        self.backup_progress = backup_progress
+        self.schema = SQLiteSchemaInspector(self.session.execute)
         os.makedirs(self.migrations_dir, exist_ok=True)
-        self.migrations = {}
-        self.migrations_file = "sqlsymphony_migrates.json"
+        self.backup_store = (
+            backup_store
+            if backup_store is not None
+            else ChunkedBackupStore(self.migrations_dir)
+        )
+        self.session.execute(
+            f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE, "
+            "checksum TEXT NOT NULL, table_name TEXT, description TEXT, "
+            "sql_queries TEXT, fields TEXT, migrationfile TEXT, applied_at REAL)"
+        )
 
     def get_current_table_columns(self, table_name: str) -> list:
         """
-        Gets the current table columns.
+        Gets the current table columns (from PRAGMA table_info, the table
+        rows are not read).
 
         :param		table_name:	 The table name
         :type		table_name:	 str
 
         :returns:	The current table columns.
         :rtype:		list
+
+        :raises		sqlite3.OperationalError:  table does not exist
         """
-        data = self.session.execute(f"SELECT * FROM {table_name}", get_cursor=True)
-        cursor = data[0]
-        fieldnames = [field[0] for field in cursor.description]
+        schema = self.schema.get_table(table_name)
+
+        if schema is None:
+            raise sqlite3.OperationalError(f"no such table: {table_name}")
 
-        return fieldnames
+        return schema.column_names
 
     def get_table_columns_from_model(self, model: Model) -> list:
         """
@@ -102,15 +147,121 @@ class SQLiteMigrationManager(MigrationManager):
         """
         return [key for key in model._original_fields.keys()]
 
-    def upload_migrations_file(self):
-        logger.debug(f"Load JSON migrations history file: {self.migrations_file}")
-        with open(self.migrations_file, "r") as read_file:
-            self.migrations = json.load(read_file)
+    @staticmethod
+    def get_checksum(sql_queries: Iterable[str]) -> str:
+        """
+        Gets the checksum of migration sql queries.
+
+        :param		sql_queries:  The sql queries
+        :type		sql_queries:  Iterable[str]
+
+        :returns:	sha256 hex digest
+        :rtype:		str
+        """
+        return PlainHasher(HashAlgorithm.SHA256).hash("\n".join(sql_queries)).hex()
 
-    def update_migrations_file(self):
-        logger.debug(f"Update JSON migrations history file: {self.migrations_file}")
-        with open(self.migrations_file, "w") as write_file:
-            json.dump(self.migrations, write_file, indent=4)
+    def get_applied_migrations(self) -> List[Dict]:
+        """
+        Gets the applied migrations in order of applying.
+
+        :returns:	The applied migrations.
+        :rtype:		List[Dict]
+        """
+        rows = self.session.execute(
+            "SELECT id, name, checksum, table_name, description, sql_queries, "
+            f"fields, migrationfile, applied_at FROM {MIGRATIONS_TABLE} ORDER BY id"
+        )
+
+        return [
+            {
+                "id": row[0],
+                "name": row[1],
+                "checksum": row[2],
+                "tablename": row[3],
+                "description": row[4],
+                "sql_queries": json.loads(row[5]),
+                "fields": json.loads(row[6]),
+                "migrationfile": row[7],
+                "applied_at": row[8],
+            }
+            for row in rows
+        ]
+
+    def is_applied(self, name: str, checksum: Optional[str] = None) -> bool:
+        """
+        Determines if migration is applied.
+
+        :param		name:			 The migration name
+        :type		name:			 str
+        :param		checksum:		 The expected checksum
+        :type		checksum:		 Optional[str]
+
+        :returns:	True if applied, False otherwise.
+        :rtype:		bool
+
+        :raises		MigrationError:	 applied migration has another checksum
+        """
+        rows = self.session.execute(
+            f"SELECT checksum FROM {MIGRATIONS_TABLE} WHERE name = ?", (name,)
+        )
+
+        if not rows:
+            return False
+
+        if checksum is not None and rows[0][0] != checksum:
+            raise MigrationError(
+                f'Migration "{name}" is already applied with another checksum '
+                f"({rows[0][0]} != {checksum})"
+            )
+
+        return True
+
+    def get_pending(self, names: Iterable[str]) -> List[str]:
+        """
+        Gets the pending (not applied) migrations names.
+
+        :param		names:	The migrations names
+        :type		names:	Iterable[str]
+
+        :returns:	The pending names in given order.
+        :rtype:		List[str]
+        """
+        rows = self.session.execute(f"SELECT name FROM {MIGRATIONS_TABLE}")
+        applied = set(row[0] for row in rows)
+
+        return [name for name in names if name not in applied]
+
+    def import_migrations_file(
+        self, migrations_file: str = "sqlsymphony_migrates.json"
+    ):
+        """
+        Import history from legacy JSON migrations file
+
+        :param		migrations_file:  The migrations file
+        :type		migrations_file:  str
+        """
+        logger.debug(f"Import JSON migrations history file: {migrations_file}")
+
+        with open(migrations_file, "r") as read_file:
+            migrations = json.load(read_file)
+
+        with self.session.transaction():
+            for index_key, migration in migrations.items():
+                self.session.execute(
+                    f"INSERT OR IGNORE INTO {MIGRATIONS_TABLE} (name, checksum, "
+                    "table_name, description, sql_queries, fields, migrationfile, "
+                    "applied_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        f"legacy_{index_key}",
+                        self.get_checksum(migration["sql_queries"]),
+                        migration["tablename"],
+                        migration["description"],
+                        json.dumps(migration["sql_queries"]),
+                        json.dumps(migration["fields"]),
+                        migration["migrationfile"],
+                        None,
+                    ),
+                )
 
     def migrate_from_model(
         self,
@@ -118,9 +269,14 @@ class SQLiteMigrationManager(MigrationManager):
         new_model: Union[SessionModel, Model],
         original_table_name: str,
         new_table_name: Optional[str] = None,
-    ):
+        name: Optional[str] = None,
+        data_migrations: Iterable[DataMigration] = (),
+    ) -> bool:
         """
-        Migrate from old model to new model
+        Migrate from old model to new model. DDL queries, data migrations and
+        history row are committed in one transaction. Data migrations run
+        without chunk commits and throttling here, use run_data_migration for
+        resumable steps on large tables.
 
         :param		old_model:			  The old model
         :type		old_model:			  Union[SessionModel, Model]
@@ -130,8 +286,15 @@ class SQLiteMigrationManager(MigrationManager):
         :type		original_table_name:  str
         :param		new_table_name:		  The new table name
         :type		new_table_name:		  Optional[str]
+        :param		name:				  The migration name
+        :type		name:				  Optional[str]
+        :param		data_migrations:	  The data migration steps
+        :type		data_migrations:	  Iterable[DataMigration]
 
-        :raises		MigrationError:		  fields error
+        :returns:	False if migration is already applied
+        :rtype:		bool
+
+        :raises		MigrationError:		  fields error or migration failed
         """
         sql_queries = []
 
@@ -182,55 +345,143 @@ class SQLiteMigrationManager(MigrationManager):
             logger.debug(f"[Migration] Add column {field} to {original_table_name}")
             sql_queries.append(f"ALTER TABLE {original_table_name} ADD COLUMN {field};")
 
-        migrationfile = os.path.join(
-            self.migrations_dir,
-            f'{datetime.now().strftime("backup_%Y%m%d%H%M%S")}_{self.session.database_file}',
+        data_migrations = list(data_migrations)
+        checksum = self.get_checksum(
+            sql_queries
+            + [
+                f"{step.name} {step.source_table} {step.target_table}"
+                for step in data_migrations
+            ]
+        )
+
+        if name is None:
+            name = f"{old_model._model_name}_to_{new_model._model_name}_{checksum[:12]}"
+
+        if self.is_applied(name, checksum):
+            logger.info(f"[Migration] {name} is already applied")
+            return False
+
+        migrationfile = f"{datetime.now().strftime('backup_%Y%m%d%H%M%S%f')}_{Path(self.session.database_file).name}"
+        logger.debug(f"Create migraton backup: {migrationfile}")
+        self.backup_store.save(
+            self.session,
+            migrationfile,
+            pages=self.backup_pages,
+            progress=self.backup_progress,
+            sleep=self.backup_sleep,
         )
-        logger.debug(f"Create migraton file: {migrationfile}")
-        shutil.copyfile(self.session.database_file, migrationfile)
-
-        if Path(self.migrations_file).exists():
-            self.upload_migrations_file()
-
-        self.migrations[str(len(self.migrations) + 1)] = {
-            "migrationfile": migrationfile,
-            "tablename": original_table_name,
-            "description": f"from {old_model._model_name} to {new_model._model_name}",
-            "sql_queries": list(sql_queries),
-            "fields": {
-                "new": list(new_fields),
-                "old": list(old_fields),
-                "added": list(added),
-                "dropped": list(dropped),
-            },
+
+        fields = {
+            "new": list(new_fields),
+            "old": list(old_fields),
+            "added": list(added),
+            "dropped": list(dropped),
         }
 
-        self.update_migrations_file()
+        try:
+            with self.session.transaction():
+                for sql_query in sql_queries:
+                    logger.debug(f"[Migration] Execute sql query: {sql_query}")
+                    self.session.execute(sql_query)
+
+                for step in data_migrations:
+                    SQLiteDataMigrator(self.session, self.schema).run(step)
+
+                self.session.execute(
+                    f"INSERT INTO {MIGRATIONS_TABLE} (name, checksum, table_name, "
+                    "description, sql_queries, fields, migrationfile, applied_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        name,
+                        checksum,
+                        original_table_name,
+                        f"from {old_model._model_name} to {new_model._model_name}",
+                        json.dumps(sql_queries),
+                        json.dumps(fields),
+                        migrationfile,
+                        time.time(),
+                    ),
+                )
+        except Exception as ex:
+            raise MigrationError(str(ex))
 
-        for sql_query in sql_queries:
-            logger.debug(f"[Migration] Execute sql query: {sql_query}")
+        logger.info(f"[Migration] {name} applied")
 
-            try:
-                self.session.execute(sql_query)
-            except Exception as ex:
-                raise MigrationError(str(ex))
+        return True
 
     def revert_migration(self, index_key: int = -1):
         """
         Revert migration
 
-        :param		index_key:	The index key
-        :type		index_key:	int
-        """
-        self.upload_migrations_file()
+        :param		index_key:		 The index key (id in migrations history)
+        :type		index_key:		 int
 
+        :raises		MigrationError:	 migration not found
+        """
         if index_key == -1:
-            index_key = [k for k in self.migrations.keys()][-1]
+            rows = self.session.execute(
+                f"SELECT migrationfile FROM {MIGRATIONS_TABLE} ORDER BY id DESC LIMIT 1"
+            )
+        else:
+            rows = self.session.execute(
+                f"SELECT migrationfile FROM {MIGRATIONS_TABLE} WHERE id = ?",
+                (int(index_key),),
+            )
 
-        try:
-            migration = self.migrations[str(index_key)]
-        except KeyError as ke:
-            logger.error(f"Cannot get migration by index {index_key}: {ke}")
+        if not rows:
+            logger.error(f"Cannot get migration by index {index_key}")
+            raise MigrationError(f"Cannot get migration by index {index_key}")
 
         logger.info("[Migration] Rollback database from new to old.")
-        shutil.copyfile(migration["migrationfile"], self.session.database_file)
+        restore_kwargs = {
+            "pages": self.backup_pages,
+            "progress": self.backup_progress,
+            "sleep": self.backup_sleep,
+        }
+
+        if self.backup_store.exists(rows[0][0]):
+            self.backup_store.restore(self.session, rows[0][0], **restore_kwargs)
+        else:
+            self.session.restore(rows[0][0], **restore_kwargs)
+
+    def run_data_migration(
+        self, migration: DataMigration, max_chunks: Optional[int] = None
+    ) -> int:
+        """
+        Run (or resume) batched data migration, see SQLiteDataMigrator
+
+        :param		migration:	 The migration
+        :type		migration:	 DataMigration
+        :param		max_chunks:	 Stop after this number of chunks
+        :type		max_chunks:	 Optional[int]
+
+        :returns:	number of migrated rows in total
+        :rtype:		int
+        """
+        return SQLiteDataMigrator(self.session, self.schema).run(migration, max_chunks)
+
+    def view_table_info(self):
+        """
+        View migrations history in table view
+        """
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table(title="SQLSymphonyORM Migrations")
+        table.add_column("ID", style="blue")
+        table.add_column("Name", style="cyan")
+        table.add_column("Table", style="magenta")
+        table.add_column("Checksum", style="green")
+        table.add_column("Description", style="yellow")
+
+        for migration in self.get_applied_migrations():
+            table.add_row(
+                str(migration["id"]),
+                migration["name"],
+                str(migration["tablename"]),
+                migration["checksum"][:12],
+                migration["description"],
+            )
+
+        console = Console()
+        console.print(table)
@@ -4,14 +4,11 @@ from enum import Enum
 from collections import OrderedDict
 from datetime import datetime
 
-from rich.console import Console
-from rich.table import Table
-from rich import print
-
 from loguru import logger
 
 from sqlsymphony_orm.database.manager import SQLiteModelManager
-from sqlsymphony_orm.datatypes.fields import BaseDataType, IntegerField
+from sqlsymphony_orm.datatypes.fields import BaseDataType, ForeignKey, IntegerField
+from sqlsymphony_orm.models.relations import contribute_foreign_key
 from sqlsymphony_orm.constants import RESTRICTIED_FIELDS
 from sqlsymphony_orm.exceptions import (
     PrimaryKeyError,
@@ -19,11 +16,7 @@ from sqlsymphony_orm.exceptions import (
     NullableFieldError,
     FieldNamingError,
 )
-from sqlsymphony_orm.utils.auditing import (
-    AuditManager,
-    InMemoryAuditStorage,
-    BasicChangeObserver,
-)
+from sqlsymphony_orm.utils.auditing import AuditManager, get_default_audit_manager
 
 
 class ModelManagerType(Enum):
@@ -38,6 +31,9 @@ class MetaModel(type):
     __tablename__ = None
     __database__ = None
     __type__ = ModelManagerType.SQLITE3
+    __result_cache__ = None
+    __plan_analyzer__ = None
+    __audit_manager__ = None
 
     def __new__(cls, class_object: "Model", parents: tuple, attributes: dict):
         """
@@ -81,11 +77,20 @@ class MetaModel(type):
 
         setattr(new_class, "_original_fields", fields)
 
+        for k, v in fields.items():
+            if isinstance(v, ForeignKey):
+                contribute_foreign_key(new_class, k, v)
+
         if new_class.__type__ == ModelManagerType.SQLITE3:
             setattr(
                 new_class,
                 "objects",
-                SQLiteModelManager(new_class, new_class.database_name),
+                SQLiteModelManager(
+                    new_class,
+                    new_class.database_name,
+                    new_class.__result_cache__,
+                    new_class.__plan_analyzer__,
+                ),
             )
         else:
             raise ValueError(
@@ -103,6 +108,9 @@ class Model(metaclass=MetaModel):
     __tablename__ = None
     __database__ = None
     __type__ = ModelManagerType.SQLITE3
+    __result_cache__ = None
+    __plan_analyzer__ = None
+    __audit_manager__ = None
     _ids = 0
 
     def __init__(self, **kwargs):
@@ -114,8 +122,6 @@ class Model(metaclass=MetaModel):
         """
         self.fields = {}
         self._hooks = {}
-        self.audit_manager = AuditManager(InMemoryAuditStorage())
-        self.audit_manager.attach(BasicChangeObserver())
 
         self.objects.create_table(self.table_name, self.get_formatted_sql_fields())
 
@@ -165,6 +171,21 @@ class Model(metaclass=MetaModel):
 
         self._last_action = {}
 
+    @property
+    def audit_manager(self) -> AuditManager:
+        """
+        Get audit manager shared by instances: `__audit_manager__` of model
+        class or the process-wide default one, so instances carry no audit
+        objects
+
+        :returns:	audit manager
+        :rtype:		AuditManager
+        """
+        if self.__audit_manager__ is not None:
+            return self.__audit_manager__
+
+        return get_default_audit_manager()
+
     @property
     def pk(self) -> Any:
         """
@@ -179,7 +200,7 @@ class Model(metaclass=MetaModel):
         """
         Commit changes
         """
-        logger.info(f"[{self.table_name}] Commit changes...")
+        logger.info("[{}] Commit changes...", self.table_name)
         self.objects.commit()
 
     def get_audit_history(self) -> list:
@@ -197,6 +218,9 @@ class Model(metaclass=MetaModel):
         """
         View info about Model in table
         """
+        from rich.console import Console
+        from rich.table import Table
+
         table = Table(title=f"Model {self._model_name} (table {self.table_name})")
 
         table.add_column("Field name", style="blue")
@@ -233,7 +257,10 @@ class Model(metaclass=MetaModel):
             )
 
         logger.info(
-            f"[{self.table_name}] Add Model Hook: before {before_action} execute {func.__name__}"
+            "[{}] Add Model Hook: before {} execute {}",
+            self.table_name,
+            before_action,
+            func.__name__,
         )
 
         self._hooks[before_action.lower()] = {"function": func, "args": func_args}
@@ -245,13 +272,15 @@ class Model(metaclass=MetaModel):
 
         if self._hooks:
             func = self._hooks["save"]["function"]
-            logger.debug(f"Exec Model Hook[save]: {func.__name__}")
+            logger.debug("Exec Model Hook[save]: {}", func.__name__)
             func(*self._hooks["save"]["args"])
         try:
             self.objects.insert(
                 self.table_name, self.get_formatted_sql_fields(), self.pk, self, ignore
             )
         except Exception as ex:
+            from rich import print
+
             print(
                 f'An exception occurred: "{ex}". We save changes to the database using commit...'
             )
@@ -279,7 +308,13 @@ class Model(metaclass=MetaModel):
                         value,
                     )
                     logger.info(
-                        f"[{self.table_name}] Update {self._model_name}#{self.pk} {key}: {orig_field} -> {value}"
+                        "[{}] Update {}#{} {}: {} -> {}",
+                        self.table_name,
+                        self._model_name,
+                        self.pk,
+                        key,
+                        orig_field,
+                        value,
                     )
 
     def delete(self, field_name: str = None, field_value: Any = None):
@@ -293,13 +328,16 @@ class Model(metaclass=MetaModel):
         """
         if field_name is not None and field_value is not None:
             logger.info(
-                f"[{self.table_name}] Delete model by {field_name}={field_value}"
+                "[{}] Delete model by {}={}", self.table_name, field_name, field_value
             )
             self.objects.delete(self.table_name, field_name, field_value)
             return
 
         logger.info(
-            f'[{self.table_name}] Delete model {self._primary_key["field_name"]}={self.pk}'
+            "[{}] Delete model {}={}",
+            self.table_name,
+            self._primary_key["field_name"],
+            self.pk,
         )
         self.objects.delete(self.table_name, self._primary_key["field_name"], self.pk)
         self.audit_manager.track_changes(
@@ -332,7 +370,7 @@ class Model(metaclass=MetaModel):
             self.save()
             self._last_action = {}
         else:
-            logger.error(f'Unknown last action type: {self._last_action["type"]}')
+            logger.error("Unknown last action type: {}", self._last_action["type"])
             return
 
     @classmethod
@@ -371,10 +409,10 @@ class Model(metaclass=MetaModel):
                         model_fields[field_name] = f"{field.to_sql_type()} UNIQUE"
                 if field.default is not None:
                     try:
-                        model_fields[field_name] += f" DEFAULT {field.default}"
+                        model_fields[field_name] += f" DEFAULT {field.to_sql_default()}"
                     except KeyError:
                         model_fields[field_name] = (
-                            f"{field.to_sql_type()} DEFAULT {field.default}"
+                            f"{field.to_sql_type()} DEFAULT {field.to_sql_default()}"
                         )
 
         return model_fields
@@ -411,10 +449,10 @@ class Model(metaclass=MetaModel):
                         model_fields[field_name] = f"{field.to_sql_type()} UNIQUE"
                 if field.default is not None:
                     try:
-                        model_fields[field_name] += f" DEFAULT {field.default}"
+                        model_fields[field_name] += f" DEFAULT {field.to_sql_default()}"
                     except KeyError:
                         model_fields[field_name] = (
-                            f"{field.to_sql_type()} DEFAULT {field.default}"
+                            f"{field.to_sql_type()} DEFAULT {field.to_sql_default()}"
                         )
 
         return model_fields
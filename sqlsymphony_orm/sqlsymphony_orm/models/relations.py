@@ -0,0 +1,476 @@
+from collections import defaultdict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    Union,
+)
+
+from loguru import logger
+
+from sqlsymphony_orm.constants import RESTRICTIED_FIELDS
+from sqlsymphony_orm.database.connection import SQLiteDBConnector
+from sqlsymphony_orm.datatypes.fields import ForeignKey
+from sqlsymphony_orm.exceptions import FieldNamingError, SQLSymphonyException
+
+if TYPE_CHECKING:
+    from sqlsymphony_orm.models.orm_models import Model
+    from sqlsymphony_orm.models.session_models import SessionModel
+
+# SQLITE_MAX_VARIABLE_NUMBER of SQLite before 3.32
+MAX_IN_VARIABLES = 999
+CACHE_ATTRIBUTE = "_related_cache"
+
+
+def get_pk_name(model_class: Type) -> str:
+    """
+    Gets the primary key name of model class.
+
+    :param		model_class:  The model class
+    :type		model_class:  Type
+
+    :returns:	The primary key name
+    :rtype:		str
+    """
+    return next(
+        field_name
+        for field_name, field in model_class._original_fields.items()
+        if field.primary_key
+    )
+
+
+def get_related_cache(instance: Any) -> dict:
+    """
+    Gets the cache of loaded relations of model instance.
+
+    :param		instance:  The model instance
+    :type		instance:  Any
+
+    :returns:	The related cache
+    :rtype:		dict
+    """
+    return instance.__dict__.setdefault(CACHE_ATTRIBUTE, {})
+
+
+def hydrate(
+    model_class: Type, row: Sequence, registry: Optional[dict] = None
+) -> "Union[SessionModel, Model]":
+    """
+    Build model instance from row of its fields
+
+    :param		model_class:  The model class
+    :type		model_class:  Type
+    :param		row:		  The row
+    :type		row:		  Sequence
+    :param		registry:	  The models of session to register instance in
+    :type		registry:	  Optional[dict]
+
+    :returns:	model
+    :rtype:		Union[SessionModel, Model]
+    """
+    model = model_class(manager=True)
+
+    for field_name, value in zip(model_class._original_fields, row):
+        setattr(model, field_name, value)
+        model.fields[field_name] = value
+
+    model._primary_key["value"] = getattr(model, model._primary_key["field_name"])
+
+    if registry is not None:
+        registry[model.unique_id] = {"model": model}
+
+    return model
+
+
+class ForwardRelation:
+    """
+    This class describes an accessor of model referenced by foreign key.
+    The model is loaded on first access (one query) unless it was loaded by
+    select_related or prefetch_related.
+    """
+
+    def __init__(self, field: ForeignKey):
+        """
+        Constructs a new instance.
+
+        :param		field:	The foreign key field
+        :type		field:	ForeignKey
+        """
+        self.field = field
+
+    def __get__(self, instance: Any, owner: Type = None) -> Any:
+        if instance is None:
+            return self
+
+        key = getattr(instance, self.field.name)
+        cached = get_related_cache(instance).get(self.field.accessor, None)
+
+        if cached is None or cached[0] != key:
+            prefetch_related([instance], self.field.accessor)
+            cached = get_related_cache(instance)[self.field.accessor]
+
+        return cached[1]
+
+    def set_cache(self, instance: Any, related: Any):
+        """
+        Store loaded related model of instance
+
+        :param		instance:  The instance
+        :type		instance:  Any
+        :param		related:   The related model (None for NULL key)
+        :type		related:   Any
+        """
+        get_related_cache(instance)[self.field.accessor] = (
+            getattr(instance, self.field.name),
+            related,
+        )
+
+
+class ReverseRelation:
+    """
+    This class describes an accessor of models referencing model by foreign
+    key. The models are loaded on first access (one query) unless they were
+    loaded by prefetch_related.
+    """
+
+    def __init__(self, field: ForeignKey):
+        """
+        Constructs a new instance.
+
+        :param		field:	The foreign key field of referencing model
+        :type		field:	ForeignKey
+        """
+        self.field = field
+
+    def __get__(self, instance: Any, owner: Type = None) -> Any:
+        if instance is None:
+            return self
+
+        if self.field.related_name not in get_related_cache(instance):
+            prefetch_related([instance], self.field.related_name)
+
+        return get_related_cache(instance)[self.field.related_name]
+
+    def set_cache(self, instance: Any, related: List[Any]):
+        """
+        Store loaded referencing models of instance
+
+        :param		instance:  The instance
+        :type		instance:  Any
+        :param		related:   The referencing models
+        :type		related:   List[Any]
+        """
+        get_related_cache(instance)[self.field.related_name] = related
+
+
+def contribute_foreign_key(model_class: Type, field_name: str, field: ForeignKey):
+    """
+    Bind foreign key to model class: set accessor on model class and reverse
+    relation on related model class (called by model metaclasses)
+
+    :param		model_class:		The model class
+    :type		model_class:		Type
+    :param		field_name:			The field name
+    :type		field_name:			str
+    :param		field:				The field
+    :type		field:				ForeignKey
+
+    :raises		FieldNamingError:	accessor or related name is taken
+    """
+    field.name = field_name
+    field.model_class = model_class
+
+    if field.to == "self":
+        field.to = model_class
+
+    if field.accessor is None:
+        if not field_name.endswith("_id"):
+            raise FieldNamingError(
+                f"ForeignKey {field_name} must end with _id or set accessor"
+            )
+
+        field.accessor = field_name[: -len("_id")]
+
+    if field.related_name is None:
+        field.related_name = f"{model_class._model_name}_set"
+
+    for owner, name in ((model_class, field.accessor), (field.to, field.related_name)):
+        if name in RESTRICTIED_FIELDS or name in owner._original_fields:
+            raise FieldNamingError(
+                f"Relation name {name} of {owner.__name__} is already taken"
+            )
+
+    setattr(model_class, field.accessor, ForwardRelation(field))
+    setattr(field.to, field.related_name, ReverseRelation(field))
+
+
+def get_relation(model_class: Type, name: str) -> Any:
+    """
+    Gets the relation accessor of model class.
+
+    :param		model_class:		   The model class
+    :type		model_class:		   Type
+    :param		name:				   The accessor or related name
+    :type		name:				   str
+
+    :returns:	The relation
+    :rtype:		Union[ForwardRelation, ReverseRelation]
+
+    :raises		SQLSymphonyException:  unknown relation
+    """
+    relation = getattr(model_class, name, None)
+
+    if not isinstance(relation, (ForwardRelation, ReverseRelation)):
+        raise SQLSymphonyException(
+            f"Model {model_class.__name__} has no relation {name}"
+        )
+
+    return relation
+
+
+def fetch_in(
+    model_class: Type,
+    column: str,
+    keys: Iterable[Any],
+    connector: Optional[SQLiteDBConnector] = None,
+    batch_size: int = MAX_IN_VARIABLES,
+    registry: Optional[dict] = None,
+) -> List[Any]:
+    """
+    Fetch models whose column is in keys, with one IN (...) query per batch
+
+    :param		model_class:  The model class
+    :type		model_class:  Type
+    :param		column:		  The column
+    :type		column:		  str
+    :param		keys:		  The keys
+    :type		keys:		  Iterable[Any]
+    :param		connector:	  The connector (process-wide by default)
+    :type		connector:	  Optional[SQLiteDBConnector]
+    :param		batch_size:	  The number of keys per query
+    :type		batch_size:	  int
+    :param		registry:	  The models of session to register instances in
+    :type		registry:	  Optional[dict]
+
+    :returns:	models
+    :rtype:		List[Any]
+    """
+    connector = connector if connector is not None else SQLiteDBConnector()
+    keys = list(keys)
+    columns = ", ".join(model_class._original_fields)
+    models = []
+
+    for start in range(0, len(keys), batch_size):
+        batch = keys[start : start + batch_size]
+        rows = connector.fetch(
+            f"SELECT {columns} FROM {model_class.table_name} "
+            f"WHERE {column} IN ({', '.join('?' for _ in batch)})",
+            tuple(batch),
+        )
+        models.extend(hydrate(model_class, row, registry) for row in rows)
+
+    return models
+
+
+def prefetch_related(
+    instances: List[Any],
+    *relations: str,
+    connector: Optional[SQLiteDBConnector] = None,
+    batch_size: int = MAX_IN_VARIABLES,
+    registry: Optional[dict] = None,
+) -> List[Any]:
+    """
+    Load relations of instances with one IN (...) query per relation per
+    batch instead of one query per instance. Nested relations are separated
+    by double underscore (`comments__user`).
+
+    :param		instances:	 The instances of one model class
+    :type		instances:	 List[Any]
+    :param		relations:	 The accessor or related names
+    :type		relations:	 str
+    :param		connector:	 The connector (process-wide by default)
+    :type		connector:	 Optional[SQLiteDBConnector]
+    :param		batch_size:	 The number of keys per query
+    :type		batch_size:	 int
+    :param		registry:	 The models of session to register instances in
+    :type		registry:	 Optional[dict]
+
+    :returns:	instances
+    :rtype:		List[Any]
+    """
+    if not instances:
+        return instances
+
+    model_class = type(instances[0])
+
+    for path in relations:
+        name, _, rest = path.partition("__")
+        relation = get_relation(model_class, name)
+        field = relation.field
+
+        if isinstance(relation, ForwardRelation):
+            keys = {getattr(instance, field.name) for instance in instances} - {None}
+            related = {
+                model.pk: model
+                for model in fetch_in(
+                    field.to,
+                    field.related_pk_name,
+                    keys,
+                    connector,
+                    batch_size,
+                    registry,
+                )
+            }
+
+            for instance in instances:
+                relation.set_cache(
+                    instance, related.get(getattr(instance, field.name), None)
+                )
+
+            loaded = list(related.values())
+        else:
+            pk_name = get_pk_name(model_class)
+            children = fetch_in(
+                field.model_class,
+                field.name,
+                {getattr(instance, pk_name) for instance in instances},
+                connector,
+                batch_size,
+                registry,
+            )
+            groups = defaultdict(list)
+
+            for child in children:
+                groups[getattr(child, field.name)].append(child)
+
+            for instance in instances:
+                relation.set_cache(instance, groups.get(getattr(instance, pk_name), []))
+
+            loaded = children
+
+        logger.debug(
+            "[Relations] Prefetch {}.{}: {} models",
+            model_class.__name__,
+            name,
+            len(loaded),
+        )
+
+        if rest:
+            prefetch_related(
+                loaded,
+                rest,
+                connector=connector,
+                batch_size=batch_size,
+                registry=registry,
+            )
+
+    return instances
+
+
+def select_related(
+    model_class: Type,
+    *relations: str,
+    where: Optional[str] = None,
+    values: Sequence = (),
+    order_by: Optional[str] = None,
+    limit: Optional[int] = None,
+    connector: Optional[SQLiteDBConnector] = None,
+    registry: Optional[dict] = None,
+) -> List[Any]:
+    """
+    Select models with models referenced by their foreign keys in one query
+    (LEFT JOIN per relation). Joined tables are aliased by accessor names,
+    so condition can use them (`user.name = ?`).
+
+    :param		model_class:		   The model class
+    :type		model_class:		   Type
+    :param		relations:			   The accessor names
+    :type		relations:			   str
+    :param		where:				   The condition with ? placeholders
+    :type		where:				   Optional[str]
+    :param		values:				   The values of condition
+    :type		values:				   Sequence
+    :param		order_by:			   The ORDER BY expression
+    :type		order_by:			   Optional[str]
+    :param		limit:				   The maximum number of models
+    :type		limit:				   Optional[int]
+    :param		connector:			   The connector (process-wide by default)
+    :type		connector:			   Optional[SQLiteDBConnector]
+    :param		registry:			   The models of session to register instances in
+    :type		registry:			   Optional[dict]
+
+    :returns:	models
+    :rtype:		List[Any]
+
+    :raises		SQLSymphonyException:  relation is not a foreign key
+    """
+    connector = connector if connector is not None else SQLiteDBConnector()
+    table_name = model_class.table_name
+    columns = [f"{table_name}.{column}" for column in model_class._original_fields]
+    joins, forward = [], []
+
+    for name in relations:
+        relation = get_relation(model_class, name)
+
+        if not isinstance(relation, ForwardRelation):
+            raise SQLSymphonyException(
+                f"Relation {name} is reverse, use prefetch_related for it"
+            )
+
+        field = relation.field
+        forward.append(relation)
+        columns.extend(f"{name}.{column}" for column in field.to._original_fields)
+        joins.append(
+            f"LEFT JOIN {field.to.table_name} AS {name} "
+            f"ON {name}.{field.related_pk_name} = {table_name}.{field.name}"
+        )
+
+    query = f"SELECT {', '.join(columns)} FROM {table_name} {' '.join(joins)}"
+
+    if where:
+        query += f" WHERE {where}"
+
+    if order_by:
+        query += f" ORDER BY {order_by}"
+
+    if limit is not None:
+        query += f" LIMIT {int(limit)}"
+
+    models = []
+    identity: Dict[tuple, Any] = {}
+
+    for row in connector.fetch(query, tuple(values)):
+        width = len(model_class._original_fields)
+        model = hydrate(model_class, row[:width], registry)
+
+        for relation in forward:
+            related_class = relation.field.to
+            related_row = row[width : width + len(related_class._original_fields)]
+            width += len(related_class._original_fields)
+            key = getattr(model, relation.field.name)
+            related = None
+
+            if key is not None:
+                if (related_class, key) not in identity:
+                    pk_index = list(related_class._original_fields).index(
+                        relation.field.related_pk_name
+                    )
+                    # dangling foreign key: LEFT JOIN gives NULL columns
+                    identity[(related_class, key)] = (
+                        None
+                        if related_row[pk_index] is None
+                        else hydrate(related_class, related_row, registry)
+                    )
+
+                related = identity[(related_class, key)]
+
+            relation.set_cache(model, related)
+
+        models.append(model)
+
+    return models
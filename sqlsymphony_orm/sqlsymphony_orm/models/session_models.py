@@ -1,16 +1,22 @@
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Any, Union, Callable
+from typing import List, Any, Union, Callable, Optional
 from uuid import uuid4
 from abc import ABC, abstractmethod
 from collections import OrderedDict
 
 from loguru import logger
-from rich.console import Console
-from rich.table import Table
 
 from sqlsymphony_orm.database.manager import SQLiteMultiManager
 from sqlsymphony_orm.constants import RESTRICTIED_FIELDS
-from sqlsymphony_orm.datatypes.fields import BaseDataType, IntegerField
+from sqlsymphony_orm.datatypes.fields import BaseDataType, ForeignKey, IntegerField
+from sqlsymphony_orm.models.relations import (
+    MAX_IN_VARIABLES,
+    contribute_foreign_key,
+    prefetch_related,
+    select_related,
+)
 from sqlsymphony_orm.exceptions import (
     PrimaryKeyError,
     FieldValidationError,
@@ -19,10 +25,19 @@ from sqlsymphony_orm.exceptions import (
 )
 from sqlsymphony_orm.utils.auditing import (
     AuditManager,
+    AuditStorage,
     InMemoryAuditStorage,
     BasicChangeObserver,
 )
 from sqlsymphony_orm.queries import QueryBuilder
+from sqlsymphony_orm.performance.cache import (
+    QueryResultCache,
+    get_query_tables,
+    get_write_tables,
+)
+from sqlsymphony_orm.performance.profiler import QueryProfiler
+from sqlsymphony_orm.performance.explain import QueryPlanAnalyzer
+from sqlsymphony_orm.database.maintenance import MaintenanceScheduler
 
 
 class MetaSessionModel(type):
@@ -71,6 +86,10 @@ class MetaSessionModel(type):
 
         setattr(new_class, "_original_fields", fields)
 
+        for k, v in fields.items():
+            if isinstance(v, ForeignKey):
+                contribute_foreign_key(new_class, k, v)
+
         return new_class
 
 
@@ -159,7 +178,10 @@ class SessionModel(metaclass=MetaSessionModel):
             )
 
         logger.info(
-            f"[{self.table_name}] Add Model Hook: before {before_action} execute {func.__name__}"
+            "[{}] Add Model Hook: before {} execute {}",
+            self.table_name,
+            before_action,
+            func.__name__,
         )
 
         self.hooks[before_action.lower()] = {"function": func, "args": func_args}
@@ -178,6 +200,9 @@ class SessionModel(metaclass=MetaSessionModel):
         """
         View info about Model in table
         """
+        from rich.console import Console
+        from rich.table import Table
+
         table = Table(title=f"Model {self._model_name} (table {self.table_name})")
 
         table.add_column("Field name", style="blue")
@@ -224,10 +249,10 @@ class SessionModel(metaclass=MetaSessionModel):
                         model_fields[field_name] = f"{field.to_sql_type()} UNIQUE"
                 if field.default is not None:
                     try:
-                        model_fields[field_name] += f" DEFAULT {field.default}"
+                        model_fields[field_name] += f" DEFAULT {field.to_sql_default()}"
                     except KeyError:
                         model_fields[field_name] = (
-                            f"{field.to_sql_type()} DEFAULT {field.default}"
+                            f"{field.to_sql_type()} DEFAULT {field.to_sql_default()}"
                         )
 
         return model_fields
@@ -262,10 +287,10 @@ class SessionModel(metaclass=MetaSessionModel):
                         model_fields[field_name] = f"{field.to_sql_type()} UNIQUE"
                 if field.default is not None:
                     try:
-                        model_fields[field_name] += f" DEFAULT {field.default}"
+                        model_fields[field_name] += f" DEFAULT {field.to_sql_default()}"
                     except KeyError:
                         model_fields[field_name] = (
-                            f"{field.to_sql_type()} DEFAULT {field.default}"
+                            f"{field.to_sql_type()} DEFAULT {field.to_sql_default()}"
                         )
 
         return model_fields
@@ -376,17 +401,46 @@ class SQLiteSession(Session):
     This class describes a sqlite session.
     """
 
-    def __init__(self, database_file: str):
+    def __init__(
+        self,
+        database_file: str,
+        result_cache: Optional[QueryResultCache] = None,
+        audit_storage: Optional[AuditStorage] = None,
+        profiler: Optional[QueryProfiler] = None,
+        plan_analyzer: Optional[QueryPlanAnalyzer] = None,
+        maintenance: Optional[MaintenanceScheduler] = None,
+    ):
         """
         Constructs a new instance.
 
         :param		database_file:	The database file
         :type		database_file:	str
+        :param		result_cache:	The opt-in query result cache
+        :type		result_cache:	Optional[QueryResultCache]
+        :param		audit_storage:	The audit storage (in memory by default)
+        :type		audit_storage:	Optional[AuditStorage]
+        :param		profiler:		The query profiler (shared by the connector)
+        :type		profiler:		Optional[QueryProfiler]
+        :param		plan_analyzer:	The opt-in query plan analyzer of filter
+        :type		plan_analyzer:	Optional[QueryPlanAnalyzer]
+        :param		maintenance:	The maintenance scheduler of the connection
+        :type		maintenance:	Optional[MaintenanceScheduler]
         """
         self.database_file = Path(database_file)
         self.models = {}
+        self.result_cache = result_cache
+        self.plan_analyzer = plan_analyzer
         self.manager = SQLiteMultiManager(self.database_file)
-        self.audit_manager = AuditManager(InMemoryAuditStorage())
+
+        if profiler is not None:
+            self.manager.set_profiler(profiler)
+
+        if maintenance is not None:
+            self.manager.set_maintenance(maintenance)
+
+        self.audit_manager = AuditManager(
+            audit_storage if audit_storage is not None else InMemoryAuditStorage()
+        )
         self.audit_manager.attach(BasicChangeObserver())
 
     def reconnect(self, database_file: str = None):
@@ -395,7 +449,7 @@ class SQLiteSession(Session):
         """
         if database_file is not None:
             self.database_file = Path(database_file)
-        logger.info(f"Session {self.database_file}: reconnect")
+        logger.info("Session {}: reconnect", self.database_file)
         self.manager.reconnect(database_file)
 
     def execute(
@@ -414,8 +468,97 @@ class SQLiteSession(Session):
         :returns:	list with output data
         :rtype:		list
         """
+        self._invalidate_written_tables(raw_sql_query)
+
         return self.manager.execute(raw_sql_query, values, get_cursor)
 
+    def execute_many(self, raw_sql_query: str, values: list) -> int:
+        """
+        Execute raw sql query for each values tuple
+
+        :param		raw_sql_query:	The raw sql query
+        :type		raw_sql_query:	str
+        :param		values:			The values
+        :type		values:			list
+
+        :returns:	number of modified rows
+        :rtype:		int
+        """
+        self._invalidate_written_tables(raw_sql_query)
+
+        return self.manager.execute_many(raw_sql_query, values)
+
+    def _invalidate_written_tables(self, raw_sql_query: str):
+        """
+        Drop cached query results of tables changed by raw sql query (all of
+        them when the changed tables are not known)
+
+        :param		raw_sql_query:	The raw sql query
+        :type		raw_sql_query:	str
+        """
+        if self.result_cache is None:
+            return
+
+        tables = get_write_tables(raw_sql_query)
+
+        if tables is None:
+            self.result_cache.clear()
+            return
+
+        for table in tables:
+            self.result_cache.invalidate_table(table)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Transaction context manager: statements executed inside are committed
+        together or rolled back on exception. Buffered audit entries are
+        written in the same transaction.
+
+        :returns:	context manager
+        :rtype:		ContextManager
+        """
+        with self.manager.transaction() as connector:
+            yield connector
+            self.audit_manager.audit_storage.flush()
+
+    def invalidate_result_cache(self, table_name: str):
+        """
+        Drop cached query results of table
+
+        :param		table_name:	 The table name
+        :type		table_name:	 str
+        """
+        if self.result_cache is not None:
+            self.result_cache.invalidate_table(table_name)
+
+    def backup(self, target_name: str, **kwargs):
+        """
+        Online backup of session database (see SQLiteDBConnector.backup)
+
+        :param		target_name:  The backup file name
+        :type		target_name:  str
+        :param		kwargs:		  The keywords arguments
+        :type		kwargs:		  dictionary
+        """
+        logger.info("Session {}: backup to {}", self.database_file, target_name)
+        self.manager.backup(target_name, **kwargs)
+
+    def restore(self, source_name: str, **kwargs):
+        """
+        Restore session database from backup (see SQLiteDBConnector.restore)
+
+        :param		source_name:  The backup file name
+        :type		source_name:  str
+        :param		kwargs:		  The keywords arguments
+        :type		kwargs:		  dictionary
+        """
+        logger.info("Session {}: restore from {}", self.database_file, source_name)
+        self.manager.restore(source_name, **kwargs)
+
+        if self.result_cache is not None:
+            self.result_cache.clear()
+
     def get_all(self) -> List[SessionModel]:
         """
         Gets all.
@@ -485,8 +628,9 @@ class SQLiteSession(Session):
         :param		table_name:	 The table name
         :type		table_name:	 str
         """
-        logger.info(f"Session {self.database_file}: drop table {table_name}")
+        logger.info("Session {}: drop table {}", self.database_file, table_name)
         self.manager.drop_table(table_name)
+        self.invalidate_result_cache(table_name)
 
     def filter(
         self, query: "QueryBuilder", first: bool = False
@@ -502,7 +646,7 @@ class SQLiteSession(Session):
         :returns:	list with SessionModel or SessionModel
         :rtype:		Union[List[SessionModel], SessionModel]
         """
-        db_results = self.manager.filter(str(query))
+        db_results = self._filter_rows(query)
         results = []
         fields = {}
 
@@ -531,6 +675,118 @@ class SQLiteSession(Session):
         else:
             return None
 
+    def _filter_rows(self, query: "QueryBuilder") -> list:
+        """
+        Fetch rows of query, through the result cache if it is enabled. The
+        cached result is invalidated by writes to any table of the query,
+        including joined ones.
+
+        :param		query:	The query
+        :type		query:	QueryBuilder
+
+        :returns:	fetched rows
+        :rtype:		list
+        """
+        sql = str(query)
+
+        if self.result_cache is None or not isinstance(query, QueryBuilder):
+            return self._fetch_rows(sql)
+
+        cache_key = QueryResultCache.make_key(sql)
+        db_results = self.result_cache.get(cache_key)
+
+        if db_results is None:
+            tables = get_query_tables(sql)
+            version = self.result_cache.get_version(tables)
+            db_results = self._fetch_rows(sql)
+            self.result_cache.set(cache_key, db_results, time.time(), tables, version)
+
+        return db_results
+
+    def _fetch_rows(self, sql: str) -> list:
+        """
+        Fetch rows of sql query, explaining it first if plan analyzer is set
+
+        :param		sql:  The sql query
+        :type		sql:  str
+
+        :returns:	fetched rows
+        :rtype:		list
+        """
+        if self.plan_analyzer is not None:
+            self.plan_analyzer.analyze(sql)
+
+        return self.manager.filter(sql)
+
+    def select_related(
+        self,
+        model_class: type,
+        *relations: str,
+        where: Optional[str] = None,
+        values: tuple = (),
+        order_by: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[SessionModel]:
+        """
+        Select models with models referenced by foreign keys in one JOIN
+        query (see relations.select_related). Models are added to session.
+
+        :param		model_class:  The model class
+        :type		model_class:  type
+        :param		relations:	  The accessor names
+        :type		relations:	  str
+        :param		where:		  The condition with ? placeholders
+        :type		where:		  Optional[str]
+        :param		values:		  The values of condition
+        :type		values:		  tuple
+        :param		order_by:	  The ORDER BY expression
+        :type		order_by:	  Optional[str]
+        :param		limit:		  The maximum number of models
+        :type		limit:		  Optional[int]
+
+        :returns:	models
+        :rtype:		List[SessionModel]
+        """
+        return select_related(
+            model_class,
+            *relations,
+            where=where,
+            values=values,
+            order_by=order_by,
+            limit=limit,
+            connector=self.manager._connector,
+            registry=self.models,
+        )
+
+    def prefetch_related(
+        self,
+        models: List[SessionModel],
+        *relations: str,
+        batch_size: int = MAX_IN_VARIABLES,
+    ) -> List[SessionModel]:
+        """
+        Load relations of models with one IN (...) query per relation per
+        batch (see relations.prefetch_related). Loaded models are added to
+        session.
+
+        :param		models:		 The models of one class
+        :type		models:		 List[SessionModel]
+        :param		relations:	 The accessor or related names
+        :type		relations:	 str
+        :param		batch_size:	 The number of keys per query
+        :type		batch_size:	 int
+
+        :returns:	models
+        :rtype:		List[SessionModel]
+        """
+        return prefetch_related(
+            models,
+            *relations,
+            connector=self.manager._connector,
+            batch_size=batch_size,
+            registry=self.models,
+        )
+
     def update(self, model: SessionModel, **kwargs):
         """
         Update model
@@ -545,11 +801,11 @@ class SQLiteSession(Session):
         if current_model is None:
             self.add(model)
 
-        logger.info(f"Session {self.database_file}: update model {model.unique_id}")
+        logger.info("Session {}: update model {}", self.database_file, model.unique_id)
 
         if model.hooks:
             func = model.hooks["update"]["function"]
-            logger.debug(f"Exec Model Hook[update]: {func.__name__}")
+            logger.debug("Exec Model Hook[update]: {}", func.__name__)
             func(*model.hooks["update"]["args"])
 
         for key, value in kwargs.items():
@@ -566,6 +822,7 @@ class SQLiteSession(Session):
                         value,
                     )
                     self.manager.update(model.table_name, key, orig_field, value)
+                    self.invalidate_result_cache(model.table_name)
                     self.audit_manager.track_changes(
                         model._model_name,
                         model.table_name,
@@ -575,7 +832,13 @@ class SQLiteSession(Session):
                         value,
                     )
                     logger.info(
-                        f"[{model.table_name}] Update {model._model_name}#{model.pk} {key}: {orig_field} -> {value}"
+                        "[{}] Update {}#{} {}: {} -> {}",
+                        model.table_name,
+                        model._model_name,
+                        model.pk,
+                        key,
+                        orig_field,
+                        value,
                     )
 
         self.models[model.unique_id]["model"] = model
@@ -590,12 +853,12 @@ class SQLiteSession(Session):
         :type		ignore:	 bool
         """
         if self.models.get(model.unique_id, None) is not None:
-            logger.warning(f"Model {model.unique_id} already added")
+            logger.warning("Model {} already added", model.unique_id)
             return
 
         if model.hooks:
             func = model.hooks["save"]["function"]
-            logger.debug(f"Exec Model Hook[save]: {func.__name__}")
+            logger.debug("Exec Model Hook[save]: {}", func.__name__)
             func(*model.hooks["save"]["args"])
 
         self.models[model.unique_id] = {"model": model}
@@ -614,6 +877,7 @@ class SQLiteSession(Session):
         self.manager.create_table(model.table_name, model.get_formatted_sql_fields())
 
         self.manager.insert(model.table_name, formatted_fields, model.pk, model, ignore)
+        self.invalidate_result_cache(model.table_name)
 
         last_pk = self.execute(
             f'SELECT max({model._primary_key["field_name"]}) FROM {model.table_name}'
@@ -622,7 +886,7 @@ class SQLiteSession(Session):
         model._primary_key["value"] = int(last_pk[0][0])
 
         logger.info(
-            f"Session {self.database_file}: insert new model: {model.unique_id}"
+            "Session {}: insert new model: {}", self.database_file, model.unique_id
         )
 
     def delete(self, model: SessionModel):
@@ -635,12 +899,12 @@ class SQLiteSession(Session):
         current_model = self.models.get(model.unique_id, None)
 
         if current_model is None:
-            logger.error(f"Model {model.unique_id} does not exists")
+            logger.error("Model {} does not exists", model.unique_id)
             return
 
         if model.hooks:
             func = model.hooks["delete"]["function"]
-            logger.debug(f"Exec Model Hook[delete]: {func.__name__}")
+            logger.debug("Exec Model Hook[delete]: {}", func.__name__)
             func(*model.hooks["delete"]["args"])
 
         self.audit_manager.track_changes(
@@ -657,13 +921,15 @@ class SQLiteSession(Session):
             current_model["model"]._primary_key["field_name"],
             current_model["model"].pk,
         )
+        self.invalidate_result_cache(current_model["model"].table_name)
 
-        logger.info(f"Session {self.database_file}: delete model: {model.unique_id}")
+        logger.info("Session {}: delete model: {}", self.database_file, model.unique_id)
 
     def commit(self):
         """
-        Commit changes
+        Commit changes (with buffered audit entries)
         """
+        self.audit_manager.audit_storage.flush()
         self.manager.commit()
 
     def close(self):
@@ -1,3 +1,6 @@
+import threading
+
+
 class Singleton(type):
     """
     A metaclass that implements the Singleton pattern.
@@ -7,8 +10,13 @@ class Singleton(type):
     """
 
     _instances = {}
+    _lock = threading.RLock()
 
     def __call__(cls, *args, **kwargs):
         if cls not in cls._instances:
-            cls._instances[cls] = super(Singleton, cls).__call__(*args, **kwargs)
+            with Singleton._lock:
+                if cls not in cls._instances:
+                    cls._instances[cls] = super(Singleton, cls).__call__(
+                        *args, **kwargs
+                    )
         return cls._instances[cls]
@@ -0,0 +1,809 @@
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import platform
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import click
+from loguru import logger
+
+from sqlsymphony_orm import __version__
+from sqlsymphony_orm.database.connection import SQLiteDBConnector
+from sqlsymphony_orm.datatypes.fields import IntegerField, RealField, TextField
+from sqlsymphony_orm.exceptions import SQLSymphonyException
+from sqlsymphony_orm.migrations.data_migrations import DataMigration, SQLiteDataMigrator
+from sqlsymphony_orm.migrations.migrations_manager import SQLiteMigrationManager
+from sqlsymphony_orm.models.orm_models import Model
+from sqlsymphony_orm.models.session_models import SessionModel, SQLiteSession
+from sqlsymphony_orm.performance.cache import (
+    CacheBase,
+    InMemoryCache,
+    QueryResultCache,
+    SQLiteCache,
+)
+from sqlsymphony_orm.queries import QueryBuilder
+from sqlsymphony_orm.utils.auditing import (
+    AuditEntry,
+    AuditStorage,
+    InMemoryAuditStorage,
+    SQLiteAuditStorage,
+)
+
+IMPORTTIME_PATTERN = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s+(.+)$")
+MEMORY = ":memory:"
+STORAGES = ("memory", "file")
+DEFAULT_SIZES = (100, 1000)
+BENCH_TABLE = "bench_items"
+LOOKUPS = 100
+BENCHMARKS: Dict[str, Callable] = {}
+
+
+def measure_import_time(
+    module: str = "sqlsymphony_orm", repeat: int = 5, python: str = sys.executable
+) -> Dict[str, float]:
+    """
+    Measure import time of module in fresh interpreters (`python -X
+    importtime`) with the import path of current process, the cumulative
+    time of module is taken.
+
+    :param		module:	 The module
+    :type		module:	 str
+    :param		repeat:	 The number of runs
+    :type		repeat:	 int
+    :param		python:	 The python executable
+    :type		python:	 str
+
+    :returns:	min, median and max import time in milliseconds
+    :rtype:		Dict[str, float]
+
+    :raises		SQLSymphonyException:  repeat is less than 1 or import time of
+                                       module is not reported
+    """
+    _check_repeat(repeat)
+    timings = []
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, sys.path))}
+
+    for _ in range(repeat):
+        result = subprocess.run(
+            [python, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=env,
+        )
+
+        for line in result.stderr.splitlines():
+            match = IMPORTTIME_PATTERN.match(line)
+
+            if match is not None and match.group(3).strip() == module:
+                timings.append(int(match.group(2)) / 1000)
+
+    if not timings:
+        raise SQLSymphonyException(
+            f"Import time of {module} is not reported by {python} -X importtime"
+        )
+
+    return {
+        "module": module,
+        "repeat": repeat,
+        "min_ms": min(timings),
+        "median_ms": statistics.median(timings),
+        "max_ms": max(timings),
+    }
+
+
+def _check_repeat(repeat: int):
+    """
+    Check that benchmark runs at least once
+
+    :param		repeat:				   The number of runs
+    :type		repeat:				   int
+
+    :raises		SQLSymphonyException:  repeat is less than 1
+    """
+    if repeat < 1:
+        raise SQLSymphonyException(f"repeat must be at least 1, got {repeat}")
+
+
+def make_rows(size: int) -> List[Dict[str, Any]]:
+    """
+    Make deterministic rows of benchmark table
+
+    :param		size:  The number of rows
+    :type		size:  int
+
+    :returns:	rows
+    :rtype:		List[Dict[str, Any]]
+    """
+    return [
+        {"name": f"user{i}", "email": f"user{i}@example.com", "cash": float(i)}
+        for i in range(size)
+    ]
+
+
+def make_model(database: str, result_cache: Optional[QueryResultCache] = None):
+    """
+    Create benchmark Model class bound to database. Model classes connect to
+    their database when created, so every run gets a fresh class.
+
+    :param		database:	   The database
+    :type		database:	   str
+    :param		result_cache:  The result cache
+    :type		result_cache:  Optional[QueryResultCache]
+
+    :returns:	model class
+    :rtype:		Type[Model]
+    """
+    return type(
+        "BenchItem",
+        (Model,),
+        {
+            "__qualname__": "BenchItem",
+            "__module__": __name__,
+            "__tablename__": BENCH_TABLE,
+            "__database__": database,
+            "__result_cache__": result_cache,
+            "id": IntegerField(primary_key=True),
+            "name": TextField(null=False),
+            "email": TextField(null=False),
+            "cash": RealField(null=False, default=0.0),
+        },
+    )
+
+
+class BenchSessionItem(SessionModel):
+    """
+    This class describes a session model of benchmark table.
+    """
+
+    __tablename__ = BENCH_TABLE
+
+    id = IntegerField(primary_key=True)
+    name = TextField(null=False)
+    email = TextField(null=False)
+    cash = RealField(null=False, default=0.0)
+
+
+class BenchSessionItemV2(SessionModel):
+    """
+    This class describes a benchmark session model with added column.
+    """
+
+    __tablename__ = BENCH_TABLE
+
+    id = IntegerField(primary_key=True)
+    name = TextField(null=False)
+    email = TextField(null=False)
+    cash = RealField(null=False, default=0.0)
+    status = TextField(null=True)
+
+
+def seed_table(size: int, indexed: bool = False):
+    """
+    Create benchmark table on the connector and fill it
+
+    :param		size:	  The number of rows
+    :type		size:	  int
+    :param		indexed:  Create index on name column
+    :type		indexed:  bool
+    """
+    connector = SQLiteDBConnector()
+    connector.fetch(
+        f"CREATE TABLE IF NOT EXISTS {BENCH_TABLE} (id INTEGER PRIMARY KEY, "
+        "name TEXT NOT NULL, email TEXT NOT NULL, cash REAL NOT NULL DEFAULT 0.0)"
+    )
+    connector.executemany(
+        f"INSERT INTO {BENCH_TABLE} (name, email, cash) VALUES (?, ?, ?)",
+        [tuple(row.values()) for row in make_rows(size)],
+    )
+
+    if indexed:
+        connector.fetch(f"CREATE INDEX idx_{BENCH_TABLE}_name ON {BENCH_TABLE} (name)")
+
+    connector.commit()
+
+
+def get_lookups(size: int) -> List[str]:
+    """
+    Get names looked up by filter benchmarks
+
+    :param		size:  The number of rows
+    :type		size:  int
+
+    :returns:	names
+    :rtype:		List[str]
+    """
+    step = max(size // LOOKUPS, 1)
+
+    return [f"user{i}" for i in range(0, size, step)][:LOOKUPS]
+
+
+def benchmark(name: str) -> Callable:
+    """
+    Register benchmark. Benchmark function gets database name, data size and
+    work directory, prepares data and returns the measured callable with the
+    number of operations it performs.
+
+    :param		name:  The benchmark name
+    :type		name:  str
+
+    :returns:	decorator
+    :rtype:		Callable
+    """
+
+    def decorator(func: Callable) -> Callable:
+        BENCHMARKS[name] = func
+        return func
+
+    return decorator
+
+
+@benchmark("insert_single")
+def bench_insert_single(database: str, size: int, workdir: Path):
+    """
+    Save new Model instances one by one
+    """
+    model = make_model(database)
+    items = [model(**row) for row in make_rows(size)]
+
+    def run():
+        for item in items:
+            item.save()
+
+        model.objects.commit()
+
+    return run, size
+
+
+@benchmark("insert_bulk")
+def bench_insert_bulk(database: str, size: int, workdir: Path):
+    """
+    Insert rows with one executemany in a transaction
+    """
+    session = SQLiteSession(database)
+    seed_table(0)
+    values = [tuple(row.values()) for row in make_rows(size)]
+
+    def run():
+        with session.transaction():
+            session.execute_many(
+                f"INSERT INTO {BENCH_TABLE} (name, email, cash) VALUES (?, ?, ?)",
+                values,
+            )
+
+    return run, size
+
+
+@benchmark("fetch")
+def bench_fetch(database: str, size: int, workdir: Path):
+    """
+    Fetch and hydrate all rows of Model table
+    """
+    model = make_model(database)
+    seed_table(size)
+
+    def run():
+        assert len(model.objects.fetch()) == size
+
+    return run, size
+
+
+def _filter_benchmark(database: str, size: int, indexed: bool):
+    """
+    Prepare filter benchmark
+    """
+    model = make_model(database)
+    seed_table(size, indexed=indexed)
+    names = get_lookups(size)
+
+    def run():
+        for name in names:
+            model.objects.filter(name=name)
+
+    return run, len(names)
+
+
+@benchmark("filter_indexed")
+def bench_filter_indexed(database: str, size: int, workdir: Path):
+    """
+    Filter Model by indexed column
+    """
+    return _filter_benchmark(database, size, indexed=True)
+
+
+@benchmark("filter_unindexed")
+def bench_filter_unindexed(database: str, size: int, workdir: Path):
+    """
+    Filter Model by column without index
+    """
+    return _filter_benchmark(database, size, indexed=False)
+
+
+@benchmark("update")
+def bench_update(database: str, size: int, workdir: Path):
+    """
+    Update Model instances one by one
+    """
+    model = make_model(database)
+    seed_table(size)
+    items = [model(**row) for row in make_rows(min(size, LOOKUPS))]
+
+    def run():
+        for item in items:
+            item.update(cash=item.cash + 1)
+
+        model.objects.commit()
+
+    return run, len(items)
+
+
+@benchmark("delete")
+def bench_delete(database: str, size: int, workdir: Path):
+    """
+    Delete Model instances one by one
+    """
+    model = make_model(database)
+    seed_table(size)
+    items = [model(**row) for row in make_rows(min(size, LOOKUPS))]
+
+    def run():
+        for item in items:
+            item.delete()
+
+        model.objects.commit()
+
+    return run, len(items)
+
+
+@benchmark("session_add")
+def bench_session_add(database: str, size: int, workdir: Path):
+    """
+    Add SessionModel instances to session
+    """
+    session = SQLiteSession(database)
+    items = [BenchSessionItem(**row) for row in make_rows(size)]
+
+    def run():
+        for item in items:
+            session.add(item)
+
+        session.commit()
+
+    return run, size
+
+
+@benchmark("session_filter")
+def bench_session_filter(database: str, size: int, workdir: Path):
+    """
+    Filter session models with QueryBuilder
+    """
+    session = SQLiteSession(database)
+
+    for row in make_rows(size):
+        session.add(BenchSessionItem(**row))
+
+    session.commit()
+    names = get_lookups(size)
+    fields = list(BenchSessionItem._original_fields.keys())
+
+    def run():
+        for name in names:
+            session.filter(
+                QueryBuilder().SELECT(*fields).FROM(BENCH_TABLE).WHERE(name=name)
+            )
+
+    return run, len(names)
+
+
+@benchmark("result_cache_fetch")
+def bench_result_cache_fetch(database: str, size: int, workdir: Path):
+    """
+    Fetch Model table through warm query result cache
+    """
+    model = make_model(database, QueryResultCache())
+    seed_table(size)
+    model.objects.fetch()
+
+    def run():
+        for _ in range(LOOKUPS):
+            model.objects.fetch()
+
+    return run, LOOKUPS
+
+
+def _cache_benchmark(cache: CacheBase, size: int):
+    """
+    Prepare cache benchmark
+    """
+    keys = [f"key{i}" for i in range(size)]
+
+    def run():
+        now = time.time()
+
+        for key in keys:
+            cache.set(key, key, now)
+
+        for key in keys:
+            cache.get(key)
+
+    return run, size * 2
+
+
+@benchmark("cache_memory")
+def bench_cache_memory(database: str, size: int, workdir: Path):
+    """
+    Set and get keys of InMemoryCache
+    """
+    return _cache_benchmark(InMemoryCache(max_size=size, ttl=60), size)
+
+
+@benchmark("cache_sqlite")
+def bench_cache_sqlite(database: str, size: int, workdir: Path):
+    """
+    Set and get keys of SQLiteCache
+    """
+    path = MEMORY if database == MEMORY else workdir / "cache.db"
+
+    return _cache_benchmark(SQLiteCache(path, max_size=size, ttl=60), size)
+
+
+@benchmark("data_migration")
+def bench_data_migration(database: str, size: int, workdir: Path):
+    """
+    Copy table with transform by SQLiteDataMigrator
+    """
+    session = SQLiteSession(database)
+    seed_table(size)
+    session.execute(
+        f"CREATE TABLE {BENCH_TABLE}_copy AS SELECT * FROM {BENCH_TABLE} LIMIT 0"
+    )
+    migrator = SQLiteDataMigrator(session)
+
+    def transform(row: dict) -> dict:
+        return {**row, "name": row["name"].upper()}
+
+    def run():
+        migrator.run(
+            DataMigration(
+                "bench_copy",
+                BENCH_TABLE,
+                f"{BENCH_TABLE}_copy",
+                transform=transform,
+                chunk_size=500,
+            )
+        )
+
+    return run, size
+
+
+@benchmark("schema_migration")
+def bench_schema_migration(database: str, size: int, workdir: Path):
+    """
+    Add column with SQLiteMigrationManager (backup included)
+    """
+    session = SQLiteSession(database)
+    seed_table(size)
+    manager = SQLiteMigrationManager(
+        session, migrations_dir=workdir / "migrations", backup_sleep=0
+    )
+
+    def run():
+        manager.migrate_from_model(
+            BenchSessionItem, BenchSessionItemV2, BENCH_TABLE, name="add_status"
+        )
+
+    return run, size
+
+
+def _audit_benchmark(storage: AuditStorage, size: int):
+    """
+    Prepare audit lookup benchmark (three entries per object)
+    """
+    timestamp = datetime.now()
+
+    for i in range(size):
+        for field_name in ("name", "email", "cash"):
+            storage.save_audit_entry(
+                AuditEntry("benchitem", BENCH_TABLE, i, field_name, None, i, timestamp)
+            )
+
+    storage.flush()
+    objects = list(range(0, size, max(size // LOOKUPS, 1)))[:LOOKUPS]
+
+    def run():
+        for object_id in objects:
+            storage.get_audit_history("benchitem", BENCH_TABLE, object_id)
+
+    return run, len(objects)
+
+
+@benchmark("audit_lookup_memory")
+def bench_audit_lookup_memory(database: str, size: int, workdir: Path):
+    """
+    Get audit history of objects from InMemoryAuditStorage
+    """
+    return _audit_benchmark(InMemoryAuditStorage(), size)
+
+
+@benchmark("audit_lookup_sqlite")
+def bench_audit_lookup_sqlite(database: str, size: int, workdir: Path):
+    """
+    Get audit history of objects from SQLiteAuditStorage
+    """
+    session = SQLiteSession(database)
+
+    return _audit_benchmark(SQLiteAuditStorage(session.manager), size)
+
+
+def run_benchmark(name: str, size: int, storage: str, repeat: int = 3) -> Dict:
+    """
+    Run benchmark `repeat` times, every run on fresh database. The connector
+    is reconnected to its previous database afterwards.
+
+    :param		name:	  The benchmark name
+    :type		name:	  str
+    :param		size:	  The data size
+    :type		size:	  int
+    :param		storage:  The storage (file or memory)
+    :type		storage:  str
+    :param		repeat:	  The number of runs
+    :type		repeat:	  int
+
+    :returns:	min, median and max time in milliseconds and operations per second
+    :rtype:		Dict
+
+    :raises		SQLSymphonyException:  repeat is less than 1
+    """
+    _check_repeat(repeat)
+    timings = []
+    operations = 0
+    connector = SQLiteDBConnector()
+    previous = getattr(connector, "database_name", None)
+
+    try:
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory(prefix="sqlsymphony_bench_") as workdir:
+                database = (
+                    MEMORY if storage == "memory" else os.path.join(workdir, "bench.db")
+                )
+                connector.connect(database)
+
+                try:
+                    run, operations = BENCHMARKS[name](database, size, Path(workdir))
+                    started = time.perf_counter()
+                    run()
+                    timings.append(time.perf_counter() - started)
+                finally:
+                    # release database file before the directory is removed
+                    connector.connect(MEMORY)
+    finally:
+        if previous is not None:
+            connector.connect(previous)
+
+    median = statistics.median(timings)
+
+    return {
+        "name": name,
+        "size": size,
+        "storage": storage,
+        "repeat": repeat,
+        "operations": operations,
+        "min_ms": round(min(timings) * 1000, 3),
+        "median_ms": round(median * 1000, 3),
+        "max_ms": round(max(timings) * 1000, 3),
+        "ops_per_sec": round(operations / median, 1) if median else 0.0,
+    }
+
+
+def run_benchmarks(
+    names: Optional[Iterable[str]] = None,
+    sizes: Iterable[int] = DEFAULT_SIZES,
+    storages: Iterable[str] = STORAGES,
+    repeat: int = 3,
+) -> Dict:
+    """
+    Run benchmark suite. ORM logging is disabled during runs.
+
+    :param		names:	   The benchmark names (all by default)
+    :type		names:	   Optional[Iterable[str]]
+    :param		sizes:	   The data sizes
+    :type		sizes:	   Iterable[int]
+    :param		storages:  The storages (file, memory)
+    :type		storages:  Iterable[str]
+    :param		repeat:	   The number of runs of every benchmark
+    :type		repeat:	   int
+
+    :returns:	environment info and results (JSON serializable)
+    :rtype:		Dict
+    """
+    names = list(names) if names else list(BENCHMARKS)
+    results = []
+
+    logger.disable("sqlsymphony_orm")
+
+    try:
+        for name in names:
+            for size in sizes:
+                for storage in storages:
+                    results.append(run_benchmark(name, size, storage, repeat))
+    finally:
+        logger.enable("sqlsymphony_orm")
+
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "version": __version__,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare_results(
+    baseline: Dict, current: Dict, threshold: float = 0.1
+) -> List[Dict]:
+    """
+    Find regressions: benchmarks whose median time grew by more than
+    `threshold` (fraction) against baseline run
+
+    :param		baseline:	The baseline results
+    :type		baseline:	Dict
+    :param		current:	The current results
+    :type		current:	Dict
+    :param		threshold:	The threshold
+    :type		threshold:	float
+
+    :returns:	regressions with baseline and current median and ratio
+    :rtype:		List[Dict]
+    """
+    baseline_medians = {
+        (result["name"], result["size"], result["storage"]): result["median_ms"]
+        for result in baseline["results"]
+    }
+    regressions = []
+
+    for result in current["results"]:
+        key = (result["name"], result["size"], result["storage"])
+        before = baseline_medians.get(key, None)
+
+        if not before:
+            continue
+
+        ratio = result["median_ms"] / before
+
+        if ratio > 1 + threshold:
+            regressions.append(
+                {
+                    "name": result["name"],
+                    "size": result["size"],
+                    "storage": result["storage"],
+                    "baseline_ms": before,
+                    "current_ms": result["median_ms"],
+                    "ratio": round(ratio, 3),
+                }
+            )
+
+    return regressions
+
+
+def view_benchmark_results(results: Dict):
+    """
+    View benchmark results in table view
+
+    :param		results:  The results of run_benchmarks
+    :type		results:  Dict
+    """
+    from rich.console import Console
+    from rich.table import Table
+
+    table = Table(
+        title=f"SQLSymphonyORM {results['version']} benchmarks "
+        f"(python {results['python']}, sqlite {results['sqlite']})"
+    )
+    table.add_column("Benchmark", style="blue")
+    table.add_column("Size", style="cyan")
+    table.add_column("Storage", style="cyan")
+    table.add_column("Median ms", style="green")
+    table.add_column("Min ms", style="green")
+    table.add_column("Max ms", style="green")
+    table.add_column("Ops/sec", style="magenta")
+
+    for result in results["results"]:
+        table.add_row(
+            result["name"],
+            str(result["size"]),
+            result["storage"],
+            str(result["median_ms"]),
+            str(result["min_ms"]),
+            str(result["max_ms"]),
+            str(result["ops_per_sec"]),
+        )
+
+    console = Console()
+    console.print(table)
+
+
+@click.command("bench")
+@click.option(
+    "--only",
+    "names",
+    multiple=True,
+    type=click.Choice(sorted(BENCHMARKS)),
+    help="Run only these benchmarks (repeatable).",
+)
+@click.option(
+    "--size",
+    "sizes",
+    multiple=True,
+    type=int,
+    default=DEFAULT_SIZES,
+    show_default=True,
+    help="Data size (repeatable).",
+)
+@click.option(
+    "--storage",
+    "storages",
+    multiple=True,
+    type=click.Choice(STORAGES),
+    default=STORAGES,
+    show_default=True,
+    help="Database storage (repeatable).",
+)
+@click.option(
+    "--repeat",
+    default=3,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Runs per benchmark.",
+)
+@click.option(
+    "--output", type=click.Path(dir_okay=False), help="Write JSON results to file."
+)
+@click.option(
+    "--compare",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Baseline JSON results, exit with code 1 on regressions.",
+)
+@click.option(
+    "--threshold",
+    default=0.1,
+    show_default=True,
+    help="Allowed slowdown against baseline (fraction).",
+)
+def bench_command(names, sizes, storages, repeat, output, compare, threshold):
+    """
+    Run ORM benchmark suite
+    """
+    results = run_benchmarks(names, sizes, storages, repeat)
+    view_benchmark_results(results)
+
+    if output is not None:
+        with open(output, "w") as write_file:
+            json.dump(results, write_file, indent=4)
+
+    if compare is not None:
+        with open(compare, "r") as read_file:
+            regressions = compare_results(json.load(read_file), results, threshold)
+
+        for regression in regressions:
+            click.echo(
+                f"Regression {regression['name']} (size {regression['size']}, "
+                f"{regression['storage']}): {regression['baseline_ms']} ms -> "
+                f"{regression['current_ms']} ms (x{regression['ratio']})",
+                err=True,
+            )
+
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    bench_command()
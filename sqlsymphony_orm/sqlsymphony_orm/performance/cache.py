@@ -1,8 +1,266 @@
+import os
+import re
+import sys
 import time
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
 from functools import wraps
-from typing import Callable, Type, Any
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Type,
+    Any,
+    Dict,
+    Hashable,
+    Iterable,
+    Optional,
+    Set,
+    Tuple,
+)
+
 from sqlsymphony_orm.patterns import Singleton
 
+if TYPE_CHECKING:
+    from rich.table import Table
+
+MISSING = object()
+STATS_COUNTERS = (
+    "hits",
+    "misses",
+    "evictions",
+    "expirations",
+    "invalidations",
+    "coalesced",
+)
+SQL_IDENTIFIER = r"(?:\"[^\"]*\"|`[^`]*`|\[[^\]]*\]|\w+)"
+SQL_TOKEN_RE = re.compile(
+    rf"'(?:[^']|'')*'|{SQL_IDENTIFIER}(?:\s*\.\s*{SQL_IDENTIFIER})*|[(),]"
+)
+SQL_TABLE_KEYWORDS = {"FROM", "JOIN"}
+SQL_CLAUSE_KEYWORDS = {
+    "WHERE",
+    "GROUP",
+    "HAVING",
+    "ORDER",
+    "LIMIT",
+    "WINDOW",
+    "UNION",
+    "EXCEPT",
+    "INTERSECT",
+    "ON",
+    "USING",
+    "NATURAL",
+    "LEFT",
+    "RIGHT",
+    "FULL",
+    "INNER",
+    "OUTER",
+    "CROSS",
+}
+# statements that do not change table data; ROLLBACK is not here, results
+# read inside the rolled back transaction are stale
+SQL_NO_WRITE_KEYWORDS = {
+    "SELECT",
+    "VALUES",
+    "PRAGMA",
+    "EXPLAIN",
+    "ANALYZE",
+    "BEGIN",
+    "COMMIT",
+    "END",
+    "SAVEPOINT",
+    "RELEASE",
+    "CREATE",
+    "REINDEX",
+    "VACUUM",
+}
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Estimate memory size of value in bytes (containers are walked one level
+    deep per nesting, which is enough for lists of fetched rows)
+
+    :param		value:	The value
+    :type		value:	Any
+
+    :returns:	size in bytes
+    :rtype:		int
+    """
+    size = sys.getsizeof(value)
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+
+    return size
+
+
+def get_query_tables(sql: str) -> Set[str]:
+    """
+    Get names of tables read by select query: tables after FROM (including
+    comma-separated lists) and every JOIN, in subqueries too. String literals
+    are skipped, schema prefixes and identifier quotes are dropped.
+
+    :param		sql:  The sql query
+    :type		sql:  str
+
+    :returns:	lowercase table names
+    :rtype:		Set[str]
+    """
+    tables = set()
+    expect_table = in_table_list = False
+
+    for token in SQL_TOKEN_RE.findall(sql):
+        keyword = token.upper()
+
+        if token.startswith("'"):
+            expect_table = in_table_list = False
+        elif keyword in SQL_TABLE_KEYWORDS:
+            expect_table, in_table_list = True, keyword == "FROM"
+        elif token == "," and in_table_list:
+            expect_table = True
+        elif expect_table and token not in ("(", ")", ","):
+            tables.add(re.findall(SQL_IDENTIFIER, token)[-1].strip('"`[]').lower())
+            expect_table = False
+        else:
+            expect_table = False
+
+            if keyword in SQL_CLAUSE_KEYWORDS or token in ("(", ")"):
+                in_table_list = False
+
+    return tables
+
+
+def get_write_tables(sql: str) -> Optional[Set[str]]:
+    """
+    Get names of tables changed by statement: target of INSERT, REPLACE,
+    UPDATE and DELETE, dropped or altered table. Statements that do not
+    change table data (SELECT, PRAGMA, EXPLAIN, CREATE, transaction control)
+    change no tables. Writes made by triggers and foreign key actions are not
+    seen.
+
+    :param		sql:  The sql query
+    :type		sql:  str
+
+    :returns:	lowercase table names, None when they are not known (e.g.
+                WITH, ROLLBACK, ATTACH)
+    :rtype:		Optional[Set[str]]
+    """
+    tokens = [
+        token
+        for token in SQL_TOKEN_RE.findall(sql)
+        if not token.startswith("'") and token not in ("(", ")", ",")
+    ]
+    keywords = [token.upper() for token in tokens]
+
+    if not keywords or keywords[0] in SQL_NO_WRITE_KEYWORDS:
+        return set()
+
+    target = None
+
+    if keywords[0] in ("INSERT", "REPLACE") and "INTO" in keywords:
+        target = keywords.index("INTO") + 1
+    elif keywords[0] == "UPDATE":
+        target = 3 if keywords[1:2] == ["OR"] else 1
+    elif keywords[0] == "DELETE" and keywords[1:2] == ["FROM"]:
+        target = 2
+    elif keywords[0] == "DROP":
+        if keywords[1:2] not in (["TABLE"], ["VIEW"]):
+            # DROP INDEX or DROP TRIGGER
+            return set()
+
+        target = 4 if keywords[2:4] == ["IF", "EXISTS"] else 2
+    elif keywords[0] == "ALTER" and keywords[1:2] == ["TABLE"]:
+        target = 2
+
+    if target is None or target >= len(tokens):
+        return None
+
+    return {re.findall(SQL_IDENTIFIER, tokens[target])[-1].strip('"`[]').lower()}
+
+
+class CacheStats(object):
+    """
+    Thread-safe counters of a cache (or of a `cached` call site).
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructs a new instance.
+        """
+        self._lock = threading.Lock()
+        self.reset()
+
+    def incr(self, counter: str, amount: int = 1) -> None:
+        """
+        Increment counter
+
+        :param		counter:  The counter name (see STATS_COUNTERS)
+        :type		counter:  str
+        :param		amount:	  The amount
+        :type		amount:	  int
+        """
+        with self._lock:
+            self.counters[counter] += amount
+
+    def reset(self) -> None:
+        """
+        Reset all counters
+        """
+        with self._lock:
+            self.counters: Dict[str, int] = {name: 0 for name in STATS_COUNTERS}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get copy of counters with hit ratio
+
+        :returns:	counters
+        :rtype:		Dict[str, Any]
+        """
+        with self._lock:
+            data = dict(self.counters)
+
+        lookups = data["hits"] + data["misses"]
+        data["hit_ratio"] = round(data["hits"] / lookups, 4) if lookups else 0.0
+
+        return data
+
+
+def _stats_table(title: str, rows: Dict[str, Dict[str, Any]]) -> "Table":
+    """
+    Build rich table from stats snapshots
+
+    :param		title:	The title
+    :type		title:	str
+    :param		rows:	The snapshots by name
+    :type		rows:	Dict[str, Dict[str, Any]]
+
+    :returns:	table
+    :rtype:		Table
+    """
+    from rich.table import Table
+
+    table = Table(title=title)
+    columns = []
+
+    for snapshot in rows.values():
+        columns = list(snapshot.keys())
+        break
+
+    table.add_column("Name", style="blue", overflow="fold")
+
+    for column in columns:
+        table.add_column(column.replace("_", " ").upper(), style="green")
+
+    for name, snapshot in rows.items():
+        table.add_row(name, *[str(snapshot[column]) for column in columns])
+
+    return table
+
 
 class CacheBase(object):
     """
@@ -12,22 +270,42 @@ class CacheBase(object):
     getting, setting, and clearing cache entries.
     """
 
-    def get(self, key: str) -> Any:
+    stats: CacheStats = None
+
+    def get(self, key: str, default: Any = None) -> Any:
         """
         Retrieve a value from the cache.
 
         Args: key (str): The key to retrieve.
 
-        Returns: Any: The cached value, or None if the key is not found.
+        Returns: Any: The cached value, or default if the key is not found.
 
-        :param		key:  The key
-        :type		key:  str
+        :param		key:	  The key
+        :type		key:	  str
+        :param		default:  The value returned on cache miss
+        :type		default:  Any
 
         :returns:	value from cache
         :rtype:		Any
         """
         raise NotImplementedError
 
+    def peek(self, key: str, default: Any = None) -> Any:
+        """
+        Retrieve a value from the cache without counting a hit or a miss.
+        Caches with statistics override it, the default implementation is
+        get.
+
+        :param		key:	  The key
+        :type		key:	  str
+        :param		default:  The value returned on cache miss
+        :type		default:  Any
+
+        :returns:	value from cache
+        :rtype:		Any
+        """
+        return self.get(key, default)
+
     def set(self, key: str, value: Any, timestamp: float) -> None:
         """
         Store a value in the cache.
@@ -54,6 +332,42 @@ class CacheBase(object):
         """
         raise NotImplementedError
 
+    def size_info(self) -> Tuple[int, int]:
+        """
+        Get current number of entries and estimate of their size in bytes.
+
+        :returns:	(entries, bytes)
+        :rtype:		Tuple[int, int]
+        """
+        raise NotImplementedError
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get statistics snapshot: hits, misses, evictions, expirations,
+        invalidations, hit ratio, current size and bytes estimate.
+
+        :returns:	statistics
+        :rtype:		Dict[str, Any]
+        """
+        data = self.stats.snapshot() if self.stats is not None else {}
+        data["size"], data["bytes"] = self.size_info()
+
+        return data
+
+    def view_table_info(self):
+        """
+        View cache statistics in table view
+        """
+        from rich.console import Console
+
+        console = Console()
+        console.print(
+            _stats_table(
+                f"SQLSymphonyORM {self.__class__.__name__} statistics",
+                {self.__class__.__name__: self.snapshot()},
+            )
+        )
+
 
 class InMemoryCache(CacheBase):
     """
@@ -77,24 +391,50 @@ class InMemoryCache(CacheBase):
         self.ttl = ttl
         self.cache = {}
         self.timestamps = {}
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
 
-    def get(self, key: str) -> Any:
+    def get(self, key: str, default: Any = None) -> Any:
         """
         Gets the specified key.
 
-        :param		key:  The key
-        :type		key:  str
+        :param		key:	  The key
+        :type		key:	  str
+        :param		default:  The value returned on cache miss
+        :type		default:  Any
+
+        :returns:	Any value
+        :rtype:		Any
+        """
+        with self._lock:
+            if key in self.cache:
+                if time.time() - self.timestamps[key] <= self.ttl:
+                    self.stats.incr("hits")
+                    return self.cache[key]
+                else:
+                    del self.cache[key]
+                    del self.timestamps[key]
+                    self.stats.incr("expirations")
+        self.stats.incr("misses")
+        return default
+
+    def peek(self, key: str, default: Any = None) -> Any:
+        """
+        Gets the specified key without counting a hit or a miss.
+
+        :param		key:	  The key
+        :type		key:	  str
+        :param		default:  The value returned on cache miss
+        :type		default:  Any
 
         :returns:	Any value
         :rtype:		Any
         """
-        if key in self.cache:
-            if time.time() - self.timestamps[key] <= self.ttl:
+        with self._lock:
+            if key in self.cache and time.time() - self.timestamps[key] <= self.ttl:
                 return self.cache[key]
-            else:
-                del self.cache[key]
-                del self.timestamps[key]
-        return None
+
+        return default
 
     def set(self, key: str, value: Any, timestamp: float) -> None:
         """
@@ -107,19 +447,462 @@ class InMemoryCache(CacheBase):
         :param		timestamp:	The timestamp
         :type		timestamp:	float
         """
-        if len(self.cache) >= self.max_size:
-            oldest_key = min(self.timestamps, key=self.timestamps.get)
-            del self.cache[oldest_key]
-            del self.timestamps[oldest_key]
-        self.cache[key] = value
-        self.timestamps[key] = timestamp
+        with self._lock:
+            if key not in self.cache and len(self.cache) >= self.max_size:
+                oldest_key = min(self.timestamps, key=self.timestamps.get)
+                del self.cache[oldest_key]
+                del self.timestamps[oldest_key]
+                self.stats.incr("evictions")
+            self.cache[key] = value
+            self.timestamps[key] = timestamp
 
     def clear(self) -> None:
         """
         Clears the cache
         """
-        self.cache.clear()
-        self.timestamps.clear()
+        with self._lock:
+            self.cache.clear()
+            self.timestamps.clear()
+
+    def size_info(self) -> Tuple[int, int]:
+        """
+        Get current number of entries and estimate of their size in bytes.
+
+        :returns:	(entries, bytes)
+        :rtype:		Tuple[int, int]
+        """
+        with self._lock:
+            values = list(self.cache.values())
+
+        return len(values), sum(estimate_size(value) for value in values)
+
+
+class QueryResultCache(CacheBase):
+    """
+    A cache for fetched query results with table-level invalidation.
+
+    Entries are keyed by the compiled `(sql, params)` pair and remember which
+    tables they were read from, so a write to a table drops only the results
+    that depend on it. Entries are evicted in LRU order when the memory
+    estimate exceeds `max_bytes`, and expire after `ttl` seconds. Result
+    lists are stored as tuples and every hit returns a new list, so callers
+    cannot change the cached result. Every invalidation bumps the version of
+    its table: a reader takes `get_version(tables)` before the query and
+    passes it to `set`, which skips the result if a table was written
+    meanwhile.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, ttl: int = 60) -> None:
+        """
+        Constructs a new instance.
+
+        :param		max_bytes:	The maximum size of cached results in bytes
+        :type		max_bytes:	int
+        :param		ttl:		The ttl
+        :type		ttl:		int
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.cache: OrderedDict = OrderedDict()
+        self.tables: Dict[str, Set[Hashable]] = {}
+        self.versions: Dict[str, int] = {}
+        self.clears = 0
+        self.current_bytes = 0
+        self.stats = CacheStats()
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def make_key(sql: str, params: Iterable = ()) -> tuple:
+        """
+        Makes a cache key from compiled query.
+
+        :param		sql:	 The sql query
+        :type		sql:	 str
+        :param		params:	 The query parameters
+        :type		params:	 Iterable
+
+        :returns:	cache key
+        :rtype:		tuple
+        """
+        return (sql, tuple(params))
+
+    def get_version(self, tables: Iterable[str]) -> tuple:
+        """
+        Gets the version of tables, to be taken before reading them
+
+        :param		tables:	 The tables
+        :type		tables:	 Iterable[str]
+
+        :returns:	version
+        :rtype:		tuple
+        """
+        names = sorted({table.lower() for table in tables})
+
+        with self._lock:
+            return (self.clears, tuple(self.versions.get(name, 0) for name in names))
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Gets the specified key.
+
+        :param		key:	  The key
+        :type		key:	  Hashable
+        :param		default:  The value returned on cache miss
+        :type		default:  Any
+
+        :returns:	cached result (copy of list) or default
+        :rtype:		Any
+        """
+        with self._lock:
+            entry = self.cache.get(key, None)
+
+            if entry is None:
+                self.stats.incr("misses")
+                return default
+
+            if time.time() - entry["timestamp"] > self.ttl:
+                self._remove(key)
+                self.stats.incr("expirations")
+                self.stats.incr("misses")
+                return default
+
+            self.cache.move_to_end(key)
+            self.stats.incr("hits")
+            value = entry["value"]
+
+        return list(value) if entry["is_list"] else value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        timestamp: float,
+        tables: Iterable[str] = (),
+        version: Optional[tuple] = None,
+    ) -> None:
+        """
+        Set new cache element, unless tables were invalidated after version
+
+        :param		key:		The key
+        :type		key:		Hashable
+        :param		value:		The value
+        :type		value:		Any
+        :param		timestamp:	The timestamp
+        :type		timestamp:	float
+        :param		tables:		The tables the result was read from
+        :type		tables:		Iterable[str]
+        :param		version:	The version of tables taken before the read
+        :type		version:	Optional[tuple]
+        """
+        is_list = isinstance(value, list)
+
+        if is_list:
+            value = tuple(value)
+
+        size = estimate_size(value)
+
+        if size > self.max_bytes:
+            return
+
+        tables = {table.lower() for table in tables}
+
+        with self._lock:
+            if version is not None and version != self.get_version(tables):
+                return
+
+            if key in self.cache:
+                self._remove(key)
+
+            while self.cache and self.current_bytes + size > self.max_bytes:
+                self._remove(next(iter(self.cache)))
+                self.stats.incr("evictions")
+
+            self.cache[key] = {
+                "value": value,
+                "is_list": is_list,
+                "timestamp": timestamp,
+                "size": size,
+                "tables": tables,
+            }
+            self.current_bytes += size
+
+            for table in tables:
+                self.tables.setdefault(table, set()).add(key)
+
+    def invalidate_table(self, table_name: str) -> None:
+        """
+        Drop all cached results read from table
+
+        :param		table_name:	 The table name
+        :type		table_name:	 str
+        """
+        with self._lock:
+            table_name = table_name.lower()
+            self.versions[table_name] = self.versions.get(table_name, 0) + 1
+            keys = self.tables.pop(table_name, set())
+
+            for key in keys:
+                self._remove(key)
+
+            self.stats.incr("invalidations", len(keys))
+
+    def clear(self) -> None:
+        """
+        Clears the cache
+        """
+        with self._lock:
+            self.cache.clear()
+            self.tables.clear()
+            self.clears += 1
+            self.current_bytes = 0
+
+    def size_info(self) -> Tuple[int, int]:
+        """
+        Get current number of entries and estimate of their size in bytes.
+
+        :returns:	(entries, bytes)
+        :rtype:		Tuple[int, int]
+        """
+        with self._lock:
+            return len(self.cache), self.current_bytes
+
+    def _remove(self, key: Hashable) -> None:
+        """
+        Remove entry (caller must hold the lock)
+
+        :param		key:  The key
+        :type		key:  Hashable
+        """
+        entry = self.cache.pop(key, None)
+
+        if entry is None:
+            return
+
+        self.current_bytes -= entry["size"]
+
+        for table in entry["tables"]:
+            keys = self.tables.get(table, None)
+
+            if keys is not None:
+                keys.discard(key)
+
+                if not keys:
+                    del self.tables[table]
+
+
+class SQLiteCache(CacheBase):
+    """
+    A persistent cache stored in a SQLite database file.
+
+    Values are pickled into a table of the cache file, so the cache survives
+    restarts and is shared between processes (e.g. pre-forked workers) that
+    open the same file. The file runs in WAL mode, each thread and process
+    gets its own connection. Entries expire after `ttl` seconds, and the
+    oldest entries above `max_size` are evicted (checked every `evict_every`
+    writes, so the table may briefly exceed the limit).
+    Only share the cache file between trusted processes: values are unpickled.
+    """
+
+    def __init__(
+        self,
+        path: str = "sqlsymphony_cache.db",
+        max_size: int = 1000,
+        ttl: int = 60,
+        table_name: str = "sqlsymphony_cache",
+        evict_every: int = 64,
+    ) -> None:
+        """
+        Constructs a new instance.
+
+        :param		path:		  The cache database path
+        :type		path:		  str
+        :param		max_size:	  The maximum size
+        :type		max_size:	  int
+        :param		ttl:		  The ttl
+        :type		ttl:		  int
+        :param		table_name:	  The cache table name
+        :type		table_name:	  str
+        :param		evict_every:  Run eviction every N writes
+        :type		evict_every:  int
+        """
+        self.path = str(path)
+        self.max_size = max_size
+        self.ttl = ttl
+        self.table_name = table_name
+        self.evict_every = evict_every
+        self.stats = CacheStats()
+        self._writes = 0
+        self._local = threading.local()
+
+        self._connection().executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.table_name} (
+                key TEXT PRIMARY KEY,
+                value BLOB,
+                timestamp REAL
+            );
+            CREATE INDEX IF NOT EXISTS {self.table_name}_timestamp
+                ON {self.table_name} (timestamp);
+            """
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Get connection of current thread and process
+
+        :returns:	connection
+        :rtype:		sqlite3.Connection
+        """
+        connection = getattr(self._local, "connection", None)
+
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+
+        return connection
+
+    @staticmethod
+    def _key(key: Hashable) -> str:
+        """
+        Convert key to text
+
+        :param		key:  The key
+        :type		key:  Hashable
+
+        :returns:	text key
+        :rtype:		str
+        """
+        return key if isinstance(key, str) else repr(key)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Gets the specified key.
+
+        :param		key:	  The key
+        :type		key:	  Hashable
+        :param		default:  The value returned on cache miss
+        :type		default:  Any
+
+        :returns:	Any value
+        :rtype:		Any
+        """
+        row = (
+            self._connection()
+            .execute(
+                f"SELECT value, timestamp FROM {self.table_name} WHERE key = ?",
+                (self._key(key),),
+            )
+            .fetchone()
+        )
+
+        if row is None:
+            self.stats.incr("misses")
+            return default
+
+        if time.time() - row[1] > self.ttl:
+            self._connection().execute(
+                f"DELETE FROM {self.table_name} WHERE key = ? AND timestamp = ?",
+                (self._key(key), row[1]),
+            )
+            self.stats.incr("expirations")
+            self.stats.incr("misses")
+            return default
+
+        self.stats.incr("hits")
+        return pickle.loads(row[0])
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Gets the specified key without counting a hit or a miss.
+
+        :param		key:	  The key
+        :type		key:	  Hashable
+        :param		default:  The value returned on cache miss
+        :type		default:  Any
+
+        :returns:	Any value
+        :rtype:		Any
+        """
+        row = (
+            self._connection()
+            .execute(
+                f"SELECT value FROM {self.table_name} WHERE key = ? AND timestamp >= ?",
+                (self._key(key), time.time() - self.ttl),
+            )
+            .fetchone()
+        )
+
+        return default if row is None else pickle.loads(row[0])
+
+    def set(self, key: Hashable, value: Any, timestamp: float) -> None:
+        """
+        Set new cache element
+
+        :param		key:		The key
+        :type		key:		Hashable
+        :param		value:		The value
+        :type		value:		Any
+        :param		timestamp:	The timestamp
+        :type		timestamp:	float
+        """
+        self._connection().execute(
+            f"INSERT OR REPLACE INTO {self.table_name} (key, value, timestamp) VALUES (?, ?, ?)",
+            (self._key(key), pickle.dumps(value, pickle.HIGHEST_PROTOCOL), timestamp),
+        )
+
+        self._writes += 1
+
+        if self._writes % self.evict_every == 0:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Delete expired entries and the oldest entries above max_size
+        """
+        connection = self._connection()
+        expired = connection.execute(
+            f"DELETE FROM {self.table_name} WHERE timestamp < ?",
+            (time.time() - self.ttl,),
+        )
+        self.stats.incr("expirations", expired.rowcount)
+
+        evicted = connection.execute(
+            f"""
+            DELETE FROM {self.table_name} WHERE key IN (
+                SELECT key FROM {self.table_name}
+                ORDER BY timestamp DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_size,),
+        )
+        self.stats.incr("evictions", evicted.rowcount)
+
+    def clear(self) -> None:
+        """
+        Clears the cache
+        """
+        self._connection().execute(f"DELETE FROM {self.table_name}")
+
+    def size_info(self) -> Tuple[int, int]:
+        """
+        Get current number of entries and size of pickled values in bytes.
+        Counters in `stats` are per process, size is shared by all of them.
+
+        :returns:	(entries, bytes)
+        :rtype:		Tuple[int, int]
+        """
+        row = (
+            self._connection()
+            .execute(
+                f"SELECT count(*), coalesce(sum(length(value)), 0) FROM {self.table_name}"
+            )
+            .fetchone()
+        )
+
+        return row[0], row[1]
 
 
 class CacheFactory(object):
@@ -176,18 +959,35 @@ class SingletonCache(CacheBase, metaclass=Singleton):
         :type		kwargs:		 dictionary
         """
         self.cache = CacheFactory.create_cache(cache_type, *args, **kwargs)
+        self.stats = self.cache.stats
 
-    def get(self, key: str) -> Any:
+    def get(self, key: str, default: Any = None) -> Any:
         """
         Gets the specified key.
 
-        :param		key:  The key
-        :type		key:  str
+        :param		key:	  The key
+        :type		key:	  str
+        :param		default:  The value returned on cache miss
+        :type		default:  Any
 
         :returns:	Any value
         :rtype:		Any
         """
-        return self.cache.get(key)
+        return self.cache.get(key, default)
+
+    def peek(self, key: str, default: Any = None) -> Any:
+        """
+        Gets the specified key without counting a hit or a miss.
+
+        :param		key:	  The key
+        :type		key:	  str
+        :param		default:  The value returned on cache miss
+        :type		default:  Any
+
+        :returns:	Any value
+        :rtype:		Any
+        """
+        return self.cache.peek(key, default)
 
     def set(self, key: str, value: Any, timestamp: float) -> None:
         """
@@ -208,11 +1008,63 @@ class SingletonCache(CacheBase, metaclass=Singleton):
         """
         self.cache.clear()
 
+    def size_info(self) -> Tuple[int, int]:
+        """
+        Get current number of entries and estimate of their size in bytes.
+
+        :returns:	(entries, bytes)
+        :rtype:		Tuple[int, int]
+        """
+        return self.cache.size_info()
+
+
+CACHED_FUNCTIONS_STATS: Dict[str, CacheStats] = {}
+
+
+def cached_functions_snapshot() -> Dict[str, Dict[str, Any]]:
+    """
+    Get statistics snapshot of every function decorated with `cached`
+
+    :returns:	statistics by function qualified name
+    :rtype:		Dict[str, Dict[str, Any]]
+    """
+    return {name: stats.snapshot() for name, stats in CACHED_FUNCTIONS_STATS.items()}
+
+
+def view_cached_functions_info():
+    """
+    View statistics of `cached` functions in table view
+    """
+    from rich.console import Console
+
+    console = Console()
+    console.print(
+        _stats_table(
+            "SQLSymphonyORM cached functions statistics", cached_functions_snapshot()
+        )
+    )
+
+
+class _InFlightCall(object):
+    """
+    A computation of a cache key that other callers can wait for.
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructs a new instance.
+        """
+        self.event = threading.Event()
+        self.thread_id = threading.get_ident()
+        self.result: Any = None
+        self.exception: BaseException = None
+
 
 def cached(
     cache: SingletonCache,
     key_func: Callable[[Any, Any], str] = lambda *args, **kwargs: str(args)
     + str(kwargs),
+    cache_none: bool = True,
 ) -> Callable:
     """
     A decorator that caches the results of a function or method.
@@ -222,34 +1074,89 @@ def cached(
     you to customize how the cache key is generated from the function/method
     arguments.
 
+    The decorator is thread-safe and single-flight: when several threads miss
+    the same key at once, only one of them calls the function and the others
+    wait for its result (or its exception).
+
     Args: cache (SingletonCache): The cache instance to use for caching.
     key_func (Callable[[Any, Any], str]): A function that generates the cache
     key from the function/method arguments.
 
     Returns: Callable: A new function or method that caches the results.
 
-    :param		cache:	   The cache
-    :type		cache:	   SingletonCache
-    :param		key_func:  The key function
-    :type		key_func:  (Callable[[Any, Any], str])
-    :param		kwargs:	   The keywords arguments
-    :type		kwargs:	   dictionary
+    :param		cache:		 The cache
+    :type		cache:		 SingletonCache
+    :param		key_func:	 The key function
+    :type		key_func:	 (Callable[[Any, Any], str])
+    :param		cache_none:	 Cache None results too
+    :type		cache_none:	 bool
 
     :returns:	decorator
     :rtype:		Callable
     """
 
     def decorator(func: Callable) -> Callable:
+        in_flight = {}
+        in_flight_lock = threading.Lock()
+        stats = CacheStats()
+        CACHED_FUNCTIONS_STATS[f"{func.__module__}.{func.__qualname__}"] = stats
+
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
             key = key_func(*args, **kwargs)
-            cached_value = cache.get(key)
-            if cached_value is not None:
+            cached_value = cache.get(key, MISSING)
+
+            if cached_value is not MISSING:
+                stats.incr("hits")
                 return cached_value
-            else:
-                result = func(*args, **kwargs)
-                cache.set(key, result, time.time())
-                return result
+
+            stats.incr("misses")
+
+            with in_flight_lock:
+                call = in_flight.get(key, None)
+                leader = call is None
+
+                if leader:
+                    call = _InFlightCall()
+                    in_flight[key] = call
+
+            if not leader:
+                if call.thread_id == threading.get_ident():
+                    return func(*args, **kwargs)
+
+                stats.incr("coalesced")
+                call.event.wait()
+
+                if call.exception is not None:
+                    raise call.exception
+
+                return call.result
+
+            try:
+                # the previous leader may have stored the result after our
+                # miss; peek, the miss of this call is already counted
+                cached_value = cache.peek(key, MISSING)
+
+                if cached_value is not MISSING:
+                    call.result = cached_value
+                    return cached_value
+
+                call.result = func(*args, **kwargs)
+
+                if call.result is not None or cache_none:
+                    cache.set(key, call.result, time.time())
+
+                return call.result
+            except BaseException as ex:
+                call.exception = ex
+                raise
+            finally:
+                with in_flight_lock:
+                    del in_flight[key]
+
+                call.event.set()
+
+        wrapper.cache_stats = stats
 
         return wrapper
 
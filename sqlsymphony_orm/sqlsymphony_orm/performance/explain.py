@@ -0,0 +1,352 @@
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from sqlsymphony_orm.database.connection import SQLiteDBConnector
+from sqlsymphony_orm.performance.profiler import normalize_sql
+
+EXPLAINED_STATEMENTS = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+_ACCESS = re.compile(r"^(SCAN|SEARCH) (?:TABLE )?(\w+)(?: AS (\w+))?", re.IGNORECASE)
+_TEMP_BTREE = re.compile(r"USE TEMP B-TREE FOR (.+)$", re.IGNORECASE)
+_WHERE = re.compile(
+    r"\bWHERE\b(.*?)(?:\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|$)",
+    re.IGNORECASE | re.DOTALL,
+)
+_ORDER_BY = re.compile(
+    r"\b(ORDER|GROUP)\s+BY\b(.*?)(?:\bORDER\s+BY\b|\bLIMIT\b|$)",
+    re.IGNORECASE | re.DOTALL,
+)
+_CONDITION = re.compile(
+    r"(?:(\w+)\.)?(\w+)\s*(==|=|\bIS\b|\bIN\b|<=|>=|<|>|\bLIKE\b|\bBETWEEN\b)",
+    re.IGNORECASE,
+)
+_EQUALITY_OPERATORS = ("=", "==", "IS", "IN")
+
+
+@dataclass
+class PlanStep:
+    """
+    This dataclass describes a step of query plan (EXPLAIN QUERY PLAN row).
+    """
+
+    id: int
+    parent: int
+    detail: str
+
+
+@dataclass
+class PlanIssue:
+    """
+    This dataclass describes a problem found in query plan.
+    """
+
+    kind: str
+    table: Optional[str]
+    detail: str
+    suggestion: Optional[str] = None
+
+
+@dataclass
+class QueryPlan:
+    """
+    This dataclass describes an analyzed query plan of statement shape.
+    """
+
+    shape: str
+    query: str
+    steps: List[PlanStep] = field(default_factory=list)
+    issues: List[PlanIssue] = field(default_factory=list)
+
+
+def get_filter_columns(
+    query: str, table: str, alias: Optional[str] = None
+) -> List[str]:
+    """
+    Get columns of table compared in WHERE clause, equality comparisons first
+    (the order a composite index serves them best)
+
+    :param		query:	The query
+    :type		query:	str
+    :param		table:	The table name
+    :type		table:	str
+    :param		alias:	The table alias
+    :type		alias:	Optional[str]
+
+    :returns:	column names
+    :rtype:		List[str]
+    """
+    match = _WHERE.search(query)
+
+    if match is None:
+        return []
+
+    qualifiers = {table.lower(), (alias or table).lower()}
+    equality, ranges = [], []
+
+    for qualifier, column, operator in _CONDITION.findall(match.group(1)):
+        if qualifier and qualifier.lower() not in qualifiers:
+            continue
+
+        target = equality if operator.upper() in _EQUALITY_OPERATORS else ranges
+
+        if column not in equality and column not in ranges:
+            target.append(column)
+
+    return equality + ranges
+
+
+def get_order_columns(query: str) -> List[str]:
+    """
+    Get columns of ORDER BY / GROUP BY clause
+
+    :param		query:	The query
+    :type		query:	str
+
+    :returns:	column names
+    :rtype:		List[str]
+    """
+    columns = []
+
+    for _, clause in _ORDER_BY.findall(query):
+        for term in clause.split(","):
+            words = term.split()
+
+            if words:
+                column = words[0].split(".")[-1].strip('"')
+
+                if column.isidentifier() and column not in columns:
+                    columns.append(column)
+
+    return columns
+
+
+def suggest_index(table: str, columns: List[str]) -> Optional[str]:
+    """
+    Build CREATE INDEX statement for columns of table
+
+    :param		table:	  The table name
+    :type		table:	  str
+    :param		columns:  The columns
+    :type		columns:  List[str]
+
+    :returns:	sql statement or None if there are no columns
+    :rtype:		Optional[str]
+    """
+    if not columns:
+        return None
+
+    return (
+        f"CREATE INDEX IF NOT EXISTS idx_{table}_{'_'.join(columns)} "
+        f"ON {table} ({', '.join(columns)})"
+    )
+
+
+class QueryPlanAnalyzer(object):
+    """
+    Opt-in analyzer of query plans.
+
+    The first statement of every shape (see normalize_sql) is run through
+    EXPLAIN QUERY PLAN, the plan is cached per shape, and full table scans
+    and temporary B-tree sorts are reported with a suggested index. Plug it
+    into Model (`__plan_analyzer__`), SQLiteSession or QueryExecutor in
+    staging to catch missing indexes before production.
+    """
+
+    def __init__(
+        self,
+        connector: Optional[SQLiteDBConnector] = None,
+        warn: bool = True,
+        ignore_unfiltered: bool = True,
+        max_shapes: int = 1000,
+    ) -> None:
+        """
+        Constructs a new instance.
+
+        :param		connector:			The connector (process-wide by default)
+        :type		connector:			Optional[SQLiteDBConnector]
+        :param		warn:				Log warning for every found issue
+        :type		warn:				bool
+        :param		ignore_unfiltered:	Do not flag scans of unfiltered tables
+        :type		ignore_unfiltered:	bool
+        :param		max_shapes:			The max number of cached plans
+        :type		max_shapes:			int
+        """
+        self.connector = connector if connector is not None else SQLiteDBConnector()
+        self.warn = warn
+        self.ignore_unfiltered = ignore_unfiltered
+        self.max_shapes = max_shapes
+        self.plans: OrderedDict[str, QueryPlan] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def analyze(self, query: str, values: Tuple = ()) -> Optional[QueryPlan]:
+        """
+        Get query plan of statement shape, explaining it on first use
+
+        :param		query:	 The query
+        :type		query:	 str
+        :param		values:	 The values
+        :type		values:	 Tuple
+
+        :returns:	The query plan or None if statement is not explained
+        :rtype:		Optional[QueryPlan]
+        """
+        shape = normalize_sql(query)
+
+        with self._lock:
+            plan = self.plans.get(shape, None)
+
+        if plan is not None:
+            return plan
+
+        if not query.lstrip().upper().startswith(EXPLAINED_STATEMENTS):
+            return None
+
+        try:
+            rows = self.connector.explain(query, values)
+        except sqlite3.Error as ex:
+            logger.debug("[QueryPlan] Cannot explain {}: {}", query, ex)
+            return None
+
+        plan = self.build_plan(shape, query, rows)
+
+        with self._lock:
+            self.plans[shape] = plan
+
+            while len(self.plans) > self.max_shapes:
+                self.plans.popitem(last=False)
+
+        if self.warn:
+            for issue in plan.issues:
+                logger.warning(
+                    "[QueryPlan] {} ({}): {}. Suggested: {}",
+                    issue.detail,
+                    issue.kind,
+                    shape,
+                    issue.suggestion or "-",
+                )
+
+        return plan
+
+    def build_plan(self, shape: str, query: str, rows: list) -> QueryPlan:
+        """
+        Build query plan and find issues in EXPLAIN QUERY PLAN rows
+
+        :param		shape:	The statement shape
+        :type		shape:	str
+        :param		query:	The query
+        :type		query:	str
+        :param		rows:	The rows (id, parent, notused, detail)
+        :type		rows:	list
+
+        :returns:	The query plan
+        :rtype:		QueryPlan
+        """
+        plan = QueryPlan(shape=shape, query=query)
+        accessed = []
+
+        for row in rows:
+            detail = row[3]
+            plan.steps.append(PlanStep(id=row[0], parent=row[1], detail=detail))
+            access = _ACCESS.match(detail)
+
+            if access is not None:
+                operation, table, alias = access.groups()
+
+                if table.upper() in ("CONSTANT", "SUBQUERY") or table.startswith(
+                    "sqlite_"
+                ):
+                    continue
+
+                accessed.append((table, alias))
+
+                if operation.upper() == "SEARCH" or "INDEX" in detail.upper():
+                    continue
+
+                columns = get_filter_columns(query, table, alias)
+
+                if not columns and self.ignore_unfiltered:
+                    continue
+
+                plan.issues.append(
+                    PlanIssue(
+                        kind="full_scan",
+                        table=table,
+                        detail=detail,
+                        suggestion=suggest_index(table, columns),
+                    )
+                )
+                continue
+
+            temp_btree = _TEMP_BTREE.search(detail)
+
+            if temp_btree is not None:
+                suggestion = None
+                table = None
+
+                if len(accessed) == 1:
+                    table, alias = accessed[0]
+                    columns = get_filter_columns(query, table, alias)
+                    columns += [
+                        column
+                        for column in get_order_columns(query)
+                        if column not in columns
+                    ]
+                    suggestion = suggest_index(table, columns)
+
+                plan.issues.append(
+                    PlanIssue(
+                        kind="temp_btree",
+                        table=table,
+                        detail=detail,
+                        suggestion=suggestion,
+                    )
+                )
+
+        return plan
+
+    def get_issues(self) -> Dict[str, List[PlanIssue]]:
+        """
+        Get issues of analyzed shapes
+
+        :returns:	issues by shape (shapes without issues are omitted)
+        :rtype:		Dict[str, List[PlanIssue]]
+        """
+        with self._lock:
+            return {
+                shape: list(plan.issues)
+                for shape, plan in self.plans.items()
+                if plan.issues
+            }
+
+    def reset(self):
+        """
+        Drop cached plans (e.g. after creating indexes)
+        """
+        with self._lock:
+            self.plans.clear()
+
+    def view_table_info(self):
+        """
+        View found issues in table view
+        """
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table(title="SQLSymphonyORM Query Plan Issues")
+        table.add_column("Statement", style="blue", overflow="fold")
+        table.add_column("Issue", style="red")
+        table.add_column("Plan", style="magenta")
+        table.add_column("Suggested index", style="green", overflow="fold")
+
+        for shape, issues in self.get_issues().items():
+            for issue in issues:
+                table.add_row(shape, issue.kind, issue.detail, issue.suggestion or "")
+
+        console = Console()
+        console.print(table)
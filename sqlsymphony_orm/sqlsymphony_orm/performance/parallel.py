@@ -0,0 +1,402 @@
+import os
+import sqlite3
+import multiprocessing
+from collections import deque
+from pathlib import Path
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+from sqlsymphony_orm.datatypes.adapters import DETECT_TYPES, adapt_values
+from sqlsymphony_orm.exceptions import SQLSymphonyException
+
+MEMORY_DATABASE = ":memory:"
+
+# read-only connections of the current (worker or scanning) process, by file
+_worker_connections: Dict[str, sqlite3.Connection] = {}
+
+
+def init_worker():
+    """
+    Initialize worker process: converters of built-in field types are
+    registered when field classes are imported, spawned workers do not import
+    them otherwise
+    """
+    import sqlsymphony_orm.datatypes.fields  # noqa: F401
+
+
+def get_readonly_connection(database_file: str) -> sqlite3.Connection:
+    """
+    Get read-only connection of current process to database file (opened on
+    first use and kept for next ranges)
+
+    :param		database_file:	The database file
+    :type		database_file:	str
+
+    :returns:	connection
+    :rtype:		sqlite3.Connection
+    """
+    connection = _worker_connections.get(database_file, None)
+
+    if connection is None:
+        connection = sqlite3.connect(
+            f"{Path(database_file).resolve().as_uri()}?mode=ro",
+            uri=True,
+            detect_types=DETECT_TYPES,
+            check_same_thread=False,
+        )
+        connection.execute("PRAGMA query_only = 1")
+        _worker_connections[database_file] = connection
+
+    return connection
+
+
+def close_readonly_connection(database_file: str):
+    """
+    Close read-only connection of current process to database file, if opened
+
+    :param		database_file:	The database file
+    :type		database_file:	str
+    """
+    connection = _worker_connections.pop(database_file, None)
+
+    if connection is not None:
+        connection.close()
+
+
+def scan_range(
+    database_file: str,
+    query: str,
+    values: Tuple,
+    start: int,
+    end: int,
+    reducer: Optional[Callable[[List[tuple]], Any]] = None,
+) -> Any:
+    """
+    Run query over rowid range [start, end) in worker process
+
+    :param		database_file:	The database file
+    :type		database_file:	str
+    :param		query:			The query with rowid range placeholders first
+    :type		query:			str
+    :param		values:			The values of the rest of query
+    :type		values:			Tuple
+    :param		start:			The first rowid
+    :type		start:			int
+    :param		end:			The rowid after the last one
+    :type		end:			int
+    :param		reducer:		The reducer of range rows (rows by default)
+    :type		reducer:		Optional[Callable[[List[tuple]], Any]]
+
+    :returns:	rows or reduced value
+    :rtype:		Any
+    """
+    rows = (
+        get_readonly_connection(database_file)
+        .execute(query, (start, end, *adapt_values(values)))
+        .fetchall()
+    )
+
+    return rows if reducer is None else reducer(rows)
+
+
+def split_range(low: int, high: int, partitions: int) -> List[Tuple[int, int]]:
+    """
+    Split rowids [low, high] into contiguous half-open ranges of equal width
+
+    :param		low:		 The lowest rowid
+    :type		low:		 int
+    :param		high:		 The highest rowid
+    :type		high:		 int
+    :param		partitions:	 The number of ranges
+    :type		partitions:	 int
+
+    :returns:	ranges (start, end), ordered
+    :rtype:		List[Tuple[int, int]]
+    """
+    span = high - low + 1
+    partitions = max(1, min(partitions, span))
+    step, extra = divmod(span, partitions)
+    ranges = []
+    start = low
+
+    for index in range(partitions):
+        end = start + step + (index < extra)
+        ranges.append((start, end))
+        start = end
+
+    return ranges
+
+
+class ParallelScanner(object):
+    """
+    Parallel scan of large tables over rowid ranges in a process pool.
+
+    The rowid span of the table is split into `workers * partitions_per_worker`
+    ranges (more ranges than workers balance gaps in rowids) of at most
+    `max_range_size` rowids, every range is queried by a worker process with
+    its own read-only connection, and the results are streamed back in rowid
+    order or reduced: `reducer` runs in the worker on rows of one range,
+    `combiner` merges partial results in the caller. Only
+    `workers * pending_per_worker` ranges are in flight at once, so memory of
+    a scan is bound by the range size, not by the table size. Readers do not
+    block each other, and in WAL mode neither do writers. Workers are spawned
+    (not forked), so reducers must be importable module-level functions, and
+    the pool is reused until close().
+    """
+
+    def __init__(
+        self,
+        database_file: str,
+        workers: Optional[int] = None,
+        partitions_per_worker: int = 4,
+        start_method: str = "spawn",
+        max_range_size: int = 100000,
+        pending_per_worker: int = 2,
+    ) -> None:
+        """
+        Constructs a new instance.
+
+        :param		database_file:			The database file
+        :type		database_file:			str
+        :param		workers:				The number of processes (cpu count)
+        :type		workers:				Optional[int]
+        :param		partitions_per_worker:	The number of ranges per process
+        :type		partitions_per_worker:	int
+        :param		start_method:			The multiprocessing start method
+        :type		start_method:			str
+        :param		max_range_size:			The maximum number of rowids in range
+        :type		max_range_size:			int
+        :param		pending_per_worker:		The number of ranges in flight per
+                                            process
+        :type		pending_per_worker:		int
+
+        :raises		SQLSymphonyException:	in-memory database
+        """
+        if str(database_file) == MEMORY_DATABASE:
+            raise SQLSymphonyException(
+                "In-memory database cannot be scanned by other processes"
+            )
+
+        self.database_file = str(Path(database_file).resolve())
+        self.workers = workers or os.cpu_count() or 1
+        self.partitions_per_worker = partitions_per_worker
+        self.start_method = start_method
+        self.max_range_size = max_range_size
+        self.pending_per_worker = pending_per_worker
+        self._executor: Optional[Executor] = None
+
+    def __enter__(self) -> "ParallelScanner":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def executor(self) -> Executor:
+        """
+        Get process pool (created on first use)
+
+        :returns:	executor
+        :rtype:		Executor
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=init_worker,
+            )
+
+        return self._executor
+
+    def close(self):
+        """
+        Shut down process pool and close read-only connection of this process
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+        close_readonly_connection(self.database_file)
+
+    def get_ranges(self, table_name: str) -> List[Tuple[int, int]]:
+        """
+        Get rowid ranges of table
+
+        :param		table_name:	 The table name
+        :type		table_name:	 str
+
+        :returns:	ranges (start, end), empty for empty table
+        :rtype:		List[Tuple[int, int]]
+        """
+        low, high = (
+            get_readonly_connection(self.database_file)
+            .execute(f"SELECT MIN(rowid), MAX(rowid) FROM {table_name}")
+            .fetchone()
+        )
+
+        if low is None:
+            return []
+
+        partitions = max(
+            self.workers * self.partitions_per_worker,
+            -(-(high - low + 1) // self.max_range_size),
+        )
+
+        return split_range(low, high, partitions)
+
+    @staticmethod
+    def build_query(
+        table_name: str, columns: Sequence[str] = ("*",), where: Optional[str] = None
+    ) -> str:
+        """
+        Build query of one rowid range
+
+        :param		table_name:	 The table name
+        :type		table_name:	 str
+        :param		columns:	 The columns or aggregate expressions
+        :type		columns:	 Sequence[str]
+        :param		where:		 The extra condition with ? placeholders
+        :type		where:		 Optional[str]
+
+        :returns:	query with rowid range placeholders first
+        :rtype:		str
+        """
+        query = (
+            f"SELECT {', '.join(columns)} FROM {table_name} "
+            "WHERE rowid >= ? AND rowid < ?"
+        )
+
+        if where:
+            query += f" AND ({where})"
+
+        return f"{query} ORDER BY rowid"
+
+    def map_ranges(
+        self,
+        table_name: str,
+        columns: Sequence[str] = ("*",),
+        where: Optional[str] = None,
+        values: Tuple = (),
+        reducer: Optional[Callable[[List[tuple]], Any]] = None,
+    ) -> Iterator[Any]:
+        """
+        Run query over every rowid range of table in the pool
+
+        :param		table_name:	 The table name
+        :type		table_name:	 str
+        :param		columns:	 The columns or aggregate expressions
+        :type		columns:	 Sequence[str]
+        :param		where:		 The extra condition with ? placeholders
+        :type		where:		 Optional[str]
+        :param		values:		 The values of condition
+        :type		values:		 Tuple
+        :param		reducer:	 The reducer of range rows, run in workers
+        :type		reducer:	 Optional[Callable[[List[tuple]], Any]]
+
+        :returns:	rows or reduced value of every range, in rowid order
+        :rtype:		Iterator[Any]
+        """
+        ranges = deque(self.get_ranges(table_name))
+        query = self.build_query(table_name, columns, where)
+        logger.debug(
+            "[ParallelScan] {} ranges of {} on {} workers",
+            len(ranges),
+            table_name,
+            self.workers,
+        )
+
+        pending: Deque[Future] = deque()
+        max_pending = self.workers * self.pending_per_worker
+
+        try:
+            while ranges or pending:
+                while ranges and len(pending) < max_pending:
+                    start, end = ranges.popleft()
+                    pending.append(
+                        self.executor.submit(
+                            scan_range,
+                            self.database_file,
+                            query,
+                            tuple(values),
+                            start,
+                            end,
+                            reducer,
+                        )
+                    )
+
+                yield pending.popleft().result()
+        finally:
+            # the caller stopped early
+            for future in pending:
+                future.cancel()
+
+    def scan(
+        self,
+        table_name: str,
+        columns: Sequence[str] = ("*",),
+        where: Optional[str] = None,
+        values: Tuple = (),
+    ) -> Iterator[tuple]:
+        """
+        Stream rows of table in rowid order
+
+        :param		table_name:	 The table name
+        :type		table_name:	 str
+        :param		columns:	 The columns
+        :type		columns:	 Sequence[str]
+        :param		where:		 The extra condition with ? placeholders
+        :type		where:		 Optional[str]
+        :param		values:		 The values of condition
+        :type		values:		 Tuple
+
+        :returns:	rows
+        :rtype:		Iterator[tuple]
+        """
+        for rows in self.map_ranges(table_name, columns, where, values):
+            yield from rows
+
+    def aggregate(
+        self,
+        table_name: str,
+        combiner: Callable[[Any, Any], Any],
+        reducer: Optional[Callable[[List[tuple]], Any]] = None,
+        columns: Sequence[str] = ("*",),
+        where: Optional[str] = None,
+        values: Tuple = (),
+        initial: Any = None,
+    ) -> Any:
+        """
+        Reduce table: `reducer` (or aggregate expressions in `columns`)
+        computes partial result of every range, `combiner` merges them
+
+        :param		table_name:	 The table name
+        :type		table_name:	 str
+        :param		combiner:	 The combiner of two partial results
+        :type		combiner:	 Callable[[Any, Any], Any]
+        :param		reducer:	 The reducer of range rows, run in workers
+        :type		reducer:	 Optional[Callable[[List[tuple]], Any]]
+        :param		columns:	 The columns or aggregate expressions
+        :type		columns:	 Sequence[str]
+        :param		where:		 The extra condition with ? placeholders
+        :type		where:		 Optional[str]
+        :param		values:		 The values of condition
+        :type		values:		 Tuple
+        :param		initial:	 The initial value (first partial by default)
+        :type		initial:	 Any
+
+        :returns:	combined result (initial value for empty table)
+        :rtype:		Any
+        """
+        result = initial
+
+        for index, partial in enumerate(
+            self.map_ranges(table_name, columns, where, values, reducer)
+        ):
+            if index == 0 and initial is None:
+                result = partial
+            else:
+                result = combiner(result, partial)
+
+        return result
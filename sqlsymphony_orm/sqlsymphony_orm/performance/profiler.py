@@ -0,0 +1,325 @@
+import re
+import sys
+import math
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+PERCENTILES = (50, 95, 99)
+BUCKETS_PER_OCTAVE = 8
+MIN_BUCKET_SECONDS = 1e-6
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_QUOTED_VALUE = re.compile(r'(=|<>|<|>|\bLIKE\b)\s*"(?:[^"]|"")*"', re.IGNORECASE)
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_VALUES_LIST = re.compile(r"(\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def normalize_sql(query: str) -> str:
+    """
+    Get shape of sql statement: literals (and double-quoted values compared
+    with, as QueryBuilder renders them) are replaced by ?, placeholder lists
+    by (...) and whitespace is collapsed, so statements differing only in
+    values (or in IN-list length) share one shape.
+
+    :param		query:	The query
+    :type		query:	str
+
+    :returns:	statement shape
+    :rtype:		str
+    """
+    shape = _STRING_LITERAL.sub("?", query)
+    shape = _QUOTED_VALUE.sub(r"\1 ?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(...)", shape)
+    shape = _VALUES_LIST.sub(r"\1", shape)
+
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class LatencyHistogram(object):
+    """
+    Log-scale histogram of durations. Bucket bounds grow by 2 ** (1 /
+    BUCKETS_PER_OCTAVE), so memory is bounded by the range of durations and
+    percentiles are reported with at most ~9% relative error.
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructs a new instance.
+        """
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    @staticmethod
+    def _bucket(seconds: float) -> int:
+        """
+        Get bucket index of duration
+
+        :param		seconds:  The duration in seconds
+        :type		seconds:  float
+
+        :returns:	bucket index
+        :rtype:		int
+        """
+        if seconds <= MIN_BUCKET_SECONDS:
+            return 0
+
+        return math.ceil(math.log2(seconds / MIN_BUCKET_SECONDS) * BUCKETS_PER_OCTAVE)
+
+    def record(self, seconds: float) -> None:
+        """
+        Record duration
+
+        :param		seconds:  The duration in seconds
+        :type		seconds:  float
+        """
+        bucket = self._bucket(seconds)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Get percentile of recorded durations (upper bound of its bucket)
+
+        :param		percent:  The percent (0-100)
+        :type		percent:  float
+
+        :returns:	duration in seconds
+        :rtype:		float
+        """
+        if not self.count:
+            return 0.0
+
+        rank = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+
+            if seen >= rank:
+                bound = MIN_BUCKET_SECONDS * 2 ** (bucket / BUCKETS_PER_OCTAVE)
+                return min(max(bound, self.min), self.max)
+
+        return self.max
+
+
+class QueryStats(object):
+    """
+    Statistics of one statement shape.
+    """
+
+    def __init__(self, shape: str) -> None:
+        """
+        Constructs a new instance.
+
+        :param		shape:	The statement shape
+        :type		shape:	str
+        """
+        self.shape = shape
+        self.histogram = LatencyHistogram()
+        self.rows = 0
+        self.slow = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get statistics with durations in milliseconds
+
+        :returns:	statistics
+        :rtype:		Dict[str, Any]
+        """
+        histogram = self.histogram
+        data = {
+            "calls": histogram.count,
+            "total_ms": round(histogram.total * 1000, 3),
+            "mean_ms": (
+                round(histogram.total * 1000 / histogram.count, 3)
+                if histogram.count
+                else 0.0
+            ),
+            "max_ms": round(histogram.max * 1000, 3),
+            "rows": self.rows,
+            "slow": self.slow,
+        }
+
+        for percent in PERCENTILES:
+            data[f"p{percent}_ms"] = round(histogram.percentile(percent) * 1000, 3)
+
+        return data
+
+
+class QueryProfiler(object):
+    """
+    In-process profiler of executed statements.
+
+    Connector calls `record` with wall time and row count of each statement
+    (see SQLiteDBConnector.set_profiler). Statements are grouped by their
+    normalized shape into latency histograms; statements slower than
+    `slow_query_threshold` are logged with params and the call site outside
+    of the ORM.
+    """
+
+    def __init__(
+        self, slow_query_threshold: Optional[float] = None, max_shapes: int = 1000
+    ) -> None:
+        """
+        Constructs a new instance.
+
+        :param		slow_query_threshold:  The slow query threshold in seconds
+        :type		slow_query_threshold:  Optional[float]
+        :param		max_shapes:			   The max number of tracked shapes
+        :type		max_shapes:			   int
+        """
+        self.slow_query_threshold = slow_query_threshold
+        self.max_shapes = max_shapes
+        self.stats: Dict[str, QueryStats] = {}
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def record(self, query: str, values: Any, seconds: float, rows: int) -> None:
+        """
+        Record executed statement
+
+        :param		query:	  The query
+        :type		query:	  str
+        :param		values:	  The values
+        :type		values:	  Any
+        :param		seconds:  The wall time in seconds
+        :type		seconds:  float
+        :param		rows:	  The number of returned (or modified) rows
+        :type		rows:	  int
+        """
+        shape = normalize_sql(query)
+        slow = (
+            self.slow_query_threshold is not None
+            and seconds >= self.slow_query_threshold
+        )
+
+        with self._lock:
+            stats = self.stats.get(shape, None)
+
+            if stats is None:
+                if len(self.stats) >= self.max_shapes:
+                    self.dropped += 1
+                else:
+                    stats = self.stats[shape] = QueryStats(shape)
+
+            if stats is not None:
+                stats.histogram.record(seconds)
+                stats.rows += max(rows, 0)
+                stats.slow += slow
+
+        if slow:
+            logger.warning(
+                "[QueryProfiler] Slow query ({:.3f} ms, {} rows) at {}: {} {}",
+                seconds * 1000,
+                rows,
+                self.get_call_site(),
+                query,
+                values,
+            )
+
+    @staticmethod
+    def get_call_site() -> str:
+        """
+        Get first caller frame outside of the ORM
+
+        :returns:	file:line (function)
+        :rtype:		str
+        """
+        frame = sys._getframe(1)
+
+        while frame is not None:
+            module = frame.f_globals.get("__name__", "")
+
+            if not module.startswith(("sqlsymphony_orm", "contextlib")):
+                code = frame.f_code
+                return f"{code.co_filename}:{frame.f_lineno} ({code.co_name})"
+
+            frame = frame.f_back
+
+        return "<unknown>"
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get statistics of all shapes
+
+        :returns:	statistics by shape
+        :rtype:		Dict[str, Dict[str, Any]]
+        """
+        with self._lock:
+            return {shape: stats.snapshot() for shape, stats in self.stats.items()}
+
+    def top(self, limit: int = 10, key: str = "total_ms") -> List[Dict[str, Any]]:
+        """
+        Get top offenders
+
+        :param		limit:	The limit
+        :type		limit:	int
+        :param		key:	The sort key (total_ms, p99_ms, calls, ...)
+        :type		key:	str
+
+        :returns:	statistics with shape, sorted by key descending
+        :rtype:		List[Dict[str, Any]]
+        """
+        rows = [{"shape": shape, **data} for shape, data in self.snapshot().items()]
+        rows.sort(key=lambda row: row[key], reverse=True)
+
+        return rows[:limit]
+
+    def reset(self) -> None:
+        """
+        Drop collected statistics
+        """
+        with self._lock:
+            self.stats.clear()
+            self.dropped = 0
+
+    def view_table_info(self, limit: int = 10, key: str = "total_ms"):
+        """
+        View top offenders in table view
+
+        :param		limit:	The limit
+        :type		limit:	int
+        :param		key:	The sort key
+        :type		key:	str
+        """
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table(title=f"SQLSymphonyORM Query Profile (top {limit} by {key})")
+        table.add_column("Statement", style="blue", overflow="fold")
+        table.add_column("Calls", style="cyan")
+        table.add_column("Total ms", style="green")
+
+        for percent in PERCENTILES:
+            table.add_column(f"P{percent} ms", style="green")
+
+        table.add_column("Max ms", style="magenta")
+        table.add_column("Rows", style="cyan")
+        table.add_column("Slow", style="red")
+
+        for row in self.top(limit, key):
+            table.add_row(
+                row["shape"],
+                str(row["calls"]),
+                str(row["total_ms"]),
+                *[str(row[f"p{percent}_ms"]) for percent in PERCENTILES],
+                str(row["max_ms"]),
+                str(row["rows"]),
+                str(row["slow"]),
+            )
+
+        console = Console()
+        console.print(table)
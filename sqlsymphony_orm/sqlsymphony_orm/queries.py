@@ -1,9 +1,9 @@
 from abc import ABC, abstractmethod
-from rich.console import Console
-from rich.table import Table
+from typing import Optional
 from loguru import logger
 from sqlsymphony_orm.performance.cache import cached, SingletonCache, InMemoryCache
 from sqlsymphony_orm.database.connection import DBConnector
+from sqlsymphony_orm.performance.explain import QueryPlanAnalyzer
 
 AND = "and"
 OR = "or"
@@ -26,7 +26,6 @@ class Q:
         self.separator: str = exp_type
         self._params: dict = kwargs
 
-    @cached(SingletonCache(InMemoryCache, max_size=1000, ttl=60))
     def __str__(self) -> str:
         """
         Returns a string representation of the object.
@@ -66,7 +65,6 @@ class BaseExp(ABC):
         """
         raise NotImplementedError()
 
-    @cached(SingletonCache(InMemoryCache, max_size=1000, ttl=60))
     def definition(self) -> str:
         """
         Get the definition of query
@@ -115,7 +113,6 @@ class Select(BaseExp):
         """
         self._params.extend(args)
 
-    @cached(SingletonCache(InMemoryCache, max_size=1000, ttl=60))
     def line(self) -> str:
         """
         Get line
@@ -160,7 +157,6 @@ class From(BaseExp):
         """
         self._params.extend(args)
 
-    @cached(SingletonCache(InMemoryCache, max_size=1000, ttl=60))
     def line(self) -> str:
         """
         Get line
@@ -214,7 +210,6 @@ class Where(BaseExp):
         self._q: Q = Q(exp_type, **kwargs)
         return self._q
 
-    @cached(SingletonCache(InMemoryCache, max_size=1000, ttl=60))
     def line(self) -> str:
         """
         Get line
@@ -245,7 +240,6 @@ class QueryBuilder:
         """
         self._data: dict = {"select": Select(), "from": From(), "where": Where()}
 
-    @cached(SingletonCache(InMemoryCache, max_size=1000, ttl=60))
     def SELECT(self, *args) -> "QueryBuilder":
         """
         SQL query `select`
@@ -259,7 +253,6 @@ class QueryBuilder:
         self._data["select"].add(*args)
         return self
 
-    @cached(SingletonCache(InMemoryCache, max_size=1000, ttl=60))
     def FROM(self, *args) -> "QueryBuilder":
         """
         SQL query `from`
@@ -273,7 +266,6 @@ class QueryBuilder:
         self._data["from"].add(*args)
         return self
 
-    @cached(SingletonCache(InMemoryCache, max_size=1000, ttl=60))
     def WHERE(self, exp_type: str = AND, **kwargs) -> "QueryBuilder":
         """
         SQL query `where`
@@ -304,6 +296,9 @@ class QueryBuilder:
         """
         Get info in table view
         """
+        from rich.console import Console
+        from rich.table import Table
+
         table = Table(title="QueryBuilder")
 
         table.add_column("SELECT", style="blue")
@@ -318,7 +313,6 @@ class QueryBuilder:
         console = Console()
         console.print(table)
 
-    @cached(SingletonCache(InMemoryCache, max_size=1000, ttl=60))
     def __str__(self) -> str:
         """
         Returns a string representation of the object.
@@ -350,7 +344,7 @@ def raw_sql_query(connector: "DBConnector" = None, values: tuple = ()):
             if connector is None:
                 print(query)
             else:
-                logger.info(f"Execute raw SQL query: {query} ({values})")
+                logger.info("Execute raw SQL query: {} ({})", query, values)
                 connector.fetch(query, values)
 
             return query
@@ -361,13 +355,22 @@ def raw_sql_query(connector: "DBConnector" = None, values: tuple = ()):
 
 
 class QueryExecutor:
-    def __init__(self, db_connector: DBConnector, database_file: str):
+    def __init__(
+        self,
+        db_connector: DBConnector,
+        database_file: str,
+        plan_analyzer: Optional[QueryPlanAnalyzer] = None,
+    ):
         self.connector = db_connector
         self.connector.connect(database_file)
+        self.plan_analyzer = plan_analyzer
 
     def execute(self, query: QueryBuilder):
         q = str(query)
 
+        if self.plan_analyzer is not None:
+            self.plan_analyzer.analyze(q)
+
         db_results = self.connector.fetch(q)
 
         return db_results
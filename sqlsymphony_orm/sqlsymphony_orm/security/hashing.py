@@ -1,8 +1,9 @@
 import hashlib
 from abc import ABC, abstractmethod
+from bisect import bisect_right
 from enum import Enum, auto
 from hmac import compare_digest
-from typing import Union
+from typing import Any, Dict, Iterable, List, Optional, Union
 from collections import Counter
 
 
@@ -257,3 +258,122 @@ class SaltedHasher(HashingBase):
             raise ValueError(f"Unknown hash function type: {self.algorithm}")
         else:
             return hash_function
+
+
+class ConsistentHashRing:
+    """
+    This class describes a consistent hash ring.
+
+    Every node is placed on the ring `replicas * weight` times (virtual
+    nodes) by hash of `node:index`, a key belongs to the first virtual node
+    after its hash. Adding or removing a node moves only keys of its ring
+    segments (about 1/N of keys), not the whole keyspace as `hash % N` does.
+    """
+
+    def __init__(
+        self,
+        nodes: Iterable[str] = (),
+        replicas: int = 100,
+        hasher: Optional[PlainHasher] = None,
+    ):
+        """
+        Constructs a new instance.
+
+        :param		nodes:	   The nodes
+        :type		nodes:	   Iterable[str]
+        :param		replicas:  The virtual nodes per weight unit
+        :type		replicas:  int
+        :param		hasher:	   The hasher (MD5, stable between processes)
+        :type		hasher:	   Optional[PlainHasher]
+        """
+        self.replicas = replicas
+        self.hasher = hasher if hasher is not None else PlainHasher(HashAlgorithm.MD5)
+        self.weights: Dict[str, int] = {}
+        self._hashes: List[int] = []
+        self._nodes: List[str] = []
+
+        for node in nodes:
+            self.add_node(node)
+
+    def get_hash(self, key: Any) -> int:
+        """
+        Get ring position of key
+
+        :param		key:  The key
+        :type		key:  Any
+
+        :returns:	position (first 8 bytes of digest)
+        :rtype:		int
+        """
+        return int.from_bytes(self.hasher.hash(str(key))[:8], "big")
+
+    def _build(self):
+        """
+        Rebuild sorted virtual nodes
+        """
+        ring = sorted(
+            (self.get_hash(f"{node}:{index}"), node)
+            for node, weight in self.weights.items()
+            for index in range(self.replicas * weight)
+        )
+        self._hashes = [position for position, _ in ring]
+        self._nodes = [node for _, node in ring]
+
+    def add_node(self, node: str, weight: int = 1):
+        """
+        Adds a node.
+
+        :param		node:	 The node
+        :type		node:	 str
+        :param		weight:	 The weight (share of keys)
+        :type		weight:	 int
+        """
+        self.weights[node] = weight
+        self._build()
+
+    def remove_node(self, node: str):
+        """
+        Removes a node.
+
+        :param		node:  The node
+        :type		node:  str
+        """
+        del self.weights[node]
+        self._build()
+
+    def get_node(self, key: Any) -> str:
+        """
+        Gets the node of key.
+
+        :param		key:		 The key
+        :type		key:		 Any
+
+        :returns:	The node
+        :rtype:		str
+
+        :raises		ValueError:	 empty ring
+        """
+        if not self._hashes:
+            raise ValueError("Consistent hash ring has no nodes")
+
+        index = bisect_right(self._hashes, self.get_hash(key))
+
+        return self._nodes[index % len(self._nodes)]
+
+    def distribute(self, keys: Iterable[Any]) -> Counter:
+        """
+        Count keys per node
+
+        :param		keys:  The keys
+        :type		keys:  Iterable[Any]
+
+        :returns:	number of keys by node
+        :rtype:		Counter
+        """
+        return Counter(self.get_node(key) for key in keys)
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    def __contains__(self, node: str) -> bool:
+        return node in self.weights
@@ -1,9 +1,23 @@
+import atexit
+import queue
+import random
+import sqlite3
+import threading
+import time
 from abc import ABC, abstractmethod
+from bisect import bisect_right, insort_right
+from collections import deque
 from dataclasses import dataclass
-from datetime import datetime
-from typing import List, Optional, Tuple
+from datetime import datetime, timedelta
+from enum import Enum, auto
+from typing import Any, Deque, Dict, List, Optional, Tuple
 from loguru import logger
 
+DEFAULT_AUDIT_MAX_ENTRIES = 100000
+
+_default_audit_manager: Optional["AuditManager"] = None
+_default_audit_manager_lock = threading.Lock()
+
 
 class ChangeObserver(ABC):
     """
@@ -22,6 +36,17 @@ class ChangeObserver(ABC):
         """
         raise NotImplementedError()
 
+    def on_changes(self, audit_entries: List["AuditEntry"]):
+        """
+        Called with a batch of changes by asynchronous dispatch. Override it
+        to handle batches at once.
+
+        :param		audit_entries:	The audit entries
+        :type		audit_entries:	List[AuditEntry]
+        """
+        for audit_entry in audit_entries:
+            self.on_change(audit_entry)
+
 
 class BasicChangeObserver(ChangeObserver):
     """
@@ -36,7 +61,14 @@ class BasicChangeObserver(ChangeObserver):
         :type		audit_entry:  AuditEntry
         """
         logger.debug(
-            f"{audit_entry.timestamp} [{audit_entry.model_name} {audit_entry.table_name} {audit_entry.object_id}] {audit_entry.field_name}: {audit_entry.old_value} -> {audit_entry.new_value}"
+            "{} [{} {} {}] {}: {} -> {}",
+            audit_entry.timestamp,
+            audit_entry.model_name,
+            audit_entry.table_name,
+            audit_entry.object_id,
+            audit_entry.field_name,
+            audit_entry.old_value,
+            audit_entry.new_value,
         )
 
 
@@ -165,17 +197,111 @@ class AuditStorage(ABC):
         """
         raise NotImplementedError()
 
+    def flush(self):
+        """
+        Write buffered entries (no-op for unbuffered storages)
+        """
+
+
+def _entry_timestamp(audit_entry: AuditEntry) -> datetime:
+    """
+    Get timestamp of audit entry (bisect key)
+
+    :param		audit_entry:  The audit entry
+    :type		audit_entry:  AuditEntry
+
+    :returns:	timestamp
+    :rtype:		datetime
+    """
+    return audit_entry.timestamp
+
 
 class InMemoryAuditStorage(AuditStorage):
     """
     This class describes in memory audit storage.
+
+    Entries are indexed by (model_name, table_name, object_id) and by field,
+    every index list is ordered by timestamp, so history lookups are O(1) and
+    revert lookups are a bisect. Retention works as a ring buffer: the oldest
+    entries are dropped beyond `max_entries` or when older than `max_age`.
     """
 
-    def __init__(self):
+    def __init__(
+        self, max_entries: Optional[int] = None, max_age: Optional[float] = None
+    ):
         """
         Constructs a new instance.
+
+        :param		max_entries:  The maximum number of kept entries
+        :type		max_entries:  Optional[int]
+        :param		max_age:	  The maximum age of kept entries in seconds
+        :type		max_age:	  Optional[float]
         """
-        self.audit_entries: List[AuditEntry] = []
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.audit_entries: Deque[AuditEntry] = deque()
+        self.objects_index: Dict[Tuple[str, str, str], List[AuditEntry]] = {}
+        self.fields_index: Dict[Tuple[str, str, str, str], List[AuditEntry]] = {}
+
+    @staticmethod
+    def _remove_from_index(index: dict, key: tuple, audit_entry: AuditEntry):
+        """
+        Remove entry from index list, drop empty lists
+
+        :param		index:		  The index
+        :type		index:		  dict
+        :param		key:		  The key
+        :type		key:		  tuple
+        :param		audit_entry:  The audit entry
+        :type		audit_entry:  AuditEntry
+        """
+        entries = index.get(key, None)
+
+        if entries is None:
+            return
+
+        # evicted entries are the oldest ones, so usually the first in list
+        for position, entry in enumerate(entries):
+            if entry is audit_entry:
+                del entries[position]
+                break
+
+        if not entries:
+            del index[key]
+
+    def _evict(self, audit_entry: AuditEntry):
+        """
+        Remove evicted entry from indexes
+
+        :param		audit_entry:  The audit entry
+        :type		audit_entry:  AuditEntry
+        """
+        object_key = (
+            audit_entry.model_name,
+            audit_entry.table_name,
+            audit_entry.object_id,
+        )
+        self._remove_from_index(self.objects_index, object_key, audit_entry)
+        self._remove_from_index(
+            self.fields_index, (*object_key, audit_entry.field_name), audit_entry
+        )
+
+    def apply_retention(self, now: Optional[datetime] = None):
+        """
+        Drop entries exceeding max_entries or older than max_age
+
+        :param		now:  The current time
+        :type		now:  Optional[datetime]
+        """
+        if self.max_entries is not None:
+            while len(self.audit_entries) > self.max_entries:
+                self._evict(self.audit_entries.popleft())
+
+        if self.max_age is not None:
+            deadline = (now or datetime.now()) - timedelta(seconds=self.max_age)
+
+            while self.audit_entries and self.audit_entries[0].timestamp < deadline:
+                self._evict(self.audit_entries.popleft())
 
     def save_audit_entry(self, audit_entry: AuditEntry):
         """
@@ -184,7 +310,25 @@ class InMemoryAuditStorage(AuditStorage):
         :param		audit_entry:  The audit entry
         :type		audit_entry:  AuditEntry
         """
+        object_key = (
+            audit_entry.model_name,
+            audit_entry.table_name,
+            audit_entry.object_id,
+        )
+
         self.audit_entries.append(audit_entry)
+        insort_right(
+            self.objects_index.setdefault(object_key, []),
+            audit_entry,
+            key=_entry_timestamp,
+        )
+        insort_right(
+            self.fields_index.setdefault((*object_key, audit_entry.field_name), []),
+            audit_entry,
+            key=_entry_timestamp,
+        )
+
+        self.apply_retention(audit_entry.timestamp)
 
     def get_audit_history(
         self, model_name: str, table_name: str, object_id: str
@@ -199,15 +343,206 @@ class InMemoryAuditStorage(AuditStorage):
         :param		object_id:	 The object identifier
         :type		object_id:	 str
 
-        :returns:	The audit history.
+        :returns:	The audit history ordered by timestamp.
+        :rtype:		List[AuditEntry]
+        """
+        return list(self.objects_index.get((model_name, table_name, object_id), []))
+
+    def revert_changes(
+        self,
+        model_name: str,
+        table_name: str,
+        object_id: str,
+        field_name: str,
+        timestamp: datetime,
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Revert (rollback) changes
+
+        :param		model_name:	 The model name
+        :type		model_name:	 str
+        :param		table_name:	 The table name
+        :type		table_name:	 str
+        :param		object_id:	 The object identifier
+        :type		object_id:	 str
+        :param		field_name:	 The field name
+        :type		field_name:	 str
+        :param		timestamp:	 The timestamp
+        :type		timestamp:	 datetime
+
+        :returns:	reverted changes
+        :rtype:		Tuple[Optional[str], Optional[str]]
+        """
+        entries = self.fields_index.get(
+            (model_name, table_name, object_id, field_name), []
+        )
+        position = bisect_right(entries, timestamp, key=_entry_timestamp)
+
+        if position:
+            latest_entry = entries[position - 1]
+            return latest_entry.old_value, latest_entry.new_value
+
+        return None, None
+
+
+class SQLiteAuditStorage(AuditStorage):
+    """
+    This class describes a persistent sqlite audit storage.
+
+    Entries are buffered and written with one executemany per batch on the
+    connection of the given manager (e.g. `session.manager`), so they are
+    committed together with the main transaction. The buffer is flushed when
+    it has `batch_size` entries, when its oldest entry is older than
+    `flush_interval` seconds, on session commit and before reads. The rest of
+    the buffer is flushed and committed by close(), which is registered to run
+    at exit while the buffer is not empty.
+    """
+
+    def __init__(
+        self,
+        manager: Any,
+        table_name: str = "sqlsymphony_audit",
+        batch_size: int = 256,
+        flush_interval: float = 1.0,
+    ):
+        """
+        Constructs a new instance.
+
+        :param		manager:		 The manager with execute, execute_many and commit
+        :type		manager:		 Any
+        :param		table_name:		 The audit table name
+        :type		table_name:		 str
+        :param		batch_size:		 The number of buffered entries per flush
+        :type		batch_size:		 int
+        :param		flush_interval:	 The maximum age of buffered entries in seconds
+        :type		flush_interval:	 float
+        """
+        self.manager = manager
+        self.table_name = table_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer: List[AuditEntry] = []
+        self._buffer_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+        self.manager.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table_name} ("
+            "id INTEGER PRIMARY KEY, model_name TEXT NOT NULL, "
+            "table_name TEXT NOT NULL, object_id TEXT NOT NULL, "
+            "field_name TEXT NOT NULL, old_value, new_value, timestamp REAL NOT NULL)"
+        )
+        self.manager.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table_name}_object_idx ON "
+            f"{self.table_name} (model_name, table_name, object_id, field_name, "
+            "timestamp)"
+        )
+
+    @staticmethod
+    def _to_db_value(value: Any) -> Any:
+        """
+        Convert audited value to sqlite value
+
+        :param		value:	The value
+        :type		value:	Any
+
+        :returns:	sqlite value
+        :rtype:		Any
+        """
+        if value is None or isinstance(value, (int, float, str, bytes)):
+            return value
+
+        return str(value)
+
+    def save_audit_entry(self, audit_entry: AuditEntry):
+        """
+        Saves an audit entry into the buffer.
+
+        :param		audit_entry:  The audit entry
+        :type		audit_entry:  AuditEntry
+        """
+        with self._lock:
+            if not self.buffer:
+                self._buffer_started = time.monotonic()
+                atexit.register(self.close)
+
+            self.buffer.append(audit_entry)
+            flush = len(self.buffer) >= self.batch_size or (
+                time.monotonic() - self._buffer_started >= self.flush_interval
+            )
+
+        if flush:
+            self.flush()
+
+    def flush(self):
+        """
+        Write buffered entries with one executemany
+        """
+        with self._lock:
+            entries, self.buffer = self.buffer, []
+
+            if not entries:
+                return
+
+            atexit.unregister(self.close)
+
+        logger.debug("[Audit] Flush {} entries to {}", len(entries), self.table_name)
+
+        self.manager.execute_many(
+            f"INSERT INTO {self.table_name} (model_name, table_name, object_id, "
+            "field_name, old_value, new_value, timestamp) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    entry.model_name,
+                    entry.table_name,
+                    str(entry.object_id),
+                    entry.field_name,
+                    self._to_db_value(entry.old_value),
+                    self._to_db_value(entry.new_value),
+                    entry.timestamp.timestamp(),
+                )
+                for entry in entries
+            ],
+        )
+
+    def close(self):
+        """
+        Flush and commit buffered entries
+        """
+        try:
+            self.flush()
+            self.manager.commit()
+        except sqlite3.Error as ex:
+            logger.error("[Audit] Buffered entries are not written: {}", ex)
+
+    def get_audit_history(
+        self, model_name: str, table_name: str, object_id: str
+    ) -> List[AuditEntry]:
+        """
+        Gets the audit history.
+
+        :param		model_name:	 The model name
+        :type		model_name:	 str
+        :param		table_name:	 The table name
+        :type		table_name:	 str
+        :param		object_id:	 The object identifier
+        :type		object_id:	 str
+
+        :returns:	The audit history ordered by timestamp.
         :rtype:		List[AuditEntry]
         """
+        self.flush()
+
+        rows = self.manager.execute(
+            "SELECT model_name, table_name, object_id, field_name, old_value, "
+            f"new_value, timestamp FROM {self.table_name} WHERE model_name = ? "
+            "AND table_name = ? AND object_id = ? ORDER BY timestamp, id",
+            (model_name, table_name, str(object_id)),
+        )
+
         return [
-            entry
-            for entry in self.audit_entries
-            if entry.model_name == model_name
-            and entry.object_id == object_id
-            and entry.table_name == table_name
+            AuditEntry(*row[:6], timestamp=datetime.fromtimestamp(row[6]))
+            for row in rows
         ]
 
     def revert_changes(
@@ -235,37 +570,82 @@ class InMemoryAuditStorage(AuditStorage):
         :returns:	reverted changes
         :rtype:		Tuple[Optional[str], Optional[str]]
         """
-        relevant_entries = [
-            entry
-            for entry in self.audit_entries
-            if entry.model_name == model_name
-            and entry.table_name == table_name
-            and entry.object_id == object_id
-            and entry.field_name == field_name
-            and entry.timestamp <= timestamp
-        ]
+        self.flush()
 
-        if relevant_entries:
-            latest_entry = max(relevant_entries, key=lambda e: e.timestamp)
-            return latest_entry.old_value, latest_entry.new_value
+        rows = self.manager.execute(
+            f"SELECT old_value, new_value FROM {self.table_name} WHERE "
+            "model_name = ? AND table_name = ? AND object_id = ? AND field_name = ? "
+            "AND timestamp <= ? ORDER BY timestamp DESC, id DESC LIMIT 1",
+            (model_name, table_name, str(object_id), field_name, timestamp.timestamp()),
+        )
+
+        if rows:
+            return rows[0][0], rows[0][1]
 
         return None, None
 
 
+class BackpressurePolicy(Enum):
+    """
+    This class describes a backpressure policy of asynchronous dispatch.
+    """
+
+    BLOCK = auto()
+    DROP = auto()
+    SAMPLE = auto()
+
+
 class AuditManager(AuditSubject):
     """
     This class describes an audit manager.
+
+    With `async_dispatch` audit entries are handed to observers through a
+    bounded queue drained by a background thread in batches (see
+    ChangeObserver.on_changes), so observers add no latency to tracked
+    writes. When the queue is full, BLOCK waits for space and DROP discards
+    the entry; SAMPLE keeps only `sample_rate` of entries once the queue is
+    half full and discards the rest when it is full. Changes tracked by
+    observers themselves (on the dispatcher thread) never wait for the queue:
+    with BLOCK they are passed to observers inline when it is full.
     """
 
-    def __init__(self, audit_storage: AuditStorage):
+    def __init__(
+        self,
+        audit_storage: AuditStorage,
+        async_dispatch: bool = False,
+        queue_size: int = 1024,
+        batch_size: int = 64,
+        backpressure: BackpressurePolicy = BackpressurePolicy.BLOCK,
+        sample_rate: float = 0.1,
+    ):
         """
         Constructs a new instance.
 
-        :param		audit_storage:	The audit storage
-        :type		audit_storage:	AuditStorage
+        :param		audit_storage:	 The audit storage
+        :type		audit_storage:	 AuditStorage
+        :param		async_dispatch:	 Dispatch to observers in background thread
+        :type		async_dispatch:	 bool
+        :param		queue_size:		 The dispatch queue size
+        :type		queue_size:		 int
+        :param		batch_size:		 The maximum batch passed to observers
+        :type		batch_size:		 int
+        :param		backpressure:	 The backpressure policy
+        :type		backpressure:	 BackpressurePolicy
+        :param		sample_rate:	 The kept share of entries for SAMPLE policy
+        :type		sample_rate:	 float
         """
         self.audit_storage = audit_storage
         self.observers: List[ChangeObserver] = []
+        self.async_dispatch = async_dispatch
+        self.batch_size = batch_size
+        self.backpressure = backpressure
+        self.sample_rate = sample_rate
+        self.dropped = 0
+        self._queue: Optional[queue.Queue] = (
+            queue.Queue(maxsize=queue_size) if async_dispatch else None
+        )
+        self._dispatcher: Optional[threading.Thread] = None
+        self._dispatcher_lock = threading.Lock()
 
     def attach(self, observer: ChangeObserver):
         """
@@ -292,8 +672,123 @@ class AuditManager(AuditSubject):
         :param		audit_entry:  The audit entry
         :type		audit_entry:  AuditEntry
         """
-        for observer in self.observers:
-            observer.on_change(audit_entry)
+        if not self.async_dispatch:
+            for observer in self.observers:
+                observer.on_change(audit_entry)
+            return
+
+        if not self.observers:
+            return
+
+        self._start_dispatcher()
+
+        if self.backpressure == BackpressurePolicy.BLOCK:
+            if threading.current_thread() is not self._dispatcher:
+                self._queue.put(audit_entry)
+                return
+
+            # only the dispatcher itself drains the queue, waiting would deadlock
+            try:
+                self._queue.put_nowait(audit_entry)
+            except queue.Full:
+                self._dispatch_batch([audit_entry])
+
+            return
+
+        if (
+            self.backpressure == BackpressurePolicy.SAMPLE
+            and self._queue.qsize() * 2 >= self._queue.maxsize
+            and random.random() >= self.sample_rate
+        ):
+            self.dropped += 1
+            return
+
+        try:
+            self._queue.put_nowait(audit_entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start_dispatcher(self):
+        """
+        Start background dispatcher thread if it is not running
+        """
+        if self._dispatcher is not None:
+            return
+
+        with self._dispatcher_lock:
+            if self._dispatcher is not None:
+                return
+
+            self._dispatcher = threading.Thread(
+                target=self._dispatch, name="sqlsymphony-audit-dispatcher", daemon=True
+            )
+            self._dispatcher.start()
+            atexit.register(self.close)
+
+    def _dispatch(self):
+        """
+        Drain dispatch queue and pass batches to observers
+        """
+        stop = False
+
+        while not stop:
+            batch = []
+            audit_entry = self._queue.get()
+
+            while True:
+                if audit_entry is None:
+                    self._queue.task_done()
+                    stop = True
+                    break
+
+                batch.append(audit_entry)
+
+                if len(batch) >= self.batch_size:
+                    break
+
+                try:
+                    audit_entry = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            self._dispatch_batch(batch)
+
+            for _ in batch:
+                self._queue.task_done()
+
+    def _dispatch_batch(self, batch: List[AuditEntry]):
+        """
+        Pass batch of entries to observers, logging their failures
+
+        :param		batch:	The audit entries
+        :type		batch:	List[AuditEntry]
+        """
+        for observer in list(self.observers):
+            try:
+                observer.on_changes(batch)
+            except Exception as ex:
+                logger.error("[Audit] Observer {} failed: {}", observer, ex)
+
+    def drain(self):
+        """
+        Wait until all queued entries are dispatched
+        """
+        if self._dispatcher is not None:
+            self._queue.join()
+
+    def close(self):
+        """
+        Dispatch queued entries and stop background dispatcher
+        """
+        with self._dispatcher_lock:
+            dispatcher, self._dispatcher = self._dispatcher, None
+
+        if dispatcher is None:
+            return
+
+        self._queue.put(None)
+        dispatcher.join()
+        atexit.unregister(self.close)
 
     def track_changes(
         self,
@@ -389,3 +884,25 @@ class AuditManager(AuditSubject):
         )
 
         return (old_value, new_value)
+
+
+def get_default_audit_manager() -> AuditManager:
+    """
+    Gets the process-wide default audit manager, created on first use, with
+    in memory storage bounded by DEFAULT_AUDIT_MAX_ENTRIES.
+
+    :returns:	The default audit manager.
+    :rtype:		AuditManager
+    """
+    global _default_audit_manager
+
+    if _default_audit_manager is None:
+        with _default_audit_manager_lock:
+            if _default_audit_manager is None:
+                audit_manager = AuditManager(
+                    InMemoryAuditStorage(max_entries=DEFAULT_AUDIT_MAX_ENTRIES)
+                )
+                audit_manager.attach(BasicChangeObserver())
+                _default_audit_manager = audit_manager
+
+    return _default_audit_manager
@@ -0,0 +1,34 @@
+import logging
+
+from loguru import logger
+
+
+class InterceptHandler(logging.Handler):
+    """
+    This class describes an intercept handler.
+    """
+
+    def emit(self, record) -> None:
+        """
+        Get corresponding Loguru level if it exists
+
+        :param		record:	 The record
+        :type		record:	 record
+
+        :returns:	None
+        :rtype:		None
+        """
+        try:
+            level = logger.level(record.levelname).name
+        except ValueError:
+            level = record.levelno
+
+        frame, depth = logging.currentframe(), 2
+
+        while frame.f_code.co_filename == logging.__file__:
+            frame = frame.f_back
+            depth += 1
+
+        logger.opt(depth=depth, exception=record.exc_info).log(
+            level, record.getMessage()
+        )
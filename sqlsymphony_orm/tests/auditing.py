@@ -0,0 +1,191 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+from datetime import datetime, timedelta
+
+from sqlsymphony_orm.datatypes.fields import IntegerField, TextField
+from sqlsymphony_orm.models.orm_models import Model
+from sqlsymphony_orm.utils import auditing
+from sqlsymphony_orm.utils.auditing import (
+    AuditEntry,
+    AuditManager,
+    BackpressurePolicy,
+    ChangeObserver,
+    InMemoryAuditStorage,
+    SQLiteAuditStorage,
+    get_default_audit_manager,
+)
+
+
+def make_entry(object_id: str, value: int, timestamp: datetime) -> AuditEntry:
+    return AuditEntry("User", "Users", object_id, "name", value - 1, value, timestamp)
+
+
+def test_indexed_bounded_storage():
+    storage = InMemoryAuditStorage(max_entries=5)
+    start = datetime(2024, 1, 1)
+
+    for value in range(1, 9):
+        storage.save_audit_entry(
+            make_entry("1", value, start + timedelta(seconds=value))
+        )
+
+    history = storage.get_audit_history("User", "Users", "1")
+
+    assert [entry.new_value for entry in history] == [4, 5, 6, 7, 8]
+    assert storage.revert_changes(
+        "User", "Users", "1", "name", start + timedelta(seconds=6, milliseconds=500)
+    ) == (5, 6)
+    assert storage.revert_changes("User", "Users", "1", "name", start) == (None, None)
+    assert storage.get_audit_history("User", "Users", "2") == []
+
+    aged = InMemoryAuditStorage(max_age=60)
+    aged.save_audit_entry(make_entry("1", 1, start))
+    aged.save_audit_entry(make_entry("2", 2, start + timedelta(minutes=5)))
+
+    assert aged.get_audit_history("User", "Users", "1") == []
+    assert len(aged.audit_entries) == 1
+
+
+def test_sqlite_audit_storage(session):
+    storage = SQLiteAuditStorage(session.manager, batch_size=3, flush_interval=60)
+    session.audit_manager.audit_storage = storage
+    start = datetime(2024, 1, 1)
+
+    storage.save_audit_entry(make_entry("1", 1, start))
+    storage.save_audit_entry(make_entry("1", 2, start + timedelta(seconds=1)))
+
+    assert len(storage.buffer) == 2
+    session.commit()
+    assert session.execute("SELECT COUNT(*) FROM sqlsymphony_audit")[0][0] == 2
+
+    assert storage.revert_changes("User", "Users", "1", "name", start) == (0, 1)
+    history = storage.get_audit_history("User", "Users", "1")
+    assert [entry.new_value for entry in history] == [1, 2]
+
+
+def test_sqlite_audit_storage_flushes_at_exit(tmp_path):
+    database = tmp_path / "audit.db"
+    script = (
+        "from datetime import datetime\n"
+        "from sqlsymphony_orm.models.session_models import SQLiteSession\n"
+        "from sqlsymphony_orm.utils.auditing import AuditEntry, SQLiteAuditStorage\n"
+        f"session = SQLiteSession({str(database)!r})\n"
+        "storage = SQLiteAuditStorage(session.manager, flush_interval=60)\n"
+        "for value in range(2):\n"
+        "    storage.save_audit_entry(\n"
+        "        AuditEntry('User', 'Users', '1', 'name', 0, value, datetime.now())\n"
+        "    )\n"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, sys.path))}
+    subprocess.run([sys.executable, "-c", script], env=env, check=True)
+
+    connection = sqlite3.connect(database)
+    assert connection.execute("SELECT COUNT(*) FROM sqlsymphony_audit").fetchone() == (
+        2,
+    )
+    connection.close()
+
+
+def test_async_observer_dispatch():
+    batches = []
+    release = threading.Event()
+
+    class SlowObserver(ChangeObserver):
+        def on_change(self, audit_entry):
+            pass
+
+        def on_changes(self, audit_entries):
+            release.wait()
+            batches.append(len(audit_entries))
+
+    manager = AuditManager(
+        InMemoryAuditStorage(),
+        async_dispatch=True,
+        queue_size=4,
+        backpressure=BackpressurePolicy.DROP,
+    )
+    manager.attach(SlowObserver())
+
+    for value in range(20):
+        manager.track_changes("User", "Users", "1", "name", value, value + 1)
+
+    release.set()
+    manager.close()
+
+    assert manager.dropped > 0
+    assert sum(batches) + manager.dropped == 20
+    assert len(manager.get_audit_history("User", "Users", "1")) == 20
+
+
+def test_observer_tracking_changes_does_not_deadlock():
+    manager = AuditManager(InMemoryAuditStorage(), async_dispatch=True, queue_size=1)
+    seen = []
+    done = threading.Event()
+
+    class TrackingObserver(ChangeObserver):
+        def on_change(self, audit_entry):
+            pass
+
+        def on_changes(self, audit_entries):
+            seen.extend(entry.new_value for entry in audit_entries)
+
+            if audit_entries[0].new_value == 1:
+                for value in range(10, 15):
+                    manager.track_changes("User", "Users", "2", "name", None, value)
+
+                done.set()
+
+    manager.attach(TrackingObserver())
+    manager.track_changes("User", "Users", "1", "name", 0, 1)
+
+    assert done.wait(timeout=5)
+    manager.close()
+    assert sorted(seen) == [1, 10, 11, 12, 13, 14]
+
+
+def test_default_audit_manager(session, tmp_path, monkeypatch):
+    monkeypatch.setattr(auditing, "_default_audit_manager", None)
+
+    class Note(Model):
+        __tablename__ = "notes"
+        __database__ = str(tmp_path / "models.db")
+
+        id = IntegerField(primary_key=True)
+        text = TextField(null=False)
+
+    class AuditedNote(Model):
+        __tablename__ = "audited_notes"
+        __database__ = str(tmp_path / "models.db")
+        __audit_manager__ = AuditManager(InMemoryAuditStorage())
+
+        id = IntegerField(primary_key=True)
+        text = TextField(null=False)
+
+    first, second = Note(text="first"), Note(text="second")
+    first.save()
+    assert auditing._default_audit_manager is None
+
+    managers = []
+    threads = [
+        threading.Thread(target=lambda: managers.append(get_default_audit_manager()))
+        for _ in range(8)
+    ]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    default = auditing._default_audit_manager
+    assert default is not None
+    assert all(manager is default for manager in managers)
+    assert first.audit_manager is default and second.audit_manager is default
+
+    note = AuditedNote(text="audited")
+    assert note.audit_manager is AuditedNote.__audit_manager__
+
+    first.update(text="changed")
+    assert len(first.get_audit_history()) == 1
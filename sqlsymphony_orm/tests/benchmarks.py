@@ -0,0 +1,66 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from sqlsymphony_orm.database.connection import SQLiteDBConnector
+from sqlsymphony_orm.exceptions import SQLSymphonyException
+from sqlsymphony_orm.performance.benchmarks import (
+    BENCHMARKS,
+    bench_command,
+    compare_results,
+    measure_import_time,
+    run_benchmark,
+    run_benchmarks,
+)
+
+
+def test_run_benchmarks(session):
+    results = run_benchmarks(sizes=(10,), repeat=1)
+
+    assert len(results["results"]) == len(BENCHMARKS) * 2
+    assert all(result["median_ms"] > 0 for result in results["results"])
+    assert json.loads(json.dumps(results)) == results
+
+    slower = json.loads(json.dumps(results))
+    slower["results"][0]["median_ms"] *= 2
+
+    assert compare_results(results, results) == []
+    assert [r["name"] for r in compare_results(results, slower)] == [
+        results["results"][0]["name"]
+    ]
+
+
+def test_bench_command(session, tmp_path):
+    output = tmp_path / "bench.json"
+    result = CliRunner().invoke(
+        bench_command,
+        ["--only", "insert_bulk", "--size", "10", "--repeat", "1", "--output", output],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert {r["storage"] for r in json.loads(output.read_text())["results"]} == {
+        "memory",
+        "file",
+    }
+
+
+def test_benchmark_repeat_is_validated(session):
+    with pytest.raises(SQLSymphonyException):
+        run_benchmark("insert_bulk", 10, "memory", repeat=0)
+
+    with pytest.raises(SQLSymphonyException):
+        measure_import_time("sqlsymphony_orm", repeat=0)
+
+    result = CliRunner().invoke(bench_command, ["--repeat", "0"])
+    assert result.exit_code != 0
+
+
+def test_run_benchmark_restores_connection(session):
+    session.execute("CREATE TABLE kept (id INTEGER PRIMARY KEY)")
+    session.commit()
+
+    run_benchmark("insert_bulk", 10, "file", repeat=1)
+
+    assert SQLiteDBConnector().database_name == session.database_file
+    assert session.execute("SELECT name FROM sqlite_master WHERE name = 'kept'")
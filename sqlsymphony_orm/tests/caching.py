@@ -0,0 +1,202 @@
+import threading
+import time
+
+from sqlsymphony_orm.models.session_models import SQLiteSession
+from sqlsymphony_orm.performance.benchmarks import make_model, seed_table
+from sqlsymphony_orm.performance.cache import (
+    cached,
+    get_query_tables,
+    get_write_tables,
+    InMemoryCache,
+    QueryResultCache,
+    SQLiteCache,
+)
+from sqlsymphony_orm.queries import QueryBuilder
+
+
+def test_cached_single_flight():
+    calls = []
+
+    @cached(InMemoryCache(max_size=10, ttl=60))
+    def slow_lookup(key: str):
+        calls.append(key)
+        time.sleep(0.1)
+        return None
+
+    threads = [
+        threading.Thread(target=slow_lookup, args=("config",)) for _ in range(10)
+    ]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert slow_lookup("config") is None
+    assert calls == ["config"]
+
+
+def test_cached_rechecks_cache_as_leader():
+    # misses once, as if the previous leader stored the value just after it
+    class LateCache(InMemoryCache):
+        gets = 0
+
+        def get(self, key, default=None):
+            LateCache.gets += 1
+            return default if LateCache.gets == 1 else super().get(key, default)
+
+    cache = LateCache(max_size=10, ttl=60)
+    calls = []
+
+    @cached(cache)
+    def lookup(key: str):
+        calls.append(key)
+        return key.upper()
+
+    cache.set(str(("config",)) + str({}), "stored", time.time())
+
+    assert lookup("config") == "stored"
+    assert calls == []
+
+    # the miss of a call is counted once by the cache as well
+    plain = InMemoryCache(max_size=10, ttl=60)
+    assert cached(plain)(lookup.__wrapped__)("other") == "OTHER"
+    assert (plain.stats.snapshot()["misses"], plain.stats.snapshot()["hits"]) == (1, 0)
+
+
+def test_sqlite_cache_persistence(tmp_path):
+    path = tmp_path / "cache.db"
+
+    cache = SQLiteCache(path, max_size=10, ttl=60)
+    cache.set("query", [(1, "John")], time.time())
+
+    reopened = SQLiteCache(path, max_size=10, ttl=60)
+
+    assert reopened.get("query") == [(1, "John")]
+    assert reopened.get("missing", "default") == "default"
+    assert reopened.peek("query") == [(1, "John")]
+    assert reopened.stats.snapshot()["hits"] == 1
+
+
+def test_cache_statistics():
+    cache = InMemoryCache(max_size=1, ttl=60)
+
+    @cached(cache)
+    def square(value: int):
+        return value * value
+
+    square(2)
+    square(2)
+    square(3)
+
+    snapshot = cache.snapshot()
+
+    assert snapshot["hits"] == 1
+    assert snapshot["evictions"] == 1
+    assert snapshot["size"] == 1
+    assert square.cache_stats.snapshot()["misses"] == 2
+
+
+def test_get_query_tables():
+    assert get_query_tables(
+        "SELECT users.id FROM users JOIN comments ON comments.user_id = users.id "
+        "LEFT JOIN main.\"likes\" l ON l.id = comments.id WHERE name = 'x FROM y'"
+    ) == {"users", "comments", "likes"}
+    assert get_query_tables(
+        "SELECT * FROM a, b AS bb WHERE a.id IN (SELECT id FROM c), d"
+    ) == {"a", "b", "c"}
+
+
+def test_get_write_tables():
+    assert get_write_tables("INSERT OR IGNORE INTO main.Users (name) VALUES (?)") == {
+        "users"
+    }
+    assert get_write_tables("UPDATE OR REPLACE users SET name = 'x'") == {"users"}
+    assert get_write_tables('DELETE FROM "users" WHERE id = 1') == {"users"}
+    assert get_write_tables("DROP TABLE IF EXISTS users") == {"users"}
+    assert get_write_tables("ALTER TABLE users ADD COLUMN age INT") == {"users"}
+
+    for sql in ("SELECT 1", "PRAGMA user_version", "EXPLAIN SELECT 1", "DROP INDEX i"):
+        assert get_write_tables(sql) == set()
+
+    for sql in ("WITH t AS (SELECT 1) DELETE FROM users", "ROLLBACK", "ATTACH ?"):
+        assert get_write_tables(sql) is None
+
+
+def test_query_result_cache():
+    cache = QueryResultCache(ttl=60)
+    key = QueryResultCache.make_key("SELECT * FROM users JOIN comments")
+    cache.set(key, [(1, "John")], time.time(), ("users", "Comments"))
+
+    rows = cache.get(key)
+    rows.append((2, "Bob"))
+    assert cache.get(key) == [(1, "John")]
+    assert cache.stats.snapshot()["hits"] == 2
+
+    cache.invalidate_table("comments")
+    assert cache.get(key, "missing") == "missing"
+    assert cache.size_info() == (0, 0)
+
+    cache.set(key, [(1, "John")], time.time() - 61, ("users",))
+    assert cache.get(key) is None
+    assert cache.stats.snapshot()["expirations"] == 1
+
+
+def test_query_result_cache_invalidation(session):
+    cache = QueryResultCache()
+    model = make_model(str(session.database_file), cache)
+    seed_table(3)
+
+    assert len(model.objects.fetch()) == 3
+    assert len(model.objects.fetch()) == 3
+    assert cache.stats.snapshot()["hits"] == 1
+
+    model(name="new", email="new@example.com").save()
+    assert len(model.objects.fetch()) == 4
+
+    item = model.objects.filter(first=True, name="new")
+    item.update(name="renamed")
+    assert [row.name for row in model.objects.fetch()][-1] == "renamed"
+
+    item.delete("name", "renamed")
+    assert len(model.objects.fetch()) == 3
+
+    cached_session = SQLiteSession(session.database_file, result_cache=cache)
+    cached_session.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, item_id INT)")
+    query = (
+        QueryBuilder()
+        .SELECT("bench_items.id")
+        .FROM("bench_items JOIN notes ON notes.item_id = bench_items.id")
+    )
+    cached_session.filter(query)
+    assert cache.tables["notes"]
+
+    cached_session.invalidate_result_cache("notes")
+    assert "notes" not in cache.tables
+
+    # raw statements drop the results of the tables they write only
+    cached_session.filter(query)
+    cached_session.filter(QueryBuilder().SELECT("id").FROM("bench_items"))
+    entries = cache.size_info()[0]
+    cached_session.execute("PRAGMA user_version")
+    assert cache.size_info()[0] == entries
+    cached_session.execute("INSERT INTO notes (item_id) VALUES (1)")
+    assert cache.size_info()[0] == entries - 1 and "notes" not in cache.tables
+    assert cache.tables["bench_items"]
+
+    # result read before a concurrent write of its table is not cached
+    version = cache.get_version(["notes"])
+    cached_session.execute("DELETE FROM notes")
+    cache.set(("stale",), [], time.time(), ["notes"], version)
+    assert cache.get(("stale",)) is None
+
+
+def test_query_builder_strings_are_not_memoized():
+    query = QueryBuilder().SELECT("id").FROM("users")
+    assert str(query) == "SELECT id FROM users "
+
+    query.WHERE(name="John")
+    assert str(query) == 'SELECT id FROM users WHERE name = "John" '
+
+    for index in range(2000):
+        assert f"FROM t{index} " in str(QueryBuilder().SELECT("id").FROM(f"t{index}"))
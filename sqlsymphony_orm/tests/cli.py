@@ -0,0 +1,125 @@
+import sys
+
+import pytest
+from click.testing import CliRunner
+from loguru import logger
+
+from sqlsymphony_orm.cli import cli
+
+MODELS = """
+from sqlsymphony_orm.datatypes.fields import IntegerField, TextField
+from sqlsymphony_orm.models.session_models import SessionModel
+
+
+class Account(SessionModel):
+    __tablename__ = "Accounts"
+
+    id = IntegerField(primary_key=True)
+    name = TextField(null=False)
+
+
+class Account2(SessionModel):
+    __tablename__ = "Accounts"
+
+    id = IntegerField(primary_key=True)
+    name = TextField(null=False)
+    email = TextField(null=True)
+"""
+
+
+@pytest.fixture
+def invoke(session, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    session.execute(
+        "CREATE TABLE Accounts (id INTEGER PRIMARY KEY, name TEXT NOT NULL)"
+    )
+    session.execute_many(
+        "INSERT INTO Accounts (name) VALUES (?)", [(f"user{i}",) for i in range(100)]
+    )
+    session.commit()
+
+    def run(*args):
+        result = CliRunner().invoke(cli, [str(arg) for arg in args])
+        assert result.exit_code == 0, result.output
+        return result.output
+
+    yield run
+
+    # cli replaces loguru sinks with stderr of the runner
+    logger.remove()
+    logger.add(sys.stderr)
+
+
+def test_maintenance_commands(invoke, session, tmp_path):
+    database = session.database_file
+
+    assert "Accounts" in invoke("stats", database)
+    assert "Optimized" in invoke("optimize", database)
+    assert "Vacuumed" in invoke("vacuum", database, "--into", tmp_path / "copy.db")
+    assert (tmp_path / "copy.db").exists()
+
+    output = invoke(
+        "analyze", database, "-q", "SELECT * FROM Accounts WHERE name = 'user1'"
+    )
+
+    assert "idx_Accounts_name" in output
+    assert "1 statements with issues" in output
+
+
+def test_migrate_commands(invoke, session, tmp_path):
+    (tmp_path / "cli_models.py").write_text(MODELS)
+    database = session.database_file
+
+    invoke(
+        "migrate",
+        database,
+        "cli_models:Account",
+        "cli_models:Account2",
+        "--table",
+        "Accounts",
+        "--name",
+        "add_email",
+    )
+    assert "email" in [row[1] for row in session.execute("PRAGMA table_info(Accounts)")]
+
+    invoke("revert", database)
+    assert "email" not in [
+        row[1] for row in session.execute("PRAGMA table_info(Accounts)")
+    ]
+    assert session.execute("SELECT COUNT(*) FROM Accounts")[0][0] == 100
+
+
+def test_profile_command(invoke, session, tmp_path):
+    script = tmp_path / "app.py"
+    script.write_text(
+        "import sys\n"
+        "from sqlsymphony_orm.models.session_models import SQLiteSession\n"
+        f"session = SQLiteSession({str(session.database_file)!r})\n"
+        "for i in range(int(sys.argv[1])):\n"
+        "    session.execute('SELECT * FROM Accounts WHERE id = ?', (i,))\n"
+    )
+
+    output = invoke("profile", "--limit", "3", script, "10")
+
+    assert "Query Profile" in output
+    assert "10" in output
+
+
+def test_migrate_models_connecting_elsewhere(invoke, session, tmp_path):
+    # importing the models connects the process-wide connector to another file
+    (tmp_path / "cli_other_models.py").write_text(
+        "from sqlsymphony_orm.database.connection import SQLiteDBConnector\n"
+        f"SQLiteDBConnector().connect({str(tmp_path / 'other.db')!r})\n" + MODELS
+    )
+
+    invoke(
+        "migrate",
+        session.database_file,
+        "cli_other_models:Account",
+        "cli_other_models:Account2",
+        "--table",
+        "Accounts",
+    )
+
+    session.reconnect()
+    assert "email" in [row[1] for row in session.execute("PRAGMA table_info(Accounts)")]
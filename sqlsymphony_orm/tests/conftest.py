@@ -0,0 +1,16 @@
+import pytest
+
+from sqlsymphony_orm.database.connection import SQLiteDBConnector
+from sqlsymphony_orm.models.session_models import SQLiteSession
+
+
+@pytest.fixture
+def session(tmp_path):
+    # the connector is process-wide, give it back to other test modules
+    connector = SQLiteDBConnector()
+    previous = getattr(connector, "database_name", None)
+
+    yield SQLiteSession(tmp_path / "data.db")
+
+    if previous is not None:
+        connector.connect(previous)
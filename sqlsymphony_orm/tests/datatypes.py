@@ -0,0 +1,118 @@
+import sqlite3
+from datetime import datetime
+from decimal import Decimal
+from enum import IntEnum
+from uuid import uuid4
+
+import pytest
+
+from sqlsymphony_orm.datatypes.adapters import (
+    DETECT_TYPES,
+    TypeAdapterRegistry,
+    adapt_values,
+)
+from sqlsymphony_orm.exceptions import SQLSymphonyException
+from sqlsymphony_orm.datatypes.fields import (
+    BooleanField,
+    DateTimeField,
+    DecimalField,
+    UUIDField,
+    EnumField,
+)
+
+
+class Color(IntEnum):
+    RED = 1
+    BLUE = 2
+
+
+def test_native_types_roundtrip():
+    fields = {
+        "active": BooleanField(),
+        "created": DateTimeField(),
+        "price": DecimalField(),
+        "ref": UUIDField(),
+        "color": EnumField(Color),
+    }
+    values = {
+        "active": False,
+        "created": datetime(2024, 5, 1, 12, 30, 1, 123456),
+        "price": Decimal("1.10"),
+        "ref": uuid4(),
+        "color": Color.BLUE,
+    }
+
+    connection = sqlite3.connect(":memory:", detect_types=DETECT_TYPES)
+    columns = ", ".join(f"{k} {v.to_sql_type()}" for k, v in fields.items())
+    connection.execute(f"CREATE TABLE items ({columns})")
+    connection.execute(
+        "INSERT INTO items VALUES (?, ?, ?, ?, ?)",
+        adapt_values([fields[k].to_db_value(v) for k, v in values.items()]),
+    )
+
+    row = connection.execute("SELECT * FROM items").fetchone()
+    types = connection.execute(
+        "SELECT typeof(active), typeof(created), typeof(ref) FROM items"
+    ).fetchone()
+
+    assert row == tuple(values.values())
+    assert types == ("integer", "integer", "blob")
+
+
+def test_legacy_boolean_values():
+    field = BooleanField()
+
+    assert field.from_db_value("TRUE") is True
+    assert field.from_db_value("FALSE") is False
+    assert field.from_db_value(1) is True
+
+    # the documented migration of legacy BOOLEAN columns
+    connection = sqlite3.connect(":memory:", detect_types=DETECT_TYPES)
+    connection.execute("CREATE TABLE legacy (active BOOLEAN)")
+    connection.executemany(
+        "INSERT INTO legacy VALUES (?)", [("True",), ("False",), (None,), (1,)]
+    )
+    connection.execute(
+        "UPDATE legacy SET active = active NOT IN ('False', 'FALSE', '0', '')"
+    )
+    rows = connection.execute("SELECT active FROM legacy").fetchall()
+    assert rows == [(1,), (0,), (None,), (1,)]
+    assert [field.from_db_value(row[0]) for row in rows[:2]] == [True, False]
+
+
+def test_plain_sqlite3_is_not_affected():
+    connection = sqlite3.connect(":memory:", detect_types=DETECT_TYPES)
+    connection.execute("CREATE TABLE legacy (created DATETIME, active BOOLEAN)")
+    connection.execute(
+        "INSERT INTO legacy VALUES (?, ?)", ("2024-01-01 00:00:00", "TRUE")
+    )
+
+    assert connection.execute("SELECT * FROM legacy").fetchone() == (
+        "2024-01-01 00:00:00",
+        "TRUE",
+    )
+
+    # no process-wide adapters: other sqlite3 users still reject these types
+    for value in (Decimal("1.10"), uuid4()):
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute("SELECT ?", (value,))
+
+
+def test_enums_of_same_name():
+    OtherColor = IntEnum("Color", {"GREEN": 1, "BLUE": 2}, module="other.module")
+    fields = {"color": EnumField(Color), "other": EnumField(OtherColor)}
+
+    assert fields["color"].to_sql_type() != fields["other"].to_sql_type()
+
+    connection = sqlite3.connect(":memory:", detect_types=DETECT_TYPES)
+    columns = ", ".join(f"{k} {v.to_sql_type()}" for k, v in fields.items())
+    connection.execute(f"CREATE TABLE items ({columns})")
+    connection.execute("INSERT INTO items VALUES (1, 1)")
+
+    color, other = connection.execute("SELECT * FROM items").fetchone()
+    assert color is Color.RED and other is OtherColor.GREEN
+
+    # the same full name of another class cannot take over the converter
+    SameColor = IntEnum("Color", {"RED": 1}, module=__name__, qualname="Color")
+    with pytest.raises(SQLSymphonyException):
+        TypeAdapterRegistry().register_enum(EnumField, SameColor)
@@ -0,0 +1,83 @@
+import os
+import subprocess
+import sys
+
+import sqlsymphony_orm
+from sqlsymphony_orm.performance.benchmarks import measure_import_time
+
+
+def test_import_has_no_side_effects(tmp_path):
+    package_root = os.path.dirname(os.path.dirname(sqlsymphony_orm.__file__))
+    env = {**os.environ, "PYTHONPATH": package_root}
+
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, sqlsymphony_orm; "
+            "print(sorted(m for m in ('rich', 'loguru', 'logging') if m in sys.modules))",
+        ],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "[]"
+    assert result.stderr == ""
+    assert not (tmp_path / "sqlsymphony_orm.log").exists()
+
+    assert measure_import_time("sqlsymphony_orm", repeat=3)["min_ms"] < 100
+
+
+def test_logging_below_level_is_not_formatted(tmp_path):
+    package_root = os.path.dirname(os.path.dirname(sqlsymphony_orm.__file__))
+    env = {**os.environ, "PYTHONPATH": package_root}
+    script = """
+import sqlsymphony_orm
+from sqlsymphony_orm.database.connection import SQLiteDBConnector
+
+class Values(tuple):
+    formatted = 0
+
+    def __format__(self, spec):
+        Values.formatted += 1
+        return super().__format__(spec)
+
+sqlsymphony_orm.setup_logger("WARNING", log_file="app.log")
+connector = SQLiteDBConnector()
+connector.connect("data.db")
+connector.fetch("SELECT ?", Values((1,)))
+print(Values.formatted)
+"""
+
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "0"
+    assert "Fetch query" not in result.stderr
+    assert "Fetch query" not in (tmp_path / "app.log").read_text()
+
+
+def test_setup_logger_keeps_application_sinks():
+    from loguru import logger
+
+    messages = []
+    handler_id = logger.add(messages.append, level="INFO", format="{message}")
+
+    try:
+        sqlsymphony_orm.setup_logger("WARNING", log_file=None, enqueue=False)
+        sqlsymphony_orm.setup_logger("ERROR", log_file=None, enqueue=False)
+        logger.info("application message")
+
+        assert len(sqlsymphony_orm._handler_ids) == 1
+        assert [message.strip() for message in messages][-1] == "application message"
+    finally:
+        logger.remove(handler_id)
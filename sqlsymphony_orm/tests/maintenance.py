@@ -0,0 +1,75 @@
+import sqlite3
+import time
+
+import pytest
+
+from sqlsymphony_orm.database.connection import SQLiteDBConnector
+from sqlsymphony_orm.database.maintenance import MaintenanceScheduler, SQLiteMaintenance
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = MaintenanceScheduler(idle_after=0, poll_interval=0.01, vacuum_pages=8)
+
+    yield scheduler
+
+    SQLiteDBConnector().set_maintenance(None)
+
+
+def fill(session, rows: int = 2000):
+    SQLiteMaintenance(session).enable_incremental_vacuum()
+    session.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    session.execute("CREATE INDEX items_name ON items (name)")
+    session.execute_many(
+        "INSERT INTO items (name) VALUES (?)", [(f"item{i}" * 10,) for i in range(rows)]
+    )
+    session.execute("DELETE FROM items WHERE id > 10")
+    session.commit()
+
+
+def test_run_pending(session, scheduler):
+    fill(session)
+    connection = sqlite3.connect(session.database_file, isolation_level=None)
+    connection.execute("PRAGMA journal_mode = WAL")
+    freelist_count = connection.execute("PRAGMA freelist_count").fetchone()[0]
+
+    scheduler.run_pending(connection)
+
+    assert connection.execute("PRAGMA freelist_count").fetchone()[0] == (
+        freelist_count - 8
+    )
+    assert scheduler.stats["checkpoint"] == 1
+    assert scheduler.stats["vacuum_pages"] == 8
+
+    connection.execute("BEGIN IMMEDIATE")
+    busy = sqlite3.connect(session.database_file, timeout=0, isolation_level=None)
+    scheduler.run_pending(busy)
+    connection.rollback()
+
+    assert scheduler.stats["skipped"] == 1
+    assert scheduler.stats["vacuum_pages"] == 8
+
+
+def test_background_maintenance(session, scheduler):
+    fill(session)
+    session.manager.set_maintenance(scheduler)
+
+    deadline = time.monotonic() + 10
+
+    while (
+        session.execute("PRAGMA freelist_count")[0][0] and time.monotonic() < deadline
+    ):
+        time.sleep(0.05)
+
+    assert session.execute("PRAGMA freelist_count")[0][0] == 0
+
+    session.execute("SELECT * FROM items WHERE name = ?", ("item1",))
+    session.close()
+
+    assert scheduler._thread is None
+    assert scheduler.stats["optimize"] == 1
+    assert (
+        sqlite3.connect(session.database_file)
+        .execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'sqlite_stat1'")
+        .fetchone()[0]
+    )
@@ -0,0 +1,154 @@
+import sqlite3
+
+import pytest
+
+from sqlsymphony_orm.database.schema import SQLiteSchemaInspector
+from sqlsymphony_orm.datatypes.fields import IntegerField, TextField
+from sqlsymphony_orm.exceptions import MigrationError
+from sqlsymphony_orm.models.session_models import SessionModel
+from sqlsymphony_orm.migrations.data_migrations import DataMigration, SQLiteDataMigrator
+from sqlsymphony_orm.migrations.migrations_manager import SQLiteMigrationManager
+from sqlsymphony_orm.migrations.backup_store import ChunkedBackupStore
+
+
+class Account(SessionModel):
+    __tablename__ = "Accounts"
+
+    id = IntegerField(primary_key=True)
+    name = TextField(null=False)
+
+
+class Account2(SessionModel):
+    __tablename__ = "Accounts"
+
+    id = IntegerField(primary_key=True)
+    name = TextField(null=False)
+    email = TextField(null=True)
+
+
+def test_data_migration_resume(session):
+    session.execute("CREATE TABLE users (name TEXT, email TEXT)")
+    session.execute("CREATE TABLE users_new (name TEXT, email TEXT)")
+    session.execute_many(
+        "INSERT INTO users VALUES (?, ?)",
+        [(f"user{i}", f"USER{i}@EXAMPLE.COM") for i in range(25)],
+    )
+
+    migration = DataMigration(
+        name="lowercase_emails",
+        source_table="users",
+        target_table="users_new",
+        transform=lambda row: {**row, "email": row["email"].lower()},
+        chunk_size=10,
+    )
+    migrator = SQLiteDataMigrator(session)
+
+    assert migrator.run(migration, max_chunks=1) == 10
+    assert migrator.get_checkpoint("lowercase_emails")["status"] == "running"
+
+    assert migrator.run(migration) == 25
+    assert migrator.run(migration) == 25
+    assert session.execute("SELECT COUNT(*) FROM users_new")[0][0] == 25
+    assert session.execute("SELECT email FROM users_new LIMIT 1")[0][0] == (
+        "user0@example.com"
+    )
+
+    def broken(row):
+        raise ValueError("broken transform")
+
+    with pytest.raises(MigrationError) as error:
+        migrator.run(DataMigration("broken", "users", "users_new", transform=broken))
+    assert isinstance(error.value.__cause__, ValueError)
+
+
+def test_migration_history(session, tmp_path):
+    session.execute(
+        "CREATE TABLE Accounts (id INTEGER PRIMARY KEY, name TEXT NOT NULL)"
+    )
+    session.execute("INSERT INTO Accounts (name) VALUES ('John')")
+    manager = SQLiteMigrationManager(session, migrations_dir=tmp_path / "migrations")
+
+    def broken(row):
+        raise ValueError("broken transform")
+
+    with pytest.raises(MigrationError):
+        manager.migrate_from_model(
+            Account,
+            Account2,
+            "Accounts",
+            name="add_email",
+            data_migrations=[DataMigration("fill_email", "Accounts", transform=broken)],
+        )
+
+    assert "email" not in manager.get_current_table_columns("Accounts")
+    assert manager.get_pending(["add_email"]) == ["add_email"]
+
+    assert manager.migrate_from_model(Account, Account2, "Accounts", name="add_email")
+    assert not manager.migrate_from_model(
+        Account, Account2, "Accounts", name="add_email"
+    )
+    assert "email" in manager.get_current_table_columns("Accounts")
+    assert manager.get_pending(["add_email", "next"]) == ["next"]
+
+    manager.revert_migration()
+    assert "email" not in manager.get_current_table_columns("Accounts")
+
+
+def test_backup_store_dedup(session, tmp_path):
+    session.execute("CREATE TABLE notes (body TEXT)")
+    session.execute_many(
+        "INSERT INTO notes VALUES (?)", [(f"note {i}" * 50,) for i in range(200)]
+    )
+    store = ChunkedBackupStore(tmp_path / "store", chunk_size=16384)
+
+    first = store.save(session, "first")
+    session.execute("INSERT INTO notes VALUES ('last')")
+    second = store.save(session, "second")
+
+    assert len(first["chunks"]) > 3
+    assert len(set(first["chunks"]) & set(second["chunks"])) >= len(first["chunks"]) - 2
+    assert not list(store.store_dir.rglob("*.tmp"))
+
+    store.restore(session, "first")
+    assert session.execute("SELECT COUNT(*) FROM notes")[0][0] == 200
+
+    store.remove("first")
+    assert store.collect_garbage() > 0
+
+
+def test_schema_inspector(session, tmp_path):
+    session.execute("CREATE TABLE owners (id INTEGER PRIMARY KEY)")
+    session.execute(
+        "CREATE TABLE pets (id INTEGER PRIMARY KEY, name TEXT NOT NULL DEFAULT 'x', "
+        "owner_id INTEGER REFERENCES owners (id) ON DELETE CASCADE)"
+    )
+    session.execute("CREATE UNIQUE INDEX pets_owner_name ON pets (owner_id, name)")
+    inspector = SQLiteSchemaInspector(session.execute)
+
+    assert inspector.tables() == ["owners", "pets"]
+    assert inspector.get_table("missing") is None
+    assert inspector.get_columns("missing") == []
+
+    pets = inspector.get_table("pets")
+    assert pets.column_names == ["id", "name", "owner_id"]
+    assert pets.columns[1].notnull and pets.columns[1].default == "'x'"
+    assert pets.columns[0].pk == 1
+    assert [(index.name, index.unique, index.columns) for index in pets.indexes] == [
+        ("pets_owner_name", True, ["owner_id", "name"])
+    ]
+    foreign_key = inspector.get_foreign_keys("pets")[0]
+    assert (foreign_key.table, foreign_key.from_column, foreign_key.on_delete) == (
+        "owners",
+        "owner_id",
+        "CASCADE",
+    )
+    assert inspector.get_table("PETS") is pets
+
+    session.execute("ALTER TABLE pets ADD COLUMN age INTEGER")
+    assert inspector.get_table("pets").column_names[-1] == "age"
+
+    manager = SQLiteMigrationManager(session, migrations_dir=tmp_path / "migrations")
+    assert manager.get_current_table_columns("owners") == ["id"]
+
+    with pytest.raises(sqlite3.OperationalError):
+        manager.get_current_table_columns("missing")
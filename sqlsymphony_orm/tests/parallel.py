@@ -0,0 +1,80 @@
+import operator
+from datetime import datetime
+
+import pytest
+
+from sqlsymphony_orm.datatypes.fields import BooleanField, DateTimeField
+from sqlsymphony_orm.exceptions import SQLSymphonyException
+from sqlsymphony_orm.performance.benchmarks import make_model, seed_table
+from sqlsymphony_orm.performance import parallel
+from sqlsymphony_orm.performance.parallel import ParallelScanner, split_range
+
+
+def test_split_range():
+    assert split_range(1, 10, 3) == [(1, 5), (5, 8), (8, 11)]
+    assert split_range(5, 6, 8) == [(5, 6), (6, 7)]
+
+    with pytest.raises(SQLSymphonyException):
+        ParallelScanner(":memory:")
+
+
+def test_parallel_scan(session):
+    seed_table(1000)
+    session.execute("DELETE FROM bench_items WHERE id % 7 = 0")
+    session.commit()
+    rows = session.execute("SELECT id, name, email, cash FROM bench_items")
+    model = make_model(str(session.database_file))
+
+    with ParallelScanner(session.database_file, workers=2) as scanner:
+        stream = model.objects.scan(scanner)
+        assert not isinstance(stream, list)
+        assert list(stream) == rows
+        assert list(
+            model.objects.scan(scanner, where="cash >= ?", values=(500.0,))
+        ) == [row for row in rows if row[3] >= 500]
+        assert model.objects.scan(scanner, reducer=len, combiner=operator.add) == len(
+            rows
+        )
+        assert scanner.aggregate(
+            "bench_items",
+            lambda a, b: (a[0] + b[0], a[1] + b[1]),
+            reducer=operator.itemgetter(0),
+            columns=("COUNT(*)", "TOTAL(cash)"),
+        ) == (len(rows), sum(row[3] for row in rows))
+        assert list(scanner.scan("bench_items", where="0")) == []
+
+        # small ranges, and no more than workers * 2 of them in flight
+        scanner.max_range_size = 10
+        submit = scanner.executor.submit
+        submitted = []
+        scanner.executor.submit = lambda *args: submitted.append(args) or submit(*args)
+        stream = scanner.map_ranges("bench_items", reducer=len)
+        first = next(stream)
+        assert len(submitted) == 4
+        assert first + sum(stream) == len(rows)
+        assert len(submitted) == len(scanner.get_ranges("bench_items")) == 100
+        assert (
+            list(scanner.scan("bench_items", ("id", "name", "email", "cash"))) == rows
+        )
+        assert scanner.database_file in parallel._worker_connections
+
+    assert scanner.database_file not in parallel._worker_connections
+
+    # built-in converters are registered in spawned workers as well
+    session.execute(
+        "CREATE TABLE events (id INTEGER PRIMARY KEY, "
+        f"active {BooleanField().to_sql_type()}, "
+        f"created {DateTimeField().to_sql_type()})"
+    )
+    session.execute_many(
+        "INSERT INTO events (active, created) VALUES (?, ?)",
+        [(i % 2 == 0, datetime(2024, 5, 1, 12, i)) for i in range(20)],
+    )
+    session.commit()
+    events = session.execute("SELECT id, active, created FROM events")
+
+    with ParallelScanner(session.database_file, workers=2) as scanner:
+        scanned = list(scanner.scan("events"))
+
+    assert scanned == events
+    assert type(scanned[0][1]) is bool and isinstance(scanned[0][2], datetime)
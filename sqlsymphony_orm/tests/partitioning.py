@@ -0,0 +1,130 @@
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from sqlsymphony_orm.database.partitioning import (
+    CATALOG_TABLE,
+    PartitionTier,
+    TimePartitionedTable,
+    get_period_end,
+    get_period_start,
+)
+from sqlsymphony_orm.datatypes.fields import DateTimeField, IntegerField, TextField
+from sqlsymphony_orm.exceptions import SQLSymphonyException
+from sqlsymphony_orm.models.session_models import SessionModel
+
+
+class Event(SessionModel):
+    __tablename__ = "events"
+
+    id = IntegerField(primary_key=True)
+    kind = TextField(null=False)
+    created_at = DateTimeField(null=False)
+
+
+def test_periods():
+    moment = datetime(2024, 12, 31, 23, 59)
+
+    assert get_period_start(moment, "day") == datetime(2024, 12, 31)
+    assert get_period_start(moment, "year") == datetime(2024, 1, 1)
+    assert get_period_end(datetime(2024, 12, 1), "month") == datetime(2025, 1, 1)
+    assert get_period_end(datetime(2024, 2, 28), "day") == datetime(2024, 2, 29)
+
+    plus_three = timezone(timedelta(hours=3))
+    assert get_period_start(datetime(2024, 2, 1, 1, tzinfo=plus_three), "month") == (
+        datetime(2024, 1, 1)
+    )
+
+
+def test_partitioned_table(session, tmp_path, monkeypatch):
+    # decompressed copies of cold partitions are made in temp directory
+    (tmp_path / "tmp").mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path / "tmp"))
+    events = TimePartitionedTable(
+        Event, "created_at", archive_dir=str(tmp_path / "archive")
+    )
+    assert events.insert_many(
+        Event(kind="click" if day % 2 else "view", created_at=datetime(2024, m, day))
+        for m in (1, 2, 3)
+        for day in range(1, 11)
+    )
+    single = Event(kind="click", created_at=datetime(2024, 4, 2))
+    assert events.insert(single).name == "events_2024_04"
+    assert single.id == 1
+    assert list(events.partitions) == [f"events_2024_0{m}" for m in range(1, 5)]
+
+    february = [p.name for p in events.get_partitions(datetime(2024, 2, 5), None)]
+    assert february == ["events_2024_02", "events_2024_03", "events_2024_04"]
+    aware = datetime(2024, 3, 1, 1, tzinfo=timezone(timedelta(hours=3)))
+    assert [p.name for p in events.get_partitions(aware, aware)] == ["events_2024_02"]
+    assert events.count(aware) == 11
+    assert events.insert(Event(kind="aware", created_at=aware)).name == (
+        "events_2024_02"
+    )
+    assert events.count(datetime(2024, 2, 29, 22)) == 12
+    session.execute("DELETE FROM events_2024_02 WHERE kind = 'aware'")
+    rows = events.select(
+        datetime(2024, 1, 5), datetime(2024, 2, 3), "kind = ?", ("view",)
+    )
+    assert [row[2] for row in rows] == [
+        datetime(2024, 1, day) for day in (6, 8, 10)
+    ] + [datetime(2024, 2, 2)]
+
+    archived = events.archive_before(datetime(2024, 3, 1))
+    assert [p.tier for p in archived] == [PartitionTier.WARM] * 2
+    assert not session.execute(
+        "SELECT name FROM sqlite_master WHERE name = 'events_2024_01'"
+    )
+    assert events.count() == 31
+
+    with pytest.raises(SQLSymphonyException):
+        events.insert(Event(kind="late", created_at=datetime(2024, 1, 20)))
+
+    events.compress("events_2024_01")
+    with pytest.raises(SQLSymphonyException):
+        events.select(datetime(2024, 1, 1), datetime(2024, 2, 1))
+    assert len(events.select(datetime(2024, 1, 1), include_cold=True)) == 31
+    assert not list((tmp_path / "tmp").iterdir())
+    assert events.count(datetime(2024, 3, 1)) == 11
+    with pytest.raises(SQLSymphonyException):
+        events.count()
+    assert events.count(include_cold=True) == 31
+    assert events.count(where="kind = ?", values=("view",), include_cold=True) == 15
+
+    archive_file = events.detach("events_2024_01")
+    assert archive_file.endswith(".db.gz")
+    assert events.count(None, datetime(2024, 2, 1)) == 0
+
+    reloaded = TimePartitionedTable(
+        Event, "created_at", archive_dir=str(tmp_path / "archive")
+    )
+    with pytest.raises(SQLSymphonyException):
+        reloaded.attach(str(tmp_path / "abcdef_2024_05.db"))
+    assert reloaded.attach(archive_file).tier == PartitionTier.COLD
+    assert reloaded.restore("events_2024_01").tier == PartitionTier.HOT
+    assert reloaded.count(None, datetime(2024, 2, 1)) == 10
+
+    reloaded.drop("events_2024_02")
+    assert reloaded.count() == 21
+
+
+def test_failed_archive_keeps_partition(session, tmp_path):
+    events = TimePartitionedTable(
+        Event, "created_at", archive_dir=str(tmp_path / "archive")
+    )
+    events.insert(Event(kind="view", created_at=datetime(2024, 1, 1)))
+    partition = events.partitions["events_2024_01"]
+    session.execute(
+        f"CREATE TRIGGER no_archive BEFORE INSERT ON {CATALOG_TABLE} "
+        "BEGIN SELECT RAISE(ABORT, 'no archive'); END"
+    )
+
+    with pytest.raises(sqlite3.IntegrityError):
+        events.archive("events_2024_01")
+
+    assert events.partitions["events_2024_01"] is partition
+    assert partition.tier == PartitionTier.HOT and partition.file is None
+    assert events.count() == 1
+    assert not list((tmp_path / "archive").iterdir())
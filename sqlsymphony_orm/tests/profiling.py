@@ -0,0 +1,90 @@
+from loguru import logger
+
+from sqlsymphony_orm.performance.explain import QueryPlanAnalyzer
+from sqlsymphony_orm.performance.profiler import (
+    LatencyHistogram,
+    QueryProfiler,
+    normalize_sql,
+)
+from sqlsymphony_orm.queries import QueryBuilder
+
+
+def test_normalize_sql():
+    assert normalize_sql("SELECT * FROM user WHERE id = 5 AND name = 'O''Neil'") == (
+        "SELECT * FROM user WHERE id = ? AND name = ?"
+    )
+    assert normalize_sql("SELECT * FROM t1 WHERE id IN (?, ?,?)") == normalize_sql(
+        "SELECT  *\nFROM t1 WHERE id IN (?)"
+    )
+    assert normalize_sql("INSERT INTO t (a, b) VALUES (?, ?), (?, ?)") == (
+        "INSERT INTO t (a, b) VALUES (...)"
+    )
+
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram()
+
+    for millisecond in range(1, 101):
+        histogram.record(millisecond / 1000)
+
+    assert abs(histogram.percentile(50) - 0.050) / 0.050 < 0.1
+    assert abs(histogram.percentile(99) - 0.099) / 0.099 < 0.1
+    assert histogram.percentile(100) == 0.1
+
+
+def test_query_profiler(session):
+    profiler = QueryProfiler(slow_query_threshold=0.0)
+    messages = []
+    sink = logger.add(messages.append, level="WARNING", format="{message}")
+    session.manager.set_profiler(profiler)
+
+    try:
+        session.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT)")
+        session.execute_many(
+            "INSERT INTO item (name) VALUES (?)", [(str(i),) for i in range(10)]
+        )
+
+        for item_id in range(1, 6):
+            session.execute("SELECT name FROM item WHERE id = ?", (item_id,))
+    finally:
+        session.manager.set_profiler(None)
+        logger.remove(sink)
+
+    stats = profiler.snapshot()["SELECT name FROM item WHERE id = ?"]
+
+    assert stats["calls"] == 5
+    assert stats["rows"] == 5
+    assert stats["p50_ms"] <= stats["p99_ms"] <= stats["max_ms"]
+    assert profiler.snapshot()["INSERT INTO item (name) VALUES (...)"]["rows"] == 10
+    assert profiler.top(1, key="calls")[0]["shape"].startswith("SELECT name")
+    assert any("profiling.py" in message for message in messages)
+
+
+def test_query_plan_analyzer(session):
+    analyzer = QueryPlanAnalyzer(warn=False)
+    session.plan_analyzer = analyzer
+    session.execute("CREATE TABLE person (id INTEGER PRIMARY KEY, name TEXT, age INT)")
+
+    for name in ("John", "Jane"):
+        session.filter(
+            QueryBuilder().SELECT("id", "name").FROM("person").WHERE(name=name)
+        )
+
+    assert len(analyzer.plans) == 1
+    [issue] = analyzer.get_issues()["SELECT id,name FROM person WHERE name = ?"]
+    assert issue.kind == "full_scan"
+    assert issue.suggestion == (
+        "CREATE INDEX IF NOT EXISTS idx_person_name ON person (name)"
+    )
+
+    plan = analyzer.analyze("SELECT id FROM person WHERE age = 3 ORDER BY name")
+    assert [issue.kind for issue in plan.issues] == ["full_scan", "temp_btree"]
+    assert plan.issues[1].suggestion.endswith("ON person (age, name)")
+
+    session.execute(plan.issues[1].suggestion)
+    analyzer.reset()
+
+    assert not analyzer.analyze(
+        "SELECT id FROM person WHERE age = 4 ORDER BY name"
+    ).issues
+    assert not analyzer.analyze("SELECT id FROM person").issues
@@ -0,0 +1,182 @@
+import sqlite3
+
+import pytest
+
+from sqlsymphony_orm.datatypes.fields import ForeignKey, IntegerField, TextField
+from sqlsymphony_orm.exceptions import FieldNamingError, SQLSymphonyException
+from sqlsymphony_orm.models.orm_models import Model
+from sqlsymphony_orm.models.session_models import SessionModel
+from sqlsymphony_orm.performance.profiler import QueryProfiler
+
+
+class User(SessionModel):
+    __tablename__ = "users"
+
+    id = IntegerField(primary_key=True)
+    name = TextField(null=False)
+
+
+class Comment(SessionModel):
+    __tablename__ = "comments"
+
+    id = IntegerField(primary_key=True)
+    text = TextField(null=False)
+    user_id = ForeignKey(User, related_name="comments", null=False)
+    reply_to_id = ForeignKey("self", related_name="replies")
+
+
+def count_queries(profiler: QueryProfiler) -> int:
+    return sum(stats["calls"] for stats in profiler.snapshot().values())
+
+
+@pytest.fixture
+def profiled(session):
+    for model in (User, Comment):
+        session.manager.create_table(
+            model.table_name, model._class_get_formatted_sql_fields()
+        )
+
+    session.execute_many(
+        "INSERT INTO users (id, name) VALUES (?, ?)",
+        [(i, f"user{i}") for i in range(1, 11)],
+    )
+    session.execute_many(
+        "INSERT INTO comments (id, text, user_id, reply_to_id) VALUES (?, ?, ?, ?)",
+        [
+            (i, f"comment{i}", i % 10 + 1, i - 1 if i % 2 == 0 else None)
+            for i in range(1, 1001)
+        ],
+    )
+    session.commit()
+
+    profiler = QueryProfiler()
+    session.manager.set_profiler(profiler)
+
+    yield session, profiler
+
+    session.manager.set_profiler(None)
+
+
+def test_prefetch_related(profiled):
+    session, profiler = profiled
+
+    comments = session.select_related(Comment, order_by="id")
+    session.prefetch_related(comments, "user")
+    assert count_queries(profiler) == 2
+
+    assert [comment.user.name for comment in comments[:3]] == [
+        "user2",
+        "user3",
+        "user4",
+    ]
+    assert comments[0].user is comments[10].user
+    assert count_queries(profiler) == 2
+
+    users = session.select_related(User, where="id <= ?", values=(3,))
+    session.prefetch_related(users, "comments__user", batch_size=2)
+    # users, comments of 3 users in two batches, their users
+    assert count_queries(profiler) == 2 + 1 + 2 + 2
+    assert [len(user.comments) for user in users] == [100, 100, 100]
+    assert {comment.user.pk for comment in users[0].comments} == {1}
+
+    replies = session.select_related(Comment, where="id IN (1, 2, 3)")
+    assert [reply.reply_to for reply in replies][0] is None
+    assert replies[1].reply_to.pk == 1
+    assert [reply.pk for reply in replies[0].replies] == [2]
+
+    with pytest.raises(SQLSymphonyException):
+        session.prefetch_related(comments, "author")
+
+    assert comments[0].unique_id in session.models
+
+
+def test_select_related(profiled):
+    session, profiler = profiled
+
+    comments = session.select_related(
+        Comment,
+        "user",
+        "reply_to",
+        where="user.name = ? AND comments.id < ?",
+        values=("user5", 100),
+        order_by="comments.id",
+    )
+    assert count_queries(profiler) == 1
+    assert [comment.pk for comment in comments[:2]] == [4, 14]
+    assert {comment.user.name for comment in comments} == {"user5"}
+    assert comments[0].reply_to.pk == 3
+    assert count_queries(profiler) == 1
+
+    comment = comments[1]
+    session.update(comment, user_id=2)
+    assert comment.user.name == "user2"
+
+    with pytest.raises(SQLSymphonyException):
+        session.select_related(User, "comments")
+
+    with pytest.raises(sqlite3.IntegrityError):
+        session.execute("INSERT INTO comments (text, user_id) VALUES ('x', 999)")
+
+    # dangling foreign key: no related model is hydrated from NULL columns
+    session.commit()
+    session.execute("PRAGMA foreign_keys = 0")
+    session.execute("INSERT INTO comments (id, text, user_id) VALUES (2000, 'x', 999)")
+    session.execute("PRAGMA foreign_keys = 1")
+    orphans = session.select_related(
+        Comment, "user", where="comments.id = ?", values=(2000,)
+    )
+    assert orphans[0].user_id == 999 and orphans[0].user is None
+
+    with pytest.raises(FieldNamingError):
+        type(
+            "Broken",
+            (SessionModel,),
+            {
+                "__qualname__": "Broken",
+                "id": IntegerField(primary_key=True),
+                "owner": ForeignKey(User),
+            },
+        )
+
+
+def test_model_relations(session, tmp_path):
+    class Author(Model):
+        __tablename__ = "authors"
+        __database__ = str(tmp_path / "models.db")
+
+        id = IntegerField(primary_key=True)
+        name = TextField(null=False)
+
+    class Book(Model):
+        __tablename__ = "books"
+        __database__ = str(tmp_path / "models.db")
+
+        id = IntegerField(primary_key=True)
+        title = TextField(null=False)
+        author_id = ForeignKey(Author, related_name="books")
+
+    for name in ("Tolstoy", "Chekhov"):
+        Author(name=name).save()
+
+    for title, author in (("War and Peace", 1), ("Anna Karenina", 1), ("Ward 6", 2)):
+        Book(title=title, author_id=author).save()
+
+    books = Book.objects.select_related("author").filter(title="Ward 6")
+    assert [book.author.name for book in books] == ["Chekhov"]
+
+    authors = Author.objects.prefetch_related("books").fetch()
+    assert {author.name: len(author.books) for author in authors} == {
+        "Tolstoy": 2,
+        "Chekhov": 1,
+    }
+
+    books = Book.objects.select_related("author", order_by="books.id DESC", limit=2)
+    assert [book.title for book in books.fetch()] == ["Ward 6", "Anna Karenina"]
+
+    with pytest.raises(SQLSymphonyException):
+        Book.objects.select_related("publisher").prefetch_related("author").filter(
+            title="Ward 6"
+        )
+
+    # pending relations and condition of the failed call are not reused
+    assert len(Book.objects.fetch()) == 3
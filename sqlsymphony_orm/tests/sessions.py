@@ -1,4 +1,7 @@
+import pytest
+
 from sqlsymphony_orm.datatypes.fields import IntegerField, RealField, TextField
+from sqlsymphony_orm.exceptions import SQLSymphonyException
 from sqlsymphony_orm.models.session_models import SessionModel
 from sqlsymphony_orm.models.session_models import SQLiteSession
 from sqlsymphony_orm.queries import QueryBuilder
@@ -56,3 +59,38 @@ def test_all_models():
 
     assert len(all_models) == 4
     assert len(all_users) == 3
+
+
+def test_backup_restore_roundtrip(tmp_path):
+    # own session, its fixture gives the process-wide connector back
+    backup_session = SQLiteSession(tmp_path / "data.db")
+    backup_session.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT)")
+    backup_session.execute_many(
+        "INSERT INTO notes (body) VALUES (?)",
+        [(f"note {i}" * 100,) for i in range(100)],
+    )
+    backup_session.execute("DELETE FROM notes WHERE id > 10")
+
+    try:
+        for compact in (False, True):
+            target = tmp_path / f"backup_{compact}.db"
+            backup_session.backup(str(target), compact=compact)
+            # the second backup replaces the first one
+            backup_session.backup(str(target), compact=compact)
+
+            backup_session.execute("UPDATE notes SET body = 'changed'")
+            backup_session.execute("INSERT INTO notes (body) VALUES ('new')")
+            backup_session.restore(str(target))
+
+            rows = backup_session.execute("SELECT body FROM notes ORDER BY id")
+            assert rows == [(f"note {i}" * 100,) for i in range(10)]
+
+        assert list(tmp_path.glob("tmp*.db")) == []
+
+        with pytest.raises(SQLSymphonyException):
+            backup_session.backup(str(tmp_path / "pages.db"), pages=1, compact=True)
+        assert (tmp_path / "backup_True.db").stat().st_size < (
+            tmp_path / "backup_False.db"
+        ).stat().st_size
+    finally:
+        session.reconnect(session.database_file)
@@ -0,0 +1,94 @@
+import pytest
+
+from sqlsymphony_orm.database.sharding import ShardedSession
+from sqlsymphony_orm.datatypes.fields import IntegerField, RealField, TextField
+from sqlsymphony_orm.exceptions import SQLSymphonyException
+from sqlsymphony_orm.models.session_models import SessionModel
+from sqlsymphony_orm.security.hashing import ConsistentHashRing
+
+
+class Customer(SessionModel):
+    __tablename__ = "customers"
+    __shard_key__ = "email"
+
+    id = IntegerField(primary_key=True)
+    email = TextField(null=False)
+    cash = RealField(null=False, default=0.0)
+
+
+def test_consistent_hash_ring():
+    keys = [f"user{i}@example.com" for i in range(2000)]
+    ring = ConsistentHashRing(["a", "b", "c"])
+    before = {key: ring.get_node(key) for key in keys}
+
+    assert all(count > 400 for count in ring.distribute(keys).values())
+
+    ring.add_node("d")
+    moved = [key for key in keys if ring.get_node(key) != before[key]]
+
+    assert all(ring.get_node(key) == "d" for key in moved)
+    assert 300 < len(moved) < 700
+
+
+def test_sharded_session(tmp_path):
+    shards = {name: tmp_path / f"{name}.db" for name in ("a", "b", "c")}
+
+    with ShardedSession(shards) as session:
+        customers = [
+            Customer(email=f"user{i}@example.com", cash=float(i)) for i in range(300)
+        ]
+        session.add_all(customers)
+        session.add(Customer(email="single@example.com", cash=1000.0))
+
+        distribution = session.get_distribution(Customer)
+        assert sum(distribution.values()) == 301
+        assert all(count > 50 for count in distribution.values())
+
+        found = session.filter(Customer, "email = ?", ("user7@example.com",))
+        assert [customer.cash for customer in found] == [7.0]
+        assert session.filter(Customer, shard_key="user7@example.com", limit=1)
+
+        top = session.filter(Customer, order_by="cash DESC", limit=5)
+        assert [customer.cash for customer in top] == [1000.0, 299, 298, 297, 296]
+
+        session.update(top[1], cash=1.5)
+        session.update(top[2], email="moved@example.com")
+        session.delete(top[3])
+        session.commit()
+
+        assert session.count(Customer, "cash = ?", (1.5,)) == 1
+        assert session.count(Customer, "email = ?", ("moved@example.com",)) == 1
+        assert session.count(Customer) == 300
+
+        assert session.add_shard("d", tmp_path / "d.db") > 0
+        assert session.count(Customer) == 300
+        assert session.get_distribution(Customer)["d"] > 0
+
+        session.remove_shard("a")
+        assert "a" not in session.get_distribution(Customer)
+        assert session.count(Customer) == 300
+        assert len(session.filter(Customer, "email = ?", ("user7@example.com",))) == 1
+
+
+def test_rebalance_reopened_session(tmp_path):
+    shards = {name: tmp_path / f"{name}.db" for name in ("a", "b", "c")}
+    emails = [f"user{i}@example.com" for i in range(300)]
+
+    with ShardedSession(shards) as session:
+        session.add_all([Customer(email=email) for email in emails])
+
+    with ShardedSession(shards) as session:
+        with pytest.raises(SQLSymphonyException):
+            session.add_shard("d", tmp_path / "d.db")
+
+        assert "d" not in session.shards
+        assert session.add_shard("d", tmp_path / "d.db", model_classes=[Customer]) > 0
+
+    with ShardedSession({**shards, "d": tmp_path / "d.db"}) as session:
+        session.remove_shard("a", model_classes=[Customer])
+
+        assert session.count(Customer) == 300
+        assert all(
+            session.filter(Customer, "email = ?", (email,), shard_key=email)
+            for email in emails
+        )